@@ -0,0 +1,183 @@
+"""
+batch.py -- Buffered multi-row upserts for nasa-archive.
+
+Records are buffered per (table, columns, conflict target) and written with
+psycopg2's execute_values -- one multi-row INSERT ... ON CONFLICT per page,
+every group in a single transaction -- instead of one round trip and commit
+per row. A flush happens when `batch_size` rows are buffered, when the
+oldest buffered row is `max_age` seconds old, or on flush()/close().
+
+    writer = BatchUpserter(get_connection)
+    writer.add("oral_events", {"name": ..., "archive_slug": ...}, conflict_col="archive_slug")
+    ...
+    writer.close()
+    log.info(writer.stats())
+
+If a batch fails (one bad row poisons the whole transaction) it is rolled
+back to a savepoint and replayed row by row, each row in its own savepoint,
+so a single bad record costs only itself -- the same outcome as the old
+one-row-per-commit path. Savepoints rather than full rollbacks, because a
+rollback would also undo get_connection()'s uncommitted SET search_path and
+send the replay to the wrong schema.
+
+For loading a whole table's worth of rows at once, copy_upsert() streams
+them into a temp table with COPY FROM STDIN and merges with one INSERT ...
+ON CONFLICT DO UPDATE that only rewrites rows whose values changed:
+
+    inserted, updated = copy_upsert(get_connection, "oral_events", cols, rows, "archive_slug")
+"""
+import io
+import logging
+import time
+
+log = logging.getLogger("archive_db.batch")
+
+
+class BatchUpserter:
+    """Per-table upsert buffer over a get_connection() callable (see module docstring)."""
+
+    def __init__(self, get_connection, batch_size=500, max_age=5.0, page_size=500):
+        self._get_connection = get_connection
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.page_size = page_size
+        self._groups = {}      # (table, cols, conflict_col) -> [row tuples]
+        self._pending = 0
+        self._oldest = None
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.seconds = 0.0
+
+    def add(self, table, record, conflict_col="name"):
+        """Buffer one record (None values dropped, as Postgres defaults apply)."""
+        clean = {k: v for k, v in record.items() if v is not None}
+        if not clean:
+            return
+        cols = tuple(clean)
+        self._groups.setdefault((table, cols, conflict_col), []).append(tuple(clean.values()))
+        self._pending += 1
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if self._pending >= self.batch_size or time.monotonic() - self._oldest >= self.max_age:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered row in one transaction. Returns rows attempted."""
+        if not self._pending:
+            return 0
+        groups, n = self._groups, self._pending
+        self._groups, self._pending, self._oldest = {}, 0, None
+
+        from psycopg2.extras import execute_values
+
+        started = time.perf_counter()
+        try:
+            with self._get_connection() as conn:
+                cur = conn.raw_cursor()
+                cur.execute("SAVEPOINT batch")
+                try:
+                    for (table, cols, conflict_col), rows in groups.items():
+                        execute_values(cur, _insert_sql(table, cols, conflict_col), rows,
+                                       page_size=self.page_size)
+                    written = n
+                except Exception as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT batch")
+                    log.warning("Batch of %d rows failed (%s); retrying row by row", n, e)
+                    written = self._replay(cur, groups)
+                conn.commit()
+                self.rows_written += written
+                self.rows_failed += n - written
+        except Exception as e:
+            self.rows_failed += n
+            log.warning("Batch of %d rows lost: %s", n, e)
+            return 0
+        elapsed = time.perf_counter() - started
+        self.seconds += elapsed
+        log.info("Flushed %d rows in %.2fs (%.0f rows/sec)", n, elapsed, n / elapsed if elapsed else 0)
+        return n
+
+    def _replay(self, cur, groups):
+        """Retry each row in its own savepoint; returns rows written."""
+        written = 0
+        for (table, cols, conflict_col), rows in groups.items():
+            sql = _insert_sql(table, cols, conflict_col, values="(" + ", ".join(["%s"] * len(cols)) + ")")
+            for row in rows:
+                cur.execute("SAVEPOINT row")
+                try:
+                    cur.execute(sql, row)
+                    cur.execute("RELEASE SAVEPOINT row")
+                    written += 1
+                except Exception as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT row")
+                    log.warning("Upsert failed %s %s: %s", table, dict(zip(cols, row)).get("name", "?"), e)
+        return written
+
+    def close(self):
+        self.flush()
+
+    def stats(self):
+        rate = self.rows_written / self.seconds if self.seconds else 0
+        return (f"{self.rows_written} rows written, {self.rows_failed} failed, "
+                f"{self.seconds:.2f}s in flushes ({rate:.0f} rows/sec)")
+
+
+def _insert_sql(table, cols, conflict_col, values="%s"):
+    return (
+        f"INSERT INTO {table} ({', '.join(cols)}) VALUES {values} "
+        f"ON CONFLICT ({conflict_col}) DO NOTHING"
+    )
+
+
+def _csv_field(value):
+    """
+    One COPY CSV field: None is the bare NULL marker \\N, every other value is
+    quoted -- so '' stays an empty string and a literal '\\N' stays text
+    (COPY only treats the marker as NULL when it is unquoted).
+    """
+    if value is None:
+        return "\\N"
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_upsert(get_connection, table, cols, rows, conflict_col):
+    """
+    Bulk upsert rows (tuples in cols order) in one transaction: COPY into a
+    temp table shaped like table's cols, then a single INSERT ... ON CONFLICT
+    (conflict_col) DO UPDATE that skips rows identical to what is stored.
+    Returns (inserted, updated); unchanged rows count as neither.
+    """
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(",".join(_csv_field(v) for v in row) + "\n")
+    buf.seek(0)
+
+    col_list = ", ".join(cols)
+    updates = [c for c in cols if c != conflict_col]
+    set_list = ", ".join(f"{c} = EXCLUDED.{c}" for c in updates)
+    # Compared as text so json columns (no equality operator) work too
+    current = ", ".join(f"{table}.{c}::text" for c in updates)
+    incoming = ", ".join(f"EXCLUDED.{c}::text" for c in updates)
+
+    with get_connection() as conn:
+        cur = conn.raw_cursor()
+        try:
+            cur.execute(
+                f"CREATE TEMP TABLE _load_{table} ON COMMIT DROP AS "
+                f"SELECT {col_list} FROM {table} WITH NO DATA"
+            )
+            cur.copy_expert(
+                f"COPY _load_{table} ({col_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf
+            )
+            cur.execute(
+                f"INSERT INTO {table} ({col_list}) SELECT {col_list} FROM _load_{table} "
+                f"ON CONFLICT ({conflict_col}) DO UPDATE SET {set_list} "
+                f"WHERE ({current}) IS DISTINCT FROM ({incoming}) "
+                f"RETURNING (xmax = 0)"
+            )
+            results = [r[0] for r in cur.fetchall()]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    inserted = sum(results)
+    return inserted, len(results) - inserted
@@ -152,6 +152,10 @@ class _PgConn:
             )
         return _PgCursor(self._conn.cursor())
 
+    def raw_cursor(self):
+        """Plain psycopg2 cursor (no SQLite translation), for psycopg2.extras helpers."""
+        return self._conn.cursor()
+
     def execute(self, sql, params=None):
         cur = self.cursor()
         cur.execute(sql, params)
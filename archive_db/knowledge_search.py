@@ -0,0 +1,223 @@
+"""
+knowledge_search.py -- Indexed scoot-term search over Willow's knowledge table.
+
+The Willow import (pipeline/pretraining.py --source willow) looks for atoms
+mentioning any scooter term in title, summary or content_snippet. Written as
+one LOWER(col) LIKE '%term%' per term per column, that is 21 OR'd predicates
+no index can serve, so every run scans the whole knowledge table.
+
+Instead the three columns are searched as one lowercased expression backed by
+a pg_trgm GIN index, with the terms passed as a single LIKE ANY array:
+
+    CREATE INDEX knowledge_scoot_search_trgm ON knowledge
+        USING gin ((SEARCH_EXPR) gin_trgm_ops)
+    ... WHERE SEARCH_EXPR LIKE ANY (ARRAY['%pharaoh%', '%scoot%', ...])
+
+Matches are the same substring matches as before (the columns are joined
+with a newline, which no term contains). Without the index the query still
+runs, just unindexed.
+
+The index is built once, CONCURRENTLY so Willow keeps writing to knowledge
+while it builds -- not by the import, which only checks for it:
+
+    python archive_db/knowledge_search.py --create-index
+
+    has_search_index(conn)     # False -> the import logs a warning and scans
+    sql, params = search_sql(SCOOTER_TERMS, SCOOTER_CATS)
+    cur.execute(sql, params)
+
+Benchmark against a local Postgres (creates and drops schema knowledge_bench):
+    python archive_db/knowledge_search.py --bench --rows 200000
+"""
+import argparse
+import logging
+import os
+import statistics
+import time
+
+log = logging.getLogger("archive_db.knowledge_search")
+
+# What the Willow import pulls in: atoms in these categories mentioning a term
+SCOOTER_TERMS = ["pharaoh", "scoot", "rally", "vespa", "lambretta", "camp scoot", "patch"]
+SCOOTER_CATS = ("narrative", "personal", "personal_document", "archive", "media")
+
+INDEX_NAME = "knowledge_scoot_search_trgm"
+SEARCH_EXPR = (
+    "lower(coalesce(title, '') || chr(10) || coalesce(summary, '') "
+    "|| chr(10) || coalesce(content_snippet, ''))"
+)
+COLUMNS = "id, title, summary, content_snippet, category, created_at"
+
+
+def has_search_index(conn):
+    """
+    True if the search index exists and is valid. Read-only, and run inside a
+    savepoint so a failure leaves the caller's transaction (and the
+    search_path get_connection() set in it) intact.
+    """
+    cur = conn.raw_cursor() if hasattr(conn, "raw_cursor") else conn.cursor()
+    cur.execute("SAVEPOINT knowledge_search_index")
+    try:
+        cur.execute(
+            "SELECT i.indisvalid FROM pg_index i "
+            "WHERE i.indexrelid = to_regclass(%s) AND i.indrelid = to_regclass('knowledge')",
+            (INDEX_NAME,),
+        )
+        row = cur.fetchone()
+        cur.execute("RELEASE SAVEPOINT knowledge_search_index")
+    except Exception as e:
+        cur.execute("ROLLBACK TO SAVEPOINT knowledge_search_index")
+        log.warning("Could not check for the knowledge search index: %s", e)
+        return False
+    return bool(row and row[0])
+
+
+def create_search_index(conn):
+    """
+    Create pg_trgm and the search index on a plain psycopg2 connection whose
+    search_path is already set. Built CONCURRENTLY (outside any transaction),
+    so writers to knowledge are not blocked; an invalid index left behind by
+    an interrupted build is dropped and rebuilt.
+    """
+    autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        cur = conn.cursor()
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public")
+        cur.execute(
+            "SELECT i.indisvalid FROM pg_index i WHERE i.indexrelid = to_regclass(%s)",
+            (INDEX_NAME,),
+        )
+        row = cur.fetchone()
+        if row and row[0]:
+            return
+        if row:
+            log.warning("Dropping invalid %s left by an interrupted build", INDEX_NAME)
+            cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+        cur.execute(
+            f"CREATE INDEX CONCURRENTLY {INDEX_NAME} ON knowledge "
+            f"USING gin (({SEARCH_EXPR}) gin_trgm_ops)"
+        )
+    finally:
+        conn.autocommit = autocommit
+
+
+def search_sql(terms, categories):
+    """(sql, params) selecting knowledge rows in categories that mention any term."""
+    cat_ph = ", ".join(["%s"] * len(categories))
+    sql = (
+        f"SELECT {COLUMNS} FROM knowledge "
+        f"WHERE category IN ({cat_ph}) AND {SEARCH_EXPR} LIKE ANY (%s) "
+        f"ORDER BY id"
+    )
+    return sql, [*categories, [f"%{t.lower()}%" for t in terms]]
+
+
+def _legacy_sql(terms, categories):
+    """The pre-index query (one LIKE per term per column), kept for the benchmark."""
+    cat_ph = ", ".join(["%s"] * len(categories))
+    kw_conds = " OR ".join(
+        "(LOWER(title) LIKE %s OR LOWER(summary) LIKE %s OR LOWER(content_snippet) LIKE %s)"
+        for _ in terms
+    )
+    params = list(categories)
+    for t in terms:
+        params += [f"%{t}%", f"%{t}%", f"%{t}%"]
+    return f"SELECT {COLUMNS} FROM knowledge WHERE category IN ({cat_ph}) AND ({kw_conds}) ORDER BY id", params
+
+
+# ---- Benchmark -----------------------------------------------------------------
+
+_FILLER = ["meeting", "garden", "invoice", "recipe", "weather", "kitchen", "project", "travel",
+           "doctor", "music", "school", "budget", "friend", "letter", "photo", "holiday"]
+
+
+def bench(dsn, rows=200000, rounds=5):
+    import psycopg2
+
+    conn = psycopg2.connect(dsn)
+    cur = conn.cursor()
+    cur.execute("DROP SCHEMA IF EXISTS knowledge_bench CASCADE; CREATE SCHEMA knowledge_bench")
+    cur.execute("SET search_path = knowledge_bench, public")
+    cur.execute("""
+        CREATE TABLE knowledge (
+            id SERIAL PRIMARY KEY, title TEXT, summary TEXT, content_snippet TEXT,
+            category TEXT, created_at TIMESTAMPTZ DEFAULT now()
+        )
+    """)
+    filler = "ARRAY[" + ", ".join(f"'{w}'" for w in _FILLER) + "]"
+    words = " || ' ' || ".join([f"({filler})[1 + floor(random() * {len(_FILLER)})::int]"] * 12)
+    cur.execute(f"""
+        INSERT INTO knowledge (title, summary, content_snippet, category)
+        SELECT 'Atom ' || g,
+               {words},
+               {words} || CASE WHEN random() < 0.01 THEN ' vespa rally weekend' ELSE '' END,
+               (ARRAY['narrative', 'personal', 'archive', 'media', 'code', 'system'])[1 + g % 6]
+        FROM generate_series(1, %s) g
+    """, (rows,))
+    cur.execute("ANALYZE knowledge")
+    conn.commit()
+
+    def timed(sql, params):
+        times = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            cur.execute(sql, params)
+            found = len(cur.fetchall())
+            times.append(time.perf_counter() - started)
+        return statistics.median(times), found
+
+    legacy = timed(*_legacy_sql(SCOOTER_TERMS, SCOOTER_CATS))
+    unindexed = timed(*search_sql(SCOOTER_TERMS, SCOOTER_CATS))
+    conn.commit()   # CONCURRENTLY cannot run inside the benchmark's open transaction
+    started = time.perf_counter()
+    create_search_index(conn)
+    built = time.perf_counter() - started
+    cur.execute("ANALYZE knowledge")
+    indexed = timed(*search_sql(SCOOTER_TERMS, SCOOTER_CATS))
+    sql, params = search_sql(SCOOTER_TERMS, SCOOTER_CATS)
+    cur.execute("EXPLAIN " + sql, params)
+    plan = "\n".join("      " + r[0] for r in cur.fetchall())
+
+    print(f"knowledge: {rows} rows, median of {rounds}")
+    print(f"  21 x LIKE OR (old)      : {legacy[0] * 1000:8.1f} ms  {legacy[1]} rows")
+    print(f"  LIKE ANY, no index      : {unindexed[0] * 1000:8.1f} ms  {unindexed[1]} rows")
+    print(f"  LIKE ANY + trgm GIN     : {indexed[0] * 1000:8.1f} ms  {indexed[1]} rows "
+          f"(index built in {built:.1f}s)")
+    print("    plan:\n" + plan)
+
+    cur.execute("DROP SCHEMA knowledge_bench CASCADE")
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Willow knowledge scoot-term search")
+    parser.add_argument("--create-index", action="store_true",
+                        help="Build the search index (CONCURRENTLY) in --schema")
+    parser.add_argument("--schema", default="sweet_pea_rudi19", help="Schema holding knowledge")
+    parser.add_argument("--bench", action="store_true", help="Benchmark on a synthetic knowledge table")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--dsn", default=os.getenv("WILLOW_DB_URL", ""), help="Postgres DSN (default WILLOW_DB_URL)")
+    args = parser.parse_args()
+    if not (args.bench or args.create_index):
+        parser.error("pass --create-index or --bench")
+    if not args.dsn:
+        parser.error("set WILLOW_DB_URL or pass --dsn")
+    if args.create_index:
+        import psycopg2
+
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        conn = psycopg2.connect(args.dsn)
+        conn.autocommit = True
+        conn.cursor().execute(f"SET search_path = {args.schema}, public")
+        started = time.perf_counter()
+        create_search_index(conn)
+        conn.close()
+        print(f"{INDEX_NAME} ready in {args.schema} ({time.perf_counter() - started:.1f}s)")
+        return
+    bench(args.dsn, rows=args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+local.py -- Read-only queries against the local SQLite archive.
+
+data/archive.sqlite is a derived cache compiled from data/rallies/* by
+scraper/build_sqlite.py. It is opened read-only and never written here;
+Postgres (db.py) remains the only writable store.
+
+    from archive_db import local
+    local.get_rally("2003/05/texas")
+    local.search_rallies("camp scoot", limit=10)
+    local.photos_by_photographer("Liza")
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+DB_PATH = Path(__file__).parent.parent / "data" / "archive.sqlite"
+
+_local = threading.local()
+
+
+def get_connection(db_path=DB_PATH):
+    """Return this thread's read-only connection to the archive (opened once per thread)."""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    key = str(db_path)
+    if key not in conns:
+        if not Path(db_path).exists():
+            raise FileNotFoundError(
+                f"{db_path} not found. Run: python scraper/build_sqlite.py"
+            )
+        conn = sqlite3.connect(f"file:{Path(db_path).as_posix()}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        conns[key] = conn
+    return conns[key]
+
+
+def _rally(row):
+    if row is None:
+        return None
+    d = dict(row)
+    d["related_clubs"] = json.loads(d["related_clubs"] or "[]")
+    d.pop("meta", None)
+    return d
+
+
+def get_rally(slug, db_path=DB_PATH):
+    """Rally by slug ("2003/05/texas") or directory name ("2003-05-texas")."""
+    row = get_connection(db_path).execute(
+        "SELECT * FROM rallies WHERE slug = ? OR dir_slug = ? LIMIT 1", (slug, slug)
+    ).fetchone()
+    return _rally(row)
+
+
+def get_meta(slug, db_path=DB_PATH):
+    """The full original meta.json dict for a rally, or None."""
+    row = get_connection(db_path).execute(
+        "SELECT meta FROM rallies WHERE slug = ? OR dir_slug = ? LIMIT 1", (slug, slug)
+    ).fetchone()
+    return json.loads(row["meta"]) if row else None
+
+
+def rallies_by_year(year, db_path=DB_PATH):
+    rows = get_connection(db_path).execute(
+        "SELECT * FROM rallies WHERE year = ? ORDER BY month, slug", (year,)
+    ).fetchall()
+    return [_rally(r) for r in rows]
+
+
+def _fts_query(text):
+    """Quote each word and prefix-match the last, so user input can't break FTS5 syntax."""
+    words = [w.replace('"', '""') for w in text.split() if w.strip('"')]
+    if not words:
+        return None
+    return " ".join(f'"{w}"' for w in words[:-1]) + (" " if len(words) > 1 else "") + f'"{words[-1]}"*'
+
+
+def search_rallies(text, limit=20, db_path=DB_PATH):
+    """Full-text search over rally titles and descriptions, best matches first."""
+    query = _fts_query(text)
+    if query is None:
+        return []
+    rows = get_connection(db_path).execute(
+        "SELECT r.* FROM rallies_fts f JOIN rallies r ON r.id = f.rowid "
+        "WHERE rallies_fts MATCH ? ORDER BY bm25(rallies_fts, 10.0, 1.0), r.photo_count DESC "
+        "LIMIT ?",
+        (query, limit),
+    ).fetchall()
+    return [_rally(r) for r in rows]
+
+
+def get_photos(slug, db_path=DB_PATH):
+    """Photos for one rally, with photographer names joined in."""
+    rows = get_connection(db_path).execute(
+        "SELECT p.*, ph.name AS photographer FROM photos p "
+        "JOIN rallies r ON r.id = p.rally_id "
+        "LEFT JOIN photographers ph ON ph.id = p.photographer_id "
+        "WHERE r.slug = ? OR r.dir_slug = ? ORDER BY p.id",
+        (slug, slug),
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def get_photo(pic_id, db_path=DB_PATH):
+    """All photos with this scoot.net pic_id (a handful of ids appear in two galleries)."""
+    rows = get_connection(db_path).execute(
+        "SELECT p.*, ph.name AS photographer, r.slug AS rally_slug FROM photos p "
+        "JOIN rallies r ON r.id = p.rally_id "
+        "LEFT JOIN photographers ph ON ph.id = p.photographer_id "
+        "WHERE p.pic_id = ?",
+        (str(pic_id),),
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def photos_by_photographer(name, limit=None, db_path=DB_PATH):
+    sql = (
+        "SELECT p.*, r.slug AS rally_slug FROM photos p "
+        "JOIN photographers ph ON ph.id = p.photographer_id "
+        "JOIN rallies r ON r.id = p.rally_id "
+        "WHERE ph.name = ? ORDER BY r.year, r.month, p.id"
+    )
+    params = [name]
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return [dict(r) for r in get_connection(db_path).execute(sql, params).fetchall()]
+
+
+def top_photographers(limit=20, db_path=DB_PATH):
+    rows = get_connection(db_path).execute(
+        "SELECT name, photo_count FROM photographers ORDER BY photo_count DESC, name LIMIT ?",
+        (limit,),
+    ).fetchall()
+    return [dict(r) for r in rows]
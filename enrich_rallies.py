@@ -9,37 +9,49 @@ Usage:
     python enrich_rallies.py --limit 20       # do 20 at a time
     python enrich_rallies.py --year 2003      # only 2003 rallies
     python enrich_rallies.py --dry-run        # show what would be enriched
+    python enrich_rallies.py --workers 8      # 8 concurrent fleet requests
+    python enrich_rallies.py --provider-delay groq=3   # pace one provider harder
+    python enrich_rallies.py --batch 8        # 8 rallies per prompt
+    python enrich_rallies.py --no-cache       # re-ask the fleet even for cached prompts
+
+Progress is kept in data/enrichment.sqlite (scraper/enrich_ledger.py), so a
+re-run picks up the pending rallies without opening every meta.json.
 """
 
+import atexit
 import json
-import os
 import sys
 import time
 import argparse
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
-# Wire up fleet — need both core dir and parent for relative imports
-WILLOW_ROOT = "/mnt/c/Users/Sean/Documents/GitHub/Willow"
-sys.path.insert(0, WILLOW_ROOT)
-sys.path.insert(0, os.path.join(WILLOW_ROOT, "core"))
-import llm_router
-llm_router.load_keys_from_json()
+sys.path.insert(0, str(Path(__file__).parent / "scraper"))
+from build_web_data import build_all as build_web_data, update_rallies
+from enrich_ledger import EnrichLedger
+from location_matcher import default_matcher
+from meta_store import MetaStore
+from pipeline.fleet_client import FleetClient
+from pipeline.llm_cache import LLMCache
 
 DATA_DIR = Path("/mnt/c/Users/Sean/Documents/GitHub/safe-app-nasa-archive/data/rallies")
 INDEX_PATH = Path("/mnt/c/Users/Sean/Documents/GitHub/safe-app-nasa-archive/web/data/rallies.json")
+LEDGER_PATH = DATA_DIR.parent / "enrichment.sqlite"
 
-PROMPT_TEMPLATE = """You are a research librarian specializing in motor scooter culture and rally history in North America and worldwide.
+# Enrichment patches are buffered and flushed every 25 rallies (and before
+# every index rebuild) under the store lock, so geocode_rallies.py and
+# build_data.py can write the same meta.json files concurrently.
+META_STORE = MetaStore(DATA_DIR, batch_size=25)
 
-I need factual information about this scooter rally:
+MAX_BACKOFF = 60.0  # cap per-provider backoff at 60s
 
-Rally Name: {name}
-Year: {year}
-Month: {month}
-Scoot.net URL: {url}
+# Bump when PROMPT_TEMPLATE changes meaning, so cached responses stop matching
+PROMPT_VERSION = "enrich-v1"
 
-Please provide what you know as JSON with these fields (use null for anything you don't know — do NOT make things up):
-
-{{
+# Per-rally answer schema, shared by the single and batched prompts
+ENRICH_FIELDS = """{{
   "description": "1-3 sentence description of what this rally was",
   "hosting_club": "name of the scooter club that organized it, or null",
   "city": "city where it was held",
@@ -50,10 +62,37 @@ Please provide what you know as JSON with these fields (use null for anything yo
   "notable_facts": ["any notable facts, up to 3"],
   "related_clubs": ["other clubs involved or attending"],
   "source_confidence": "high/medium/low — how confident you are in this info"
-}}
+}}"""
+
+PROMPT_TEMPLATE = """You are a research librarian specializing in motor scooter culture and rally history in North America and worldwide.
+
+I need factual information about this scooter rally:
+
+Rally Name: {name}
+Year: {year}
+Month: {month}
+Scoot.net URL: {url}
+
+Please provide what you know as JSON with these fields (use null for anything you don't know — do NOT make things up):
+
+""" + ENRICH_FIELDS + """
 
 IMPORTANT: Only state facts you're confident about. "null" is better than a guess. These are real community events and accuracy matters. Respond with ONLY the JSON object, no other text."""
 
+BATCH_PROMPT_VERSION = "enrich-batch-v1"
+
+BATCH_PROMPT_TEMPLATE = """You are a research librarian specializing in motor scooter culture and rally history in North America and worldwide.
+
+I need factual information about each of these scooter rallies (slug: name — month year — scoot.net URL):
+
+{rallies}
+
+Respond with ONE JSON object whose keys are the slugs above, exactly as written. Each value is an object with these fields (use null for anything you don't know — do NOT make things up):
+
+""" + ENRICH_FIELDS + """
+
+IMPORTANT: Only state facts you're confident about. "null" is better than a guess. Keep each rally's facts to that rally. These are real community events and accuracy matters. Respond with ONLY the JSON object, no other text."""
+
 
 def load_index():
     with open(INDEX_PATH) as f:
@@ -73,13 +112,12 @@ def slug_to_dir(slug):
     return slug.replace("/", "-")
 
 
-def needs_enrichment(rally):
-    """Check if this rally needs enrichment."""
-    dir_slug = slug_to_dir(rally["slug"])
-    meta_path = DATA_DIR / dir_slug / "meta.json"
+def needs_enrichment(slug):
+    """Check meta.json for whether this rally needs enrichment (seeds the ledger)."""
+    meta_path = DATA_DIR / slug_to_dir(slug) / "meta.json"
     if not meta_path.exists():
         return True
-    meta = json.load(open(meta_path))
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
     # Already enriched if it has a real description or enrichment data
     if meta.get("enriched"):
         return False
@@ -88,8 +126,69 @@ def needs_enrichment(rally):
     return True
 
 
-def enrich_one(rally):
-    """Ask the fleet about one rally. Returns enrichment dict or None."""
+class ProviderLimiter:
+    """
+    Per-provider request pacing shared by the enrichment workers.
+
+    The router picks the provider, so each worker waits on the gate of the
+    provider that served its previous request ("fleet" before its first
+    reply). Requests through one gate are spaced at least that provider's
+    interval apart. A failure doubles only that provider's interval (up to
+    MAX_BACKOFF); a success halves it back toward its base, so one
+    struggling provider doesn't slow the others. Errors that don't name a
+    provider back off just the worker that hit them.
+    """
+
+    def __init__(self, interval, provider_intervals=None):
+        self.base = interval
+        self.provider_intervals = provider_intervals or {}
+        self._lock = threading.Lock()
+        self._interval = {}   # provider -> current seconds between requests
+        self._next = {}       # provider -> monotonic time of next free slot
+        self._local = threading.local()
+
+    def _base(self, provider):
+        return max(self.base, self.provider_intervals.get(provider, 0.0))
+
+    def wait(self):
+        """Block until this worker's provider has a free slot, and reserve it."""
+        time.sleep(getattr(self._local, "backoff", 0.0))
+        provider = getattr(self._local, "provider", "fleet")
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(provider, now))
+            self._next[provider] = start + self._interval.get(provider, self._base(provider))
+        if start > now:
+            time.sleep(start - now)
+
+    def record(self, provider, ok):
+        """Feed back one result. Returns (provider or "worker", new interval)."""
+        if provider is None:
+            backoff = getattr(self._local, "backoff", 0.0)
+            self._local.backoff = 0.0 if ok else min(max(backoff, 1.0) * 2, MAX_BACKOFF)
+            return "worker", self._local.backoff
+        self._local.provider = provider
+        self._local.backoff = 0.0
+        with self._lock:
+            base = self._base(provider)
+            current = self._interval.get(provider, base)
+            if ok:
+                new = max(base, current / 2)
+            else:
+                new = min(max(current, 1.0) * 2, MAX_BACKOFF)
+            self._interval[provider] = new
+        return provider, new
+
+
+# Willow fleet over the shared pooled client; FLEET.metrics counts every call
+FLEET = FleetClient()
+
+
+def ask_fleet(prompt):
+    return FLEET.ask(prompt, tier="free", task_type="text_summarization")
+
+
+def prompt_fields(rally):
     slug = rally["slug"]
     month_num = 0
     m = __import__("re").match(r"\d{4}/(\d{2})/", slug)
@@ -103,97 +202,227 @@ def enrich_one(rally):
     month_str = month_names[month_num] if month_num else "Unknown"
     url = f"http://scoot.net/gallery/{slug}/" if "/" in slug else ""
 
-    prompt = PROMPT_TEMPLATE.format(
-        name=rally["name"],
-        year=rally["year"] or "Unknown",
-        month=month_str,
-        url=url or "N/A",
-    )
+    return {
+        "name": rally["name"],
+        "year": rally["year"] or "Unknown",
+        "month": month_str,
+        "url": url or "N/A",
+    }
 
+
+def build_prompt(rally):
+    return PROMPT_TEMPLATE.format(**prompt_fields(rally))
+
+
+def build_batch_prompt(rallies):
+    lines = []
+    for rally in rallies:
+        f = prompt_fields(rally)
+        lines.append(f"- {rally['slug']}: {f['name']} — {f['month']} {f['year']} — {f['url']}")
+    return BATCH_PROMPT_TEMPLATE.format(rallies="\n".join(lines))
+
+
+def _strip_fences(content):
+    # Parse JSON from response — handle markdown code fences
+    text = content.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+        if text.endswith("```"):
+            text = text[:-3]
+        text = text.strip()
+    return text
+
+
+def finish_enrichment(rally, data, provider):
+    """Stamp one rally's parsed answer and backfill its location from the title."""
+    # Backfill location from a known place name in the title when the fleet had none
+    if str(data.get("city") or "null").lower() == "null":
+        place = default_matcher().match(rally["name"])
+        if place:
+            data["city"] = place[0]
+            if str(data.get("state_province") or "null").lower() == "null":
+                data["state_province"] = place[1]
+    data["enriched"] = True
+    data["enriched_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    data["enriched_provider"] = provider
+    return data
+
+
+def parse_enrichment(rally, content, provider):
+    """Fleet response text -> enrichment dict. Raises json.JSONDecodeError."""
+    return finish_enrichment(rally, json.loads(_strip_fences(content)), provider)
+
+
+def parse_batch(content):
+    """Batched response text -> {slug: answer dict}, or None if it isn't a JSON object."""
+    try:
+        data = json.loads(_strip_fences(content))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    answers = {}
+    for key, val in data.items():
+        if isinstance(val, dict):
+            answers[str(key).strip()] = val
+    return answers
+
+
+def enrich_one(rally, limiter=None, cache=None):
+    """
+    Ask the fleet about one rally. Returns enrichment dict or None.
+    Safe to call from worker threads; limiter paces and backs off per provider.
+    A usable cached response for the same prompt skips the fleet entirely.
+    """
+    prompt = build_prompt(rally)
+    key = LLMCache.key(prompt, "free", PROMPT_VERSION)
+    if cache:
+        cached = cache.get(key)
+        if cached:
+            try:
+                return parse_enrichment(rally, cached.content, cached.provider)
+            except json.JSONDecodeError:
+                cache.discard(key)
+
+    if limiter:
+        limiter.wait()
+    provider = None
+    ok = False
     try:
-        resp = llm_router.ask(prompt, preferred_tier="free", task_type="text_summarization")
+        resp = ask_fleet(prompt)
+        provider = getattr(resp, "provider", None)
         if not resp or not resp.content:
             return None
 
-        # Parse JSON from response — handle markdown code fences
-        text = resp.content.strip()
-        if text.startswith("```"):
-            text = text.split("\n", 1)[1] if "\n" in text else text[3:]
-            if text.endswith("```"):
-                text = text[:-3]
-            text = text.strip()
-
-        data = json.loads(text)
-        data["enriched"] = True
-        data["enriched_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-        data["enriched_provider"] = resp.provider
+        data = parse_enrichment(rally, resp.content, resp.provider)
+        if cache:
+            cache.put(key, resp.content, resp.provider, version=PROMPT_VERSION)
+        ok = True
         return data
 
     except json.JSONDecodeError as e:
         print(f"  JSON parse error for {rally['name']}: {e}")
         return None
     except Exception as e:
+        provider = getattr(e, "provider", provider)
         print(f"  Fleet error for {rally['name']}: {e}")
         return None
+    finally:
+        if limiter:
+            name, interval = limiter.record(provider, ok)
+            if not ok and interval >= 5:
+                print(f"  {name} struggling — backing off to {interval:.0f}s between requests")
+
+
+def enrich_batch(rallies, limiter=None, cache=None):
+    """
+    Ask the fleet about several rallies in one prompt. Returns
+    [(rally, enrichment dict or None)] in input order.
+
+    Slugs missing or malformed in an otherwise valid answer are retried one
+    at a time with enrich_one. If the call itself fails every rally comes
+    back None (the caller requeues them); if the answer isn't a JSON object
+    at all, every rally falls back to a single request.
+    """
+    if len(rallies) == 1:
+        return [(rallies[0], enrich_one(rallies[0], limiter, cache))]
+
+    prompt = build_batch_prompt(rallies)
+    key = LLMCache.key(prompt, "free", BATCH_PROMPT_VERSION)
+    answers = provider = None
+    if cache:
+        cached = cache.get(key)
+        if cached:
+            answers, provider = parse_batch(cached.content), cached.provider
+            if answers is None:
+                cache.discard(key)
+
+    if answers is None:
+        if limiter:
+            limiter.wait()
+        ok = False
+        try:
+            resp = ask_fleet(prompt)
+            provider = getattr(resp, "provider", None)
+            if not resp or not resp.content:
+                return [(rally, None) for rally in rallies]
+            answers = parse_batch(resp.content)
+            if answers is None:
+                print(f"  Batch of {len(rallies)} came back without a JSON object — asking one at a time")
+                answers = {}
+            else:
+                ok = True
+                if cache:
+                    cache.put(key, resp.content, provider, version=BATCH_PROMPT_VERSION)
+        except Exception as e:
+            provider = getattr(e, "provider", provider)
+            print(f"  Fleet error for batch of {len(rallies)}: {e}")
+            return [(rally, None) for rally in rallies]
+        finally:
+            if limiter:
+                name, interval = limiter.record(provider, ok)
+                if not ok and interval >= 5:
+                    print(f"  {name} struggling — backing off to {interval:.0f}s between requests")
+
+    out = []
+    for rally in rallies:
+        # Accept directory-style keys ("2003-05-texas") for slug "2003/05/texas"
+        data = answers.get(rally["slug"]) or answers.get(slug_to_dir(rally["slug"]))
+        if data is not None:
+            out.append((rally, finish_enrichment(rally, data, provider)))
+        else:
+            out.append((rally, enrich_one(rally, limiter, cache)))
+    return out
 
 
 def update_meta(rally, enrichment):
-    """Merge enrichment data into meta.json."""
+    """Queue enrichment data for merging into meta.json (see META_STORE)."""
     dir_slug = slug_to_dir(rally["slug"])
-    meta_path = DATA_DIR / dir_slug / "meta.json"
-
-    if meta_path.exists():
-        meta = json.load(open(meta_path))
-    else:
-        # Create minimal meta if dir exists but no meta.json
-        meta_dir = DATA_DIR / dir_slug
-        if not meta_dir.exists():
-            meta_dir.mkdir(parents=True)
-        meta = {
-            "slug": rally["slug"],
-            "title": rally["name"],
-            "year": rally["year"],
-        }
-
-    # Merge enrichment — don't overwrite existing real data with nulls
-    for key, val in enrichment.items():
-        if val is not None:
-            meta[key] = val
-
-    with open(meta_path, "w") as f:
-        json.dump(meta, f, indent=2)
-
-    return meta_path
+    # Seed a minimal meta if the dir has no meta.json yet; null enrichment
+    # values are dropped so existing real data is never overwritten
+    META_STORE.patch(dir_slug, enrichment, defaults={
+        "slug": rally["slug"],
+        "title": rally["name"],
+        "year": rally["year"],
+    })
+    return META_STORE.meta_path(dir_slug)
+
+
+def checkpoint(ledger, unrecorded):
+    """Flush queued meta.json patches, then record those rallies in the ledger."""
+    META_STORE.flush()
+    if unrecorded:
+        ledger.mark_enriched(unrecorded)
+        unrecorded.clear()
+
+
+def update_index(rallies_enriched, full=True):
+    """
+    Bring web/data up to date with the enriched meta.json files. full=False
+    patches just these rallies into rallies.json; full=True rebuilds every
+    artifact (search index, geo, clubs, ...).
+    """
+    META_STORE.flush()
+    if not full:
+        dir_slugs = [slug_to_dir(rally["slug"]) for _, rally in rallies_enriched]
+        if update_rallies(dir_slugs, DATA_DIR, INDEX_PATH.parent):
+            print(f"Updated {len(dir_slugs)} rallies in rallies.json")
+        return
+    changed = build_web_data(DATA_DIR, INDEX_PATH.parent)
+    if "rallies.json" in changed:
+        print(f"Rebuilt rallies.json after {len(rallies_enriched)} enrichments")
 
 
-def update_index(rallies_enriched):
-    """Update rallies.json descriptions from enrichment data."""
-    with open(INDEX_PATH) as f:
-        index = json.load(f)
-
-    lookup = {}
-    for enrichment, rally in rallies_enriched:
-        if enrichment and enrichment.get("description"):
-            lookup[rally["slug"]] = enrichment["description"]
-
-    changed = 0
-    for entry in index:
-        slug = entry.get("s", "")
-        if slug in lookup:
-            old_desc = entry.get("d", "")
-            # Preserve photo count from old description
-            photo_note = ""
-            import re
-            m = re.search(r"\d+ photos?\.", old_desc)
-            if m:
-                photo_note = " " + m.group(0)
-            entry["d"] = lookup[slug] + photo_note
-            changed += 1
-
-    if changed > 0:
-        with open(INDEX_PATH, "w") as f:
-            json.dump(index, f, separators=(",", ":"))
-        print(f"Updated {changed} descriptions in rallies.json")
+def parse_provider_delays(specs):
+    """["groq=2", "gemini=4.5"] -> {"groq": 2.0, "gemini": 4.5}"""
+    delays = {}
+    for spec in specs or ():
+        name, _, seconds = spec.partition("=")
+        try:
+            delays[name.strip()] = float(seconds)
+        except ValueError:
+            raise SystemExit(f"--provider-delay expects NAME=SECONDS, got {spec!r}")
+    return delays
 
 
 def main():
@@ -201,18 +430,32 @@ def main():
     parser.add_argument("--limit", type=int, default=0, help="Max rallies to process")
     parser.add_argument("--year", type=int, default=0, help="Only this year")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be enriched")
-    parser.add_argument("--delay", type=float, default=1.0, help="Seconds between requests")
+    parser.add_argument("--delay", type=float, default=1.0,
+                        help="Minimum seconds between requests to any one provider")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent fleet requests")
+    parser.add_argument("--provider-delay", action="append", metavar="NAME=SECONDS",
+                        help="Slower pacing for one provider (repeatable)")
+    parser.add_argument("--batch", type=int, default=1,
+                        help="Rallies per fleet prompt (answers come back keyed by slug)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore cached fleet responses (fresh ones are still stored)")
     args = parser.parse_args()
 
     rallies = load_index()
     print(f"Loaded {len(rallies)} rallies from index")
 
+    ledger = EnrichLedger(LEDGER_PATH)
+    seeded = ledger.seed((r["slug"] for r in rallies), needs_enrichment)
+    if seeded:
+        print(f"Ledger: seeded {seeded} new rallies from meta.json")
+
     # Filter
     if args.year:
         rallies = [r for r in rallies if r["year"] == args.year]
         print(f"Filtered to {len(rallies)} rallies in {args.year}")
 
-    to_enrich = [r for r in rallies if needs_enrichment(r)]
+    pending = ledger.pending()
+    to_enrich = [r for r in rallies if r["slug"] in pending]
     print(f"{len(to_enrich)} need enrichment")
 
     if args.limit:
@@ -224,51 +467,71 @@ def main():
             print(f"  Would enrich: {r['name']} ({r['year']})")
         return
 
+    unrecorded = []   # (slug, provider, confidence) written to meta.json but not the ledger
+    atexit.register(checkpoint, ledger, unrecorded)   # keep queued enrichments on Ctrl-C
+    limiter = ProviderLimiter(args.delay, parse_provider_delays(args.provider_delay))
+    cache = LLMCache(read=not args.no_cache)
+    workers = max(1, args.workers)
+    batch = max(1, args.batch)
     results = []
+    unindexed = []
     success = 0
     fail = 0
-    queue = list(to_enrich)
+    queue = deque(to_enrich)
+    in_flight = {}
     attempt = 0
-    backoff = args.delay
-    max_backoff = 60.0  # cap backoff at 60s
-    consecutive_fails = 0
-
-    while queue:
-        attempt += 1
-        rally = queue.pop(0)
-        remaining = len(queue)
-        print(f"[pass {attempt} | {remaining} left | {success} done] {rally['name']} ({rally['year']})...", end=" ", flush=True)
-
-        enrichment = enrich_one(rally)
-        if enrichment:
-            path = update_meta(rally, enrichment)
-            conf = enrichment.get("source_confidence", "?")
-            club = enrichment.get("hosting_club", "?")
-            city = enrichment.get("city", "?")
-            print(f"OK — {club}, {city} [{conf}]")
-            results.append((enrichment, rally))
-            success += 1
-            consecutive_fails = 0
-            backoff = args.delay  # reset backoff on success
-        else:
-            print(f"RETRY (back of queue)")
-            queue.append(rally)  # back of the line
-            consecutive_fails += 1
-
-            # Exponential backoff when fleet is struggling
-            if consecutive_fails >= 5:
-                backoff = min(backoff * 1.5, max_backoff)
-                print(f"  Fleet struggling — {consecutive_fails} consecutive fails, backing off to {backoff:.0f}s")
-
-            # Periodic index update so progress isn't lost
-            if success > 0 and success % 25 == 0:
-                update_index(results)
-
-        time.sleep(backoff)
-
-    print(f"\nDone: {success} enriched, {fail} skipped")
-
-    # Final index update
+    started = time.monotonic()
+
+    # Failed rallies go to the back of the queue and are retried until they
+    # succeed; pacing and backoff live in the limiter, per provider.
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while queue or in_flight:
+            while queue and len(in_flight) < workers:
+                chunk = [queue.popleft() for _ in range(min(batch, len(queue)))]
+                in_flight[pool.submit(enrich_batch, chunk, limiter, cache)] = len(chunk)
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            finished = [r for future in done for r in future.result()]
+            for future in done:
+                del in_flight[future]
+            for rally, enrichment in finished:
+                attempt += 1
+                pending = len(queue) + sum(in_flight.values())
+                prefix = f"[pass {attempt} | {pending} left | {success} done]"
+                if enrichment:
+                    update_meta(rally, enrichment)   # written through as results arrive
+                    conf = enrichment.get("source_confidence", "?")
+                    club = enrichment.get("hosting_club", "?")
+                    city = enrichment.get("city", "?")
+                    print(f"{prefix} {rally['name']} ({rally['year']})... OK — {club}, {city} [{conf}]")
+                    results.append((enrichment, rally))
+                    unindexed.append((enrichment, rally))
+                    unrecorded.append((rally["slug"], enrichment.get("enriched_provider"),
+                                       enrichment.get("source_confidence")))
+                    success += 1
+
+                    # Periodic checkpoint so progress isn't lost
+                    if success % 25 == 0:
+                        checkpoint(ledger, unrecorded)
+                        update_index(unindexed, full=False)
+                        unindexed.clear()
+                else:
+                    print(f"{prefix} {rally['name']} ({rally['year']})... RETRY (back of queue)")
+                    ledger.mark_failed(rally["slug"])
+                    queue.append(rally)  # back of the line
+
+    elapsed = time.monotonic() - started
+    rate = success / elapsed * 60 if elapsed else 0
+    print(f"\nDone: {success} enriched, {fail} skipped in {elapsed:.0f}s ({rate:.1f}/min, {workers} workers)")
+    calls = FLEET.metrics.calls
+    per_call = success / calls if calls else 0
+    print(f"Fleet: {calls} calls, {per_call:.2f} rallies per call (batch {batch})")
+    print(f"  {FLEET.metrics.summary()}")
+    print(f"LLM cache: {cache.hits} hits, {cache.misses} misses")
+
+    # Final checkpoint and full index rebuild
+    checkpoint(ledger, unrecorded)
+    print(f"Ledger: {ledger.counts()}")
     if success > 0:
         update_index(results)
 
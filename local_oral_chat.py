@@ -25,17 +25,15 @@ sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="repla
 _WILLOW_ROOT = Path(__file__).parent.parent / "Willow"
 WILLOW_CORE = str(_WILLOW_ROOT / "core")
 sys.path.insert(0, str(_WILLOW_ROOT))  # for "from core.db import ..."
-sys.path.insert(0, WILLOW_CORE)         # for "import llm_router"
+sys.path.insert(0, WILLOW_CORE)         # for "import agent_registry"
 
-import llm_router
 import agent_registry
 
-llm_router.load_keys_from_json()
-
 # Riggs persona -- imported from personas.py (single source of truth)
 _REPO = Path(__file__).parent
 sys.path.insert(0, str(_REPO))
 from personas import get_persona
+from pipeline.fleet_client import FleetClient, FleetError
 
 USERNAME = "Sweet-Pea-Rudi19"
 AGENT_NAME = "riggs-archive"
@@ -43,6 +41,9 @@ SITE_ENV_LOCAL = _REPO / "site" / ".env.local"
 
 SYSTEM_PROMPT = get_persona("NASA_Riggs")
 
+# Shared keep-alive pool to the Willow fleet; ThreadingHTTPServer-safe
+FLEET = FleetClient(source="nasa-oral-chat")
+
 
 def _register_and_get_port() -> int:
     """Register with Willow agent_registry and get auto-assigned port."""
@@ -68,10 +69,10 @@ def _write_env_local(port: int):
 
 
 def _call_fleet(prompt: str) -> str:
-    r = llm_router.ask(prompt, preferred_tier="free")
-    if r and r.content:
-        return r.content.strip()
-    raise RuntimeError("All fleet providers failed")
+    try:
+        return FLEET.ask(prompt, tier="free").content.strip()
+    except FleetError as e:
+        raise RuntimeError(f"All fleet providers failed: {e}") from e
 
 
 class Handler(BaseHTTPRequestHandler):
@@ -0,0 +1,318 @@
+"""
+NASA Archive -- Fuzzy entity canonicalisation index
+===================================================
+Maps a newly extracted entity name onto the row that already exists for it,
+so "Pharaohs SC", "The Pharaohs Scooter Club" and "Pharoahs Scooter Club"
+all land on one oral_clubs row instead of three (ON CONFLICT (name) only
+catches exact repeats).
+
+Per table (oral_clubs, oral_persons, oral_locations, oral_events):
+
+  1. normalise: lowercase, punctuation dropped, "&" -> "and", "the"/"of"
+     dropped, club abbreviations expanded ("sc" -> "scooter club"); equal
+     normal forms match outright through a dict
+  2. candidates: an inverted index from character trigram to names, built
+     over each name's distinctive words ("pharaohs", not "scooter club").
+     A name within the table's edit budget shares all but 3 trigrams per
+     edit, so only names reaching that count are compared -- never the
+     whole table
+  3. verify: edit similarity (Levenshtein plus adjacent transpositions)
+     >= the table's threshold on the normal forms, *and* on the distinctive
+     words alone, word by word -- "scooter club" would otherwise pad "Ice
+     Scooter Club" close enough to "Ace Scooter Club". A short word (4
+     letters or fewer) may only have lost a letter, since any other edit
+     there makes a different word ("Rods"/"Mods", "Car"/"Bar", "USA"/
+     "Utah"). The numbers in both names
+     (digits or roman numerals) must agree too, so "Amerivespa 2005" never
+     merges into "Amerivespa 2006" nor "Slaughterhouse XV" into
+     "Slaughterhouse XVI"
+
+    index = EntityIndex()
+    index.add("oral_clubs", "Pharaohs Scooter Club")
+    index.canonical("oral_clubs", "Pharaohs SC")    # -> "Pharaohs Scooter Club"
+    index.resolve("oral_clubs", "Vespa Club Ohio")  # -> itself, now indexed
+
+Micro-benchmark (one-typo lookups over data/rallies titles):
+    python pipeline/entity_index.py --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+
+# Name column per oral_* table (oral_persons keys on club_name)
+NAME_COLUMNS = {
+    "oral_clubs":     "name",
+    "oral_persons":   "club_name",
+    "oral_locations": "name",
+    "oral_events":    "name",
+}
+# Minimum Levenshtein similarity (1 - distance / longer length) to merge
+THRESHOLDS = {"oral_persons": 0.92}
+DEFAULT_THRESHOLD = 0.86
+SHORT_WORD = 4   # distinctive words this short may only differ by a dropped letter
+
+ABBREVIATIONS = {
+    "sc":   "scooter club",
+    "mc":   "motor club",
+    "mcc":  "motorcycle club",
+    "vc":   "vespa club",
+    "lc":   "lambretta club",
+    "assn": "association",
+    "assoc": "association",
+    "intl": "international",
+    "st":   "saint",
+    "mt":   "mount",
+}
+
+# Words every other club/rally name has; left out of the trigram index so "scooter
+# club" doesn't make every club a candidate for every other (still compared
+# in the edit-distance check)
+GENERIC_WORDS = {
+    "scooter", "scooters", "scooterists", "club", "clubs", "vespa", "lambretta",
+    "motor", "motorcycle", "association", "international", "riders", "crew",
+    "rally", "run", "and",
+}
+STOPWORDS = {"the", "of"}
+
+_PUNCT = re.compile(r"[^\w\s]")
+_NUMBERS = re.compile(r"\b(?:\d+|[ivxl]+)\b")   # years, edition numbers, roman numerals
+
+
+def normalize(name: str) -> str:
+    text = _PUNCT.sub(lambda m: " and " if m.group() == "&" else ("" if m.group() in "'.’" else " "),
+                      (name or "").lower())
+    words = [ABBREVIATIONS.get(w, w) for w in text.split() if w not in STOPWORDS]
+    return " ".join(words)
+
+
+def _core(norm: str) -> str:
+    """The distinctive part of a normal form (falls back to all of it)."""
+    return " ".join(w for w in norm.split() if w not in GENERIC_WORDS) or norm
+
+
+def _dropped_letter(a: str, b: str) -> bool:
+    """True if the longer of a, b is the shorter plus one letter ("mle"/"mile")."""
+    if len(a) > len(b):
+        a, b = b, a
+    return len(b) == len(a) + 1 and any(b[:i] + b[i + 1:] == a for i in range(len(b)))
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str, floor: float = 0.0) -> float:
+    """
+    1 - edit distance / max length, where an edit is an insert, delete,
+    substitution or swap of adjacent characters ("pharoahs" is one edit from
+    "pharaohs"). Gives up early (returns 0.0) below floor.
+    """
+    if a == b:
+        return 1.0
+    longest = max(len(a), len(b))
+    budget = int((1 - floor) * longest + 1e-9)   # 1 - 1/7 must still allow one edit in 7
+    if abs(len(a) - len(b)) > budget:
+        return 0.0
+    before, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if before and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                d = min(d, before[j - 2] + 1)
+            cur.append(d)
+        if min(cur) > budget:
+            return 0.0
+        before, prev = prev, cur
+    return 1 - prev[-1] / longest
+
+
+class _TableIndex:
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self.names: list[str] = []            # canonical (stored) names
+        self.normal: list[str] = []
+        self.exact: dict[str, int] = {}       # normal form -> id
+        self.postings: dict[str, list[int]] = {}   # trigram of core -> ids
+
+    def add(self, name: str) -> None:
+        norm = normalize(name)
+        if not norm or norm in self.exact:
+            return
+        idx = len(self.names)
+        self.names.append(name)
+        self.normal.append(norm)
+        self.exact[norm] = idx
+        for gram in _trigrams(_core(norm)):
+            self.postings.setdefault(gram, []).append(idx)
+
+    def _edits(self, a: str, b: str) -> int:
+        return max(1, int((1 - self.threshold) * max(len(a), len(b))))
+
+    def _cores_agree(self, core: str, other: str) -> bool:
+        """
+        The distinctive words must be close on their own, not just padded out
+        by "scooter club": word by word, a long word may be the threshold's
+        share of edits (at least one) away, a short one only a dropped letter
+        ("ice"/"ace", "rods"/"mods", "usa"/"utah" all fail). Cores split into
+        different numbers of words (a lost space) are compared joined up.
+        """
+        words, other_words = core.split(), other.split()
+        if len(words) != len(other_words):
+            a, b = core.replace(" ", ""), other.replace(" ", "")
+            floor = 1 - self._edits(a, b) / max(len(a), len(b))
+            return similarity(a, b, floor=floor) >= floor
+        for a, b in zip(words, other_words):
+            if a == b:
+                continue
+            if min(len(a), len(b)) <= SHORT_WORD:
+                if not _dropped_letter(a, b):
+                    return False
+                continue
+            floor = 1 - self._edits(a, b) / max(len(a), len(b))
+            if similarity(a, b, floor=floor) < floor:
+                return False
+        return True
+
+    def match_pair(self, a: str, b: str) -> bool:
+        """Whether the verify step would merge names a and b."""
+        na, nb = normalize(a), normalize(b)
+        if na == nb:
+            return True
+        return (_NUMBERS.findall(na) == _NUMBERS.findall(nb)
+                and self._cores_agree(_core(na), _core(nb))
+                and similarity(na, nb, floor=self.threshold) >= self.threshold)
+
+    def match(self, name: str) -> str | None:
+        norm = normalize(name)
+        if not norm:
+            return None
+        idx = self.exact.get(norm)
+        if idx is not None:
+            return self.names[idx]
+        core = _core(norm)
+        grams = _trigrams(core)
+        edits = int((1 - self.threshold) * len(norm))
+        need = max(1, len(grams) - 3 * edits)
+        shared: dict[int, int] = {}
+        for gram in grams:
+            for idx in self.postings.get(gram, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+        candidates = [idx for idx, n in shared.items() if n >= need]
+        numbers = _NUMBERS.findall(norm)
+        best, best_score = None, self.threshold
+        for idx in candidates:
+            other = self.normal[idx]
+            if _NUMBERS.findall(other) != numbers or not self._cores_agree(core, _core(other)):
+                continue
+            score = similarity(norm, other, floor=best_score)
+            if score >= best_score:
+                best, best_score = idx, score
+        return self.names[best] if best is not None else None
+
+
+class EntityIndex:
+    """In-memory canonical names per oral_* table (see module docstring)."""
+
+    def __init__(self, thresholds: dict[str, float] | None = None) -> None:
+        self._thresholds = {**THRESHOLDS, **(thresholds or {})}
+        self._tables: dict[str, _TableIndex] = {}
+
+    def _table(self, table: str) -> _TableIndex:
+        index = self._tables.get(table)
+        if index is None:
+            index = self._tables[table] = _TableIndex(self._thresholds.get(table, DEFAULT_THRESHOLD))
+        return index
+
+    def add(self, table: str, name: str) -> None:
+        self._table(table).add(name)
+
+    def canonical(self, table: str, name: str) -> str | None:
+        """The existing name this one refers to, or None if it is new."""
+        return self._table(table).match(name)
+
+    def resolve(self, table: str, name: str) -> str:
+        """canonical() if known, else index name as a new entity and return it."""
+        found = self.canonical(table, name)
+        if found is not None:
+            return found
+        self.add(table, name)
+        return name
+
+    def __len__(self) -> int:
+        return sum(len(t.names) for t in self._tables.values())
+
+
+# ---- Benchmark -----------------------------------------------------------------
+
+def bench(lookups: int = 2000) -> None:
+    """Index every rally title under data/rallies as oral_events, then look up typo'd titles."""
+    import json
+    from pathlib import Path
+
+    rallies = Path(__file__).parent.parent / "data" / "rallies"
+    titles = sorted({
+        json.loads(p.read_text(encoding="utf-8")).get("title") or p.parent.name
+        for p in rallies.glob("*/meta.json")
+    })
+    index = EntityIndex()
+    started = time.perf_counter()
+    for title in titles:
+        index.add("oral_events", title)
+    built = time.perf_counter() - started
+
+    rng = random.Random(7)
+    probes = []
+    for _ in range(lookups):
+        title = rng.choice(titles)
+        i = rng.randrange(len(title))
+        probes.append((title, title[:i] + title[i + 1:]))   # one character dropped
+    started = time.perf_counter()
+    results = [index.canonical("oral_events", typo) for _, typo in probes]
+    per = (time.perf_counter() - started) / len(probes)
+    # A merge into a different title is only right if the two titles are the
+    # same entity -- the index would merge them itself (punctuation, an
+    # existing one-letter variant). Every other merge is a false merge.
+    events = index._table("oral_events")
+    back = same = 0
+    wrong = []
+    for (title, typo), found in zip(probes, results):
+        if found is None:
+            continue
+        if found == title:
+            back += 1
+        elif events.match_pair(title, found):
+            same += 1
+        else:
+            wrong.append((title, typo, found))
+    print(f"{len(titles)} rally titles indexed in {built * 1000:.0f} ms")
+    print(f"{len(probes)} one-typo lookups: {per * 1e6:.0f} us each; "
+          f"{back} back to their title, {same} to a title the index treats as the same, "
+          f"{len(wrong)} false merges, {len(probes) - back - same - len(wrong)} new")
+    for title, typo, found in sorted(set(wrong))[:20]:
+        print(f"  false merge: {title!r} typed as {typo!r} -> {found!r}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fuzzy entity canonicalisation index")
+    parser.add_argument("--bench", action="store_true", help="Benchmark one-typo lookups over rally titles")
+    parser.add_argument("--table", default="oral_clubs", choices=sorted(NAME_COLUMNS))
+    parser.add_argument("names", nargs="*", help="Names; each is matched against the ones before it")
+    args = parser.parse_args()
+    if args.bench:
+        bench()
+        return
+    index = EntityIndex()
+    for nm in args.names:
+        found = index.canonical(args.table, nm)
+        print(f"  {nm!r} -> {found!r}" if found else f"  {nm!r} (new)")
+        index.add(args.table, nm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+NASA Archive -- Shared Willow fleet client
+===========================================
+One HTTP client for every caller of the Willow fleet endpoint
+(enrich_rallies.py, pipeline/pretraining.py, local_oral_chat.py):
+
+  - keep-alive connection pool (requests.Session) and connect/read timeouts
+  - a concurrency cap shared by every thread using the client
+  - in-flight dedupe: identical (prompt, tier, task_type) requests made while
+    one is already running wait for that one instead of calling again
+  - per-call latency and token metrics, summarised by FleetClient.metrics
+
+    fleet = FleetClient()
+    resp = fleet.ask(prompt)            # FleetResponse(content, provider, latency, ...)
+    print(fleet.metrics.summary())
+
+ask() raises FleetError when the call fails (transport error, non-200, empty
+answer). Token counts come from the server's "usage" block when it sends one,
+otherwise they are estimated at 4 characters per token.
+
+Local stub server and benchmark (no Willow needed):
+  python pipeline/fleet_client.py --stub --port 8499 --latency 0.2
+  python pipeline/fleet_client.py --bench 200 --concurrency 16 --url http://localhost:8499/api/fleet/ask
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from requests.adapters import HTTPAdapter
+
+WILLOW_FLEET_URL = os.environ.get("WILLOW_FLEET_URL", "http://localhost:8420/api/fleet/ask")
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 60
+MAX_CONCURRENCY = 8
+
+
+class FleetError(RuntimeError):
+    def __init__(self, message: str, provider: str | None = None) -> None:
+        super().__init__(message)
+        self.provider = provider   # set when the server named the provider that failed
+
+
+@dataclass
+class FleetResponse:
+    content: str
+    provider: str
+    latency: float
+    prompt_tokens: int
+    completion_tokens: int
+    shared: bool = False   # True when this answer came from another caller's in-flight request
+
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class FleetMetrics:
+    """Thread-safe running totals for one FleetClient."""
+
+    calls: int = 0
+    errors: int = 0
+    deduped: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latencies: list = field(default_factory=list)
+    by_provider: dict = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, resp: FleetResponse | None) -> None:
+        with self._lock:
+            self.calls += 1
+            if resp is None:
+                self.errors += 1
+                return
+            self.latencies.append(resp.latency)
+            self.prompt_tokens += resp.prompt_tokens
+            self.completion_tokens += resp.completion_tokens
+            self.by_provider[resp.provider] = self.by_provider.get(resp.provider, 0) + 1
+
+    def record_dedupe(self) -> None:
+        with self._lock:
+            self.deduped += 1
+
+    def summary(self) -> str:
+        with self._lock:
+            lat = sorted(self.latencies)
+            if lat:
+                p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+                timing = f"latency p50 {statistics.median(lat):.2f}s p95 {p95:.2f}s"
+            else:
+                timing = "no successful calls"
+            providers = ", ".join(f"{p} {n}" for p, n in sorted(self.by_provider.items())) or "-"
+            return (
+                f"{self.calls} calls ({self.errors} failed, {self.deduped} deduped), {timing}, "
+                f"tokens {self.prompt_tokens} in / {self.completion_tokens} out, providers: {providers}"
+            )
+
+
+class FleetClient:
+    """Pooled, deduping, metered client for the Willow fleet endpoint (see module docstring)."""
+
+    def __init__(
+        self,
+        url: str = WILLOW_FLEET_URL,
+        max_concurrency: int = MAX_CONCURRENCY,
+        timeout: tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT),
+        source: str = "nasa-archive",
+    ) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.source = source
+        self.metrics = FleetMetrics()
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._inflight: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def ask(self, prompt: str, tier: str = "free", task_type: str | None = None) -> FleetResponse:
+        key = (prompt, tier, task_type)
+        with self._lock:
+            running = self._inflight.get(key)
+            if running is None:
+                future = self._inflight[key] = Future()
+        if running is not None:
+            self.metrics.record_dedupe()
+            resp = running.result()   # re-raises the owner's FleetError
+            return FleetResponse(**{**resp.__dict__, "shared": True})
+
+        try:
+            resp = self._post(prompt, tier, task_type)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(resp)
+            return resp
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _post(self, prompt: str, tier: str, task_type: str | None) -> FleetResponse:
+        payload = {"prompt": prompt, "tier": tier, "source": self.source}
+        if task_type:
+            payload["task_type"] = task_type
+        with self._slots:
+            started = time.perf_counter()
+            try:
+                r = self._session.post(self.url, json=payload, timeout=self.timeout)
+                latency = time.perf_counter() - started
+                if r.status_code != 200:
+                    raise FleetError(f"fleet returned HTTP {r.status_code}")
+                data = r.json()
+            except (requests.RequestException, ValueError) as e:
+                self.metrics.record(None)
+                raise FleetError(f"fleet request failed: {e}") from e
+            except FleetError:
+                self.metrics.record(None)
+                raise
+
+        content = data.get("response") or ""
+        if not content.strip():
+            self.metrics.record(None)
+            raise FleetError(f"empty answer from {data.get('provider', 'unknown')}", data.get("provider"))
+        usage = data.get("usage") or {}
+        resp = FleetResponse(
+            content=content,
+            provider=data.get("provider", "unknown"),
+            latency=latency,
+            prompt_tokens=usage.get("prompt_tokens") or _estimate_tokens(prompt),
+            completion_tokens=usage.get("completion_tokens") or _estimate_tokens(content),
+        )
+        self.metrics.record(resp)
+        return resp
+
+    def close(self) -> None:
+        self._session.close()
+
+
+# ---- Stub server + benchmark -----------------------------------------------
+
+def serve_stub(port: int, latency: float) -> None:
+    """Fleet-compatible stub: echoes the prompt length back after `latency` seconds."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, so pooling is measurable
+        disable_nagle_algorithm = True
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            time.sleep(latency)
+            prompt = body.get("prompt", "")
+            out = json.dumps({
+                "response": json.dumps({"echo_chars": len(prompt)}),
+                "provider": "stub",
+                "usage": {"prompt_tokens": _estimate_tokens(prompt), "completion_tokens": 8},
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    print(f"Stub fleet on http://127.0.0.1:{port}/api/fleet/ask (latency {latency}s)")
+    server.serve_forever()
+
+
+def bench(url: str, n: int, concurrency: int, distinct: int) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    client = FleetClient(url, max_concurrency=concurrency)
+    prompts = [f"benchmark prompt {i % distinct}" for i in range(n)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client.ask, prompts))
+    elapsed = time.perf_counter() - started
+    print(f"{n} asks, {distinct} distinct prompts, concurrency {concurrency}: "
+          f"{elapsed:.2f}s ({n / elapsed:.1f} asks/sec)")
+    print(f"  {client.metrics.summary()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Willow fleet client: stub server and benchmark")
+    parser.add_argument("--stub", action="store_true", help="Run a local stub fleet server")
+    parser.add_argument("--port", type=int, default=8499)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub response delay (seconds)")
+    parser.add_argument("--bench", type=int, metavar="N", help="Send N prompts and report metrics")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY)
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="Distinct prompts in the benchmark (default N; fewer exercises dedupe)")
+    parser.add_argument("--url", default=WILLOW_FLEET_URL)
+    args = parser.parse_args()
+
+    if args.stub:
+        serve_stub(args.port, args.latency)
+    elif args.bench:
+        bench(args.url, args.bench, args.concurrency, args.distinct or args.bench)
+    else:
+        parser.error("pass --stub or --bench N")
+
+
+if __name__ == "__main__":
+    main()
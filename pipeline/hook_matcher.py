@@ -0,0 +1,190 @@
+"""
+NASA Archive -- Hook trigger matcher
+=====================================
+Finds every NASA hook trigger (pretraining.HOOKS) in a text chunk in one
+pass, with positions, honouring word boundaries -- so "run" no longer fires
+on "brunch", "ace" on "place" or "shop" on "workshop". Plurals and
+possessives still count: "vespas", "garages", "rallies", "gabe's".
+
+With pyahocorasick installed, every trigger (and its plural/possessive
+forms) goes into one Aho-Corasick automaton that walks the lowercased chunk
+once and reports every occurrence, overlapping ones included ("vespa" and
+"motorsport" inside "vespa motorsport podcast"); hits not on word boundaries
+are dropped. That is faster than the old substring test, which ran one scan
+per trigger.
+
+Without it, the triggers compile into one trie-shaped regex (shared prefixes
+factored out, scraper/location_matcher.py's trie_pattern). Each search
+resumes one character after the previous hit's start, and shorter triggers
+that are a word-prefix of a longer one at the same start are expanded from a
+table built at compile time, so the hits are the same -- at roughly three
+quarters of the substring test's speed.
+
+Faster with: pip install pyahocorasick
+
+    matcher = HookMatcher(HOOKS)
+    matcher.find_all(chunk)   # [(trigger, start, end), ...] in text order
+    matcher.hooks(chunk)      # {"rally": [(start, end), ...], ...} in HOOKS order
+
+Micro-benchmark against the old substring test, over the repo's own prose:
+    python pipeline/hook_matcher.py --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+_SCRAPER = str(Path(__file__).parent.parent / "scraper")
+if _SCRAPER not in sys.path:
+    sys.path.append(_SCRAPER)
+from location_matcher import trie_pattern  # noqa: E402
+
+try:
+    import ahocorasick  # type: ignore
+except ImportError:   # the trie regex is used instead
+    ahocorasick = None
+
+# Plural or possessive ending allowed after any trigger
+SUFFIXES = ("s", "es", "'s", "\u2019s")
+SUFFIX = r"(?:e?s|['\u2019]s)?"   # the same endings, for the regex
+
+
+def _normalize(trigger: str) -> str:
+    return " ".join(trigger.lower().split())
+
+
+def _forms(trigger: str) -> list[str]:
+    """The trigger plus its -y -> -ies plural ("rally" -> "rallies"); -s/-es are in the regex."""
+    if len(trigger) > 2 and trigger[-1] == "y" and trigger[-2] not in "aeiou":
+        return [trigger, trigger[:-1] + "ies"]
+    return [trigger]
+
+
+class HookMatcher:
+    """Compiled matcher over {hook: [trigger, ...]} (see module docstring)."""
+
+    def __init__(self, hooks: dict[str, list[str]]) -> None:
+        self.order = list(hooks)
+        self._hooks_for: dict[str, list[str]] = {}    # trigger -> hooks it belongs to
+        for hook, triggers in hooks.items():
+            for trigger in triggers:
+                self._hooks_for.setdefault(_normalize(trigger), []).append(hook)
+        triggers = sorted(self._hooks_for)
+        self._trigger_for = {form: t for t in triggers for form in _forms(t)}
+        # Longest match wins at a start position; these are the shorter
+        # triggers hiding at the front of it, as (trigger, length)
+        self._prefixes = {
+            t: [(p, len(p)) for p in triggers if p != t and t.startswith(p) and not t[len(p)].isalnum()]
+            for t in triggers
+        }
+        # Triggers are lowercase and the text is lowercased once, which is
+        # markedly faster in re than IGNORECASE
+        self._regex = re.compile(r"\b(" + trie_pattern(sorted(self._trigger_for)) + ")" + SUFFIX + r"\b")
+        self._automaton = None
+        if ahocorasick is not None:
+            words = {}
+            for suffix in SUFFIXES + ("",):   # a trigger itself wins over another's plural
+                for form, trigger in self._trigger_for.items():
+                    words[form + suffix] = (trigger, len(form) + len(suffix))
+            self._automaton = ahocorasick.Automaton()
+            for word, value in words.items():
+                self._automaton.add_word(word, value)
+            self._automaton.make_automaton()
+
+    def find_all(self, text: str) -> list[tuple[str, int, int]]:
+        lower = (text or "").lower()
+        if self._automaton is not None:
+            return self._find_automaton(lower)
+        search = self._regex.search
+        hits = []
+        m = search(lower)
+        while m:
+            start, end = m.span()
+            trigger = self._trigger_for[_normalize(m.group(1))]
+            hits.append((trigger, start, end))
+            for prefix, length in self._prefixes.get(trigger, ()):
+                hits.append((prefix, start, start + length))
+            m = search(lower, start + 1)
+        return hits
+
+    def _find_automaton(self, lower: str) -> list[tuple[str, int, int]]:
+        size = len(lower)
+        longest: dict[tuple[str, int], int] = {}
+        for last, (trigger, length) in self._automaton.iter(lower):
+            start, end = last - length + 1, last + 1
+            if start and (lower[start - 1].isalnum() or lower[start - 1] == "_"):
+                continue
+            if end < size and (lower[end].isalnum() or lower[end] == "_"):
+                continue
+            # iter() reports in end order, so "rally's" replaces "rally"
+            longest[trigger, start] = end
+        hits = [(trigger, start, end) for (trigger, start), end in longest.items()]
+        hits.sort(key=lambda hit: (hit[1], -hit[2]))
+        return hits
+
+    def hooks(self, text: str) -> dict[str, list[tuple[int, int]]]:
+        found: dict[str, list[tuple[int, int]]] = {}
+        for trigger, start, end in self.find_all(text):
+            for hook in self._hooks_for[trigger]:
+                found.setdefault(hook, []).append((start, end))
+        return {hook: found[hook] for hook in self.order if hook in found}
+
+
+def bench(rounds: int = 20, chunk_words: int = 1500) -> None:
+    from pretraining import HOOKS
+
+    repo = Path(__file__).parent.parent
+    words: list[str] = []
+    for path in sorted(repo.glob("*.md")) + sorted((repo / "docs").glob("**/*.md")):
+        words += path.read_text(encoding="utf-8", errors="replace").split()
+    for path in sorted((repo / "data" / "rallies").glob("*/meta.json")):
+        words += path.read_text(encoding="utf-8").split()
+    chunks = [" ".join(words[i:i + chunk_words]) for i in range(0, len(words), chunk_words - 100)]
+
+    def substring(chunk):
+        lower = chunk.lower()
+        return [hook for hook, triggers in HOOKS.items() if any(t in lower for t in triggers)]
+
+    regex = HookMatcher(HOOKS)
+    regex._automaton = None
+    matchers = [("substring any()", substring), ("trie regex + \\b", regex.hooks)]
+    if ahocorasick is not None:
+        matchers.append(("aho-corasick + \\b", HookMatcher(HOOKS).hooks))
+    else:
+        print("pyahocorasick not installed -- timing the regex fallback only")
+
+    def rate(fn):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for chunk in chunks:
+                fn(chunk)
+        return rounds * len(chunks) / (time.perf_counter() - started)
+
+    print(f"{len(chunks)} chunks of {chunk_words} words x {rounds} rounds")
+    for name, fn in matchers:
+        hits = sum(len(fn(c)) for c in chunks)
+        sent = sum(1 for c in chunks if fn(c))
+        print(f"  {name:<19}: {rate(fn):>10,.0f} chunks/sec  {hits} hook hits, {sent} chunks sent")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="NASA hook trigger matcher")
+    parser.add_argument("--bench", action="store_true", help="Benchmark against the substring test")
+    parser.add_argument("text", nargs="*", help="Text to match")
+    args = parser.parse_args()
+    if args.bench:
+        bench()
+        return
+    from pretraining import HOOKS
+
+    text = " ".join(args.text)
+    for hook, spans in HookMatcher(HOOKS).hooks(text).items():
+        print(f"  {hook}: " + ", ".join(f"{text[s:e]!r}@{s}" for s, e in spans))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+NASA Archive -- Content-addressed LLM response cache
+=====================================================
+Raw fleet responses stored in a local SQLite file, keyed by
+sha256(prompt template version, tier, rendered prompt). A re-run over
+unchanged inputs -- after a crash, or after fixing a downstream parser --
+costs zero fleet calls.
+
+Used by enrich_rallies.py (enrich_one) and pipeline/pretraining.py
+(extract_entities_from_text). Bump the caller's template version constant
+whenever its prompt changes meaning, so old answers stop matching.
+
+    cache = LLMCache()
+    key = LLMCache.key(prompt, "free", "enrich-v1")
+    resp = cache.get(key)                 # CachedResponse(content, provider) or None
+    if resp is None:
+        resp = ask_fleet(prompt)
+        cache.put(key, resp.content, resp.provider)
+
+Eviction runs once when the cache is opened: entries older than
+max_age_days are dropped, then least-recently-used entries until the
+stored responses fit in max_mb. read=False (the --no-cache flag) skips
+lookups but still stores fresh responses, refreshing the cache.
+
+Output:
+    data/llm_cache.sqlite   -- responses(key PRIMARY KEY, version, tier, provider, content, ...)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+CACHE_PATH = Path(__file__).parent.parent / "data" / "llm_cache.sqlite"
+MAX_AGE_DAYS = 180
+MAX_MB = 256
+
+CachedResponse = namedtuple("CachedResponse", "content provider")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key        TEXT PRIMARY KEY,
+    version    TEXT NOT NULL,
+    tier       TEXT NOT NULL,
+    provider   TEXT,
+    content    TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    used_at    REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at);
+"""
+
+
+class LLMCache:
+    """Thread-safe SQLite response cache (see module docstring)."""
+
+    def __init__(
+        self,
+        path: str | Path = CACHE_PATH,
+        max_age_days: float = MAX_AGE_DAYS,
+        max_mb: float = MAX_MB,
+        read: bool = True,
+    ) -> None:
+        self.path = Path(path)
+        self.read = read
+        self.max_age_days = max_age_days
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.evict()
+
+    @staticmethod
+    def key(prompt: str, tier: str, version: str) -> str:
+        h = hashlib.sha256()
+        for part in (version, tier, prompt):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key: str) -> CachedResponse | None:
+        if not self.read:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, provider FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (time.time(), key))
+        return CachedResponse(row[0], row[1])
+
+    def put(self, key: str, content: str, provider: str | None, tier: str = "free", version: str = "") -> None:
+        if not content:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, version, tier, provider, content, size, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, version, tier, provider, content, len(content.encode("utf-8")), now, now),
+            )
+
+    def discard(self, key: str) -> None:
+        """Drop an entry the caller couldn't use (e.g. the response wasn't valid JSON)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def evict(self) -> int:
+        """Apply the age and size limits. Returns number of entries removed."""
+        with self._lock:
+            cutoff = time.time() - self.max_age_days * 86400
+            removed = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,)).rowcount
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                # Walk least-recently-used first and cut once the rest fits
+                excess = total - self.max_bytes
+                doomed = []
+                for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY used_at"):
+                    if excess <= 0:
+                        break
+                    doomed.append((key,))
+                    excess -= size
+                self._conn.execute("BEGIN")
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+                self._conn.execute("COMMIT")
+                removed += len(doomed)
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
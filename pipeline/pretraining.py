@@ -14,9 +14,13 @@ Public sources:
   3. Club/rally web archives (Modern Vespa, club sites, obituaries)
 
 Usage:
-  python pipeline/pretraining.py --source scootnet
+  python pipeline/pretraining.py --source scootnet [--bulk]
   python pipeline/pretraining.py --source podcast --path /path/to/ep4.mp3
+  python pipeline/pretraining.py --source podcast --path /path/to/episodes/   (or feed.rss / manifest.json)
+  python pipeline/pretraining.py --source podcast --path /path/to/ep4.mp3 --stream
   python pipeline/pretraining.py --source web --url https://modernvespa.com/...
+  python pipeline/pretraining.py --source web --urls https://club.example/sitemap.xml   (or urls.txt)
+  python pipeline/pretraining.py --source web --url https://club.example/ --crawl 50
   python pipeline/pretraining.py --source willow [--willow-username Sweet-Pea-Rudi19]
 """
 
@@ -27,44 +31,42 @@ import logging
 import os
 import sys
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
 import requests
-from bs4 import BeautifulSoup
 
-# Willow fleet API -- calls Willow server instead of importing core directly
-import requests as _fleet_requests
+_REPO = Path(__file__).parent.parent
+if str(_REPO) not in sys.path:
+    sys.path.insert(0, str(_REPO))
+from pipeline.fleet_client import FleetClient, FleetError
+from pipeline.hook_matcher import HookMatcher
+from pipeline import transcripts, web_ingest
+from pipeline.entity_index import NAME_COLUMNS, EntityIndex
+from pipeline.llm_cache import LLMCache
 
-WILLOW_FLEET_URL = "http://localhost:8420/api/fleet/ask"
+# Willow fleet API -- calls Willow server instead of importing core directly.
+# One pooled client per process, shared by every pipeline instance.
+_FLEET = FleetClient()
+EXTRACT_WORKERS = 4   # parallel chunk extractions per text
 
 
 def _fleet_ask(prompt: str, tier: str = "free"):
-    """Call Willow's fleet endpoint."""
+    """Call Willow's fleet endpoint. Returns a FleetResponse, or None on failure."""
     try:
-        r = _fleet_requests.post(
-            WILLOW_FLEET_URL,
-            json={"prompt": prompt, "tier": tier, "source": "nasa-archive"},
-            timeout=60,
-        )
-        if r.status_code == 200:
-            data = r.json()
-
-            class _R:
-                content  = data.get("response", "")
-                provider = data.get("provider", "unknown")
-
-            return _R()
-    except Exception:
-        pass
-    return None
+        return _FLEET.ask(prompt, tier=tier)
+    except FleetError:
+        return None
 
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
 log = logging.getLogger("pretraining")
 
 # ---- NASA Hook Triggers ----------------------------------------------------
-# Applied to text chunks. If any trigger matches, extract entities from that chunk.
+# Applied to text chunks. If any trigger matches (as whole words), extract
+# entities from that chunk.
 
 HOOKS: dict[str, list[str]] = {
     "importance":   ["very well known", "legendary", "iconic", "founder of", "started the"],
@@ -84,6 +86,43 @@ HOOKS: dict[str, list[str]] = {
                      "sqream", "pub scouts", "blue smoke", "jett sett", "hard pack"],
 }
 
+HOOK_MATCHER = HookMatcher(HOOKS)
+
+# Willow import: confidence for atoms n co-occurrence hops from the narrator
+# entity (0 hops is always oral_history_consented/high; unlisted -> low)
+HOP_CONFIDENCE = {1: "medium"}
+
+# Extracted entity_type -> the oral_* table it is written to
+_ENTITY_TABLES = {
+    "rally":  "oral_events",
+    "club":   "oral_clubs",
+    "person": "oral_persons",
+    "shop":   "oral_locations",
+    "venue":  "oral_locations",
+}
+
+
+def _iter_chunks(texts, chunk_size: int = 1500):
+    """
+    chunk_size-word chunks with a 100-word overlap over a stream of text
+    pieces (a whole document, or Whisper segments as they arrive). A chunk
+    is yielded as soon as its last word has arrived; the sequence is the
+    same whether the text comes in one piece or many.
+    """
+    step = chunk_size - 100
+    words: list[str] = []
+    for text in texts:
+        words.extend(text.split())
+        while len(words) >= chunk_size:
+            yield " ".join(words[:chunk_size])
+            del words[:step]
+    while words:
+        yield " ".join(words[:chunk_size])
+        del words[:step]
+
+# Bump when EXTRACT_PROMPT changes meaning, so cached responses stop matching
+EXTRACT_PROMPT_VERSION = "extract-v1"
+
 EXTRACT_PROMPT = """\
 You are an archivist for the North America Scooter Archive (NASA).
 Extract structured entities from the following text.
@@ -123,17 +162,28 @@ class PreTrainingPipeline:
 
     DATA_DIR = Path(__file__).parent.parent / "data" / "rallies"
 
-    def __init__(self, dry_run: bool = False) -> None:
+    def __init__(
+        self, dry_run: bool = False, use_cache: bool = True, extract_workers: int = EXTRACT_WORKERS
+    ) -> None:
         self.dry_run = dry_run
+        # Concurrent fleet calls per extract_entities_from_text (the shared
+        # client's own cap still applies across every caller)
+        self.extract_workers = extract_workers
+        self._entity_index: EntityIndex | None = None   # loaded on first write
+        # Fleet responses are cached by prompt; use_cache=False re-asks but still stores
+        self.llm_cache = LLMCache(read=use_cache)
         if not dry_run:
             # Import lazily so dry_run works without WILLOW_DB_URL set
             import sys as _sys
             _repo = Path(__file__).parent.parent
             if str(_repo) not in _sys.path:
                 _sys.path.insert(0, str(_repo))
+            from archive_db.batch import BatchUpserter
             from archive_db.db import get_connection, init_schema
             self._get_connection = get_connection
             init_schema()
+            # _upsert buffers here; flushed by size/age and by flush()
+            self._writer = BatchUpserter(get_connection)
 
     # ---- Internal DB helpers ------------------------------------------------
 
@@ -143,30 +193,20 @@ class PreTrainingPipeline:
 
     def _upsert(self, table: str, record: dict, conflict_col: str = "name") -> None:
         """
-        Idempotent insert. Existing rows matching conflict_col are ignored (DO NOTHING).
-        For known tables the conflict target in core/db._PG_CONFLICT_TARGETS handles updates.
+        Idempotent insert, buffered. Existing rows matching conflict_col are ignored
+        (DO NOTHING). Rows reach Postgres in multi-row batches, one transaction per
+        flush -- call flush() before reading them back.
         """
         if self.dry_run:
             return
-        # Remove None values -- Postgres rejects null for non-nullable cols
-        clean = {k: v for k, v in record.items() if v is not None}
-        if not clean:
+        self._writer.add(table, record, conflict_col=conflict_col)
+
+    def flush(self) -> None:
+        """Write any buffered upserts and log the running rows/sec."""
+        if self.dry_run:
             return
-        cols   = list(clean.keys())
-        vals   = list(clean.values())
-        ph     = ", ".join(["%s"] * len(cols))
-        col_list = ", ".join(cols)
-        sql = (
-            f"INSERT INTO {table} ({col_list}) VALUES ({ph}) "
-            f"ON CONFLICT ({conflict_col}) DO NOTHING"
-        )
-        try:
-            with self._conn() as conn:
-                cur = conn.cursor()
-                cur.execute(sql, vals)
-                conn.commit()
-        except Exception as e:
-            log.warning("Upsert failed %s %s: %s", table, clean.get("name", "?"), e)
+        self._writer.flush()
+        log.info("Upserts: %s", self._writer.stats())
 
     def _select_one(self, table: str, col: str, val) -> dict | None:
         """Return first row where col = val, or None."""
@@ -182,6 +222,17 @@ class PreTrainingPipeline:
             log.warning("Select failed %s.%s=%s: %s", table, col, val, e)
             return None
 
+    def _select_column(self, table: str, col: str, like: str) -> set:
+        """
+        Every value of col matching a LIKE pattern, in one query. Errors
+        propagate: callers use the result to skip work, and an empty set on
+        failure would redo all of it.
+        """
+        with self._conn() as conn:
+            cur = conn.cursor()
+            cur.execute(f"SELECT {col} FROM {table} WHERE {col} LIKE %s", (like,))
+            return {row[0] for row in cur.fetchall()}
+
     def _insert_one(self, table: str, record: dict) -> str | None:
         """Insert a row and return the generated UUID id, or None on failure."""
         clean = {k: v for k, v in record.items() if v is not None}
@@ -205,25 +256,20 @@ class PreTrainingPipeline:
 
     # ---- Source: scoot.net rally metadata -----------------------------------
 
-    def process_rally_data(self) -> int:
-        """
-        Walk data/rallies/{slug}/meta.json and upsert each rally into oral_events.
-        Returns number of records upserted.
-        """
-        count = 0
+    RALLY_COLUMNS = ("name", "event_year", "archive_slug", "source_type", "confidence", "sources")
+
+    def _rally_records(self):
+        """One oral_events record per data/rallies/{slug}/meta.json, in slug order."""
         for meta_path in sorted(self.DATA_DIR.glob("*/meta.json")):
-            with open(meta_path, encoding="utf-8") as f:
-                meta = json.load(f)
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
 
             dir_slug    = meta_path.parent.name
             meta_slug   = meta.get("slug") or dir_slug
             title       = meta.get("title") or dir_slug
-            year        = meta.get("year")
-            photo_count = meta.get("photo_count", 0)
 
-            record = {
+            yield {
                 "name":         title,
-                "event_year":   year,
+                "event_year":   meta.get("year"),
                 "archive_slug": dir_slug,
                 "source_type":  "public_record",
                 "confidence":   "high",
@@ -233,45 +279,138 @@ class PreTrainingPipeline:
                     "timestamp":  None,
                     "confidence": "high",
                 }]),
-            }
+            }, meta.get("photo_count", 0)
 
+    def process_rally_data(self, bulk: bool = False) -> int:
+        """
+        Walk data/rallies/{slug}/meta.json and upsert each rally into oral_events.
+        bulk=True loads them all with COPY and one merge (process_rally_data_bulk).
+        Returns number of records upserted.
+        """
+        if bulk:
+            return self.process_rally_data_bulk()
+        count = 0
+        for record, photo_count in self._rally_records():
             if self.dry_run:
                 if count < 5 or count % 200 == 0:
-                    log.info("[DRY RUN] oral_events: %s (%s) photos=%s", title, year, photo_count)
+                    log.info("[DRY RUN] oral_events: %s (%s) photos=%s",
+                             record["name"], record["event_year"], photo_count)
             else:
                 self._upsert("oral_events", record, conflict_col="archive_slug")
             count += 1
             if count % 100 == 0:
                 log.info("Processed %d rallies...", count)
 
+        self.flush()
         action = "would upsert" if self.dry_run else "upserted"
         log.info("Rally data: %d records %s", count, action)
         return count
 
+    def process_rally_data_bulk(self) -> int:
+        """
+        Every rally in one transaction: COPY into a temp table, then a single
+        INSERT ... ON CONFLICT (archive_slug) DO UPDATE that rewrites only rows
+        whose name/year/sources actually changed. Returns number of records read.
+        """
+        started = time.perf_counter()
+        rows = [tuple(record[c] for c in self.RALLY_COLUMNS) for record, _ in self._rally_records()]
+        parsed = time.perf_counter() - started
+        if self.dry_run:
+            log.info("[DRY RUN] Rally data: %d records read in %.2fs, would bulk load", len(rows), parsed)
+            return len(rows)
+
+        from archive_db.batch import copy_upsert
+
+        inserted, updated = copy_upsert(
+            self._get_connection, "oral_events", self.RALLY_COLUMNS, rows, "archive_slug"
+        )
+        log.info(
+            "Rally data: %d records (%d new, %d changed, %d unchanged) in %.2fs (%.2fs reading meta.json)",
+            len(rows), inserted, updated, len(rows) - inserted - updated,
+            time.perf_counter() - started, parsed,
+        )
+        return len(rows)
+
     # ---- Source: Podcast audio ----------------------------------------------
 
     def process_podcast(self, mp3_path: str | Path, episode_url: str = "") -> list[dict]:
         """
         Transcribe a podcast MP3 with Whisper, then extract entities.
+        Transcripts are cached by audio hash (pipeline/transcripts.py), so
+        re-running extraction over the same MP3 skips Whisper entirely.
         Requires: pip install openai-whisper
         """
         try:
-            import whisper  # type: ignore
+            transcript = transcripts.transcribe(mp3_path)
         except ImportError:
             log.error("openai-whisper not installed. Run: pip install openai-whisper")
             return []
+        return self._extract_podcast(transcript["text"], episode_url or str(mp3_path))
 
-        log.info("Transcribing %s ...", mp3_path)
-        model = whisper.load_model("base")
-        result = model.transcribe(str(mp3_path))
-        text: str = result["text"]
+    def process_podcast_batch(self, manifest: str | Path, workers: int | None = None) -> list[dict]:
+        """
+        Transcribe every episode named by a directory / feed / manifest (see
+        pipeline/transcripts.py) across a process pool of `workers` (default:
+        CPU count), extracting each episode as soon as its transcript is ready.
+        Requires: pip install openai-whisper
+        """
+        episodes = transcripts.read_manifest(manifest)
+        log.info("Podcast batch: %d episodes from %s", len(episodes), manifest)
+        entities: list[dict] = []
+        for episode, transcript in transcripts.transcribe_many(episodes, workers=workers):
+            entities.extend(self._extract_podcast(transcript["text"], episode.url or str(episode.path)))
+        return entities
 
+    def process_podcast_stream(
+        self, mp3_path: str | Path, episode_url: str = "", chunk_size: int = 1500
+    ) -> list[dict]:
+        """
+        Transcribe and extract at the same time: Whisper segments feed the
+        chunker as they are produced, each completed chunk goes to the fleet
+        on the extraction pool while later audio is still transcribing, and
+        entities are written as their chunks come back (in chunk order, with
+        the same dedupe as extract_entities_from_text). An episode takes about
+        max(transcribe, extract) instead of their sum.
+        Requires: pip install openai-whisper
+        """
         source = {
             "type":       "podcast",
             "url":        episode_url or str(mp3_path),
             "timestamp":  None,
             "confidence": "high",
         }
+        written: list[dict] = []
+        seen: set[tuple] = set()
+        pending: deque = deque()
+
+        def drain(wait: bool) -> None:
+            while pending and (wait or pending[0].done()):
+                parsed = self._tag_entities(pending.popleft().result(), source)
+                new = self._dedupe_entities(parsed, seen)
+                if new:
+                    self._write_entities(new)
+                    written.extend(new)
+
+        segments = (seg["text"] for seg in transcripts.stream_segments(mp3_path))
+        with ThreadPoolExecutor(max_workers=self.extract_workers) as pool:
+            try:
+                for chunk in _iter_chunks(segments, chunk_size):
+                    prompt = self._chunk_prompt(chunk)
+                    if prompt:
+                        pending.append(pool.submit(self._extract_chunk, prompt))
+                    drain(wait=False)
+            except ImportError:
+                log.error("openai-whisper not installed. Run: pip install openai-whisper")
+            drain(wait=True)
+        return written
+
+    def _extract_podcast(self, text: str, url: str) -> list[dict]:
+        source = {
+            "type":       "podcast",
+            "url":        url,
+            "timestamp":  None,
+            "confidence": "high",
+        }
         entities = self.extract_entities_from_text(text, source)
         self._write_entities(entities)
         return entities
@@ -289,11 +428,31 @@ class PreTrainingPipeline:
             log.error("Fetch failed %s: %s", url, e)
             return []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-        for tag in soup(["nav", "footer", "script", "style"]):
-            tag.decompose()
-        text = soup.get_text(separator=" ", strip=True)
+        text, _ = web_ingest.parse_html(resp.text, url)
+        return self._extract_web(text, url)
+
+    def process_web_pages(
+        self,
+        urls: list[str],
+        crawl: int = 0,
+        workers: int = web_ingest.FETCH_WORKERS,
+        host_delay: float = web_ingest.HOST_DELAY,
+    ) -> list[dict]:
+        """
+        Fetch many public pages concurrently (see pipeline/web_ingest.py) and
+        extract entities from each as it arrives. Pages with a body identical
+        to one already fetched are skipped before extraction. With crawl > 0,
+        same-host links are followed up to that many pages.
+        """
+        entities: list[dict] = []
+        pages = 0
+        for page in web_ingest.iter_pages(urls, crawl=crawl, workers=workers, host_delay=host_delay):
+            pages += 1
+            entities.extend(self._extract_web(page.text, page.url))
+        log.info("Web: %d unique pages, %d entities", pages, len(entities))
+        return entities
 
+    def _extract_web(self, text: str, url: str) -> list[dict]:
         source = {"type": "web_archive", "url": url, "timestamp": None, "confidence": "medium"}
         entities = self.extract_entities_from_text(text, source)
         self._write_entities(entities)
@@ -305,6 +464,7 @@ class PreTrainingPipeline:
         self,
         username: str = "Sweet-Pea-Rudi19",
         sean_entity_id: int = 2,
+        max_hops: int = 1,
     ) -> dict:
         """
         Import scootering narrative atoms from Willow's knowledge table
@@ -313,11 +473,16 @@ class PreTrainingPipeline:
         Confidence weighting by graph distance from Sean Campbell entity[2]:
           Direct Sean connection -> oral_history_consented, high
           1-hop (atoms sharing an entity with Sean's atoms) -> public_record, medium
+          n-hop, up to max_hops -> public_record, HOP_CONFIDENCE[n] (default low)
           No Sean connection -> public_record, low
+        Each story's source entry records its graph_hops (None if unconnected).
 
         Returns dict with inserted counts per table.
         """
         from archive_db.db import get_willow_knowledge_connection
+        from archive_db.knowledge_search import (
+            SCOOTER_CATS, SCOOTER_TERMS, has_search_index, search_sql,
+        )
 
         log.info("Connecting to Willow knowledge (PG schema sweet_pea_rudi19)...")
         wconn = get_willow_knowledge_connection()
@@ -327,55 +492,50 @@ class PreTrainingPipeline:
             wconn.row_factory = _sqlite3.Row
             wcur = wconn.cursor()
 
-            # -- Build graph-distance sets ------------------------------------
-
-            wcur.execute(
-                "SELECT knowledge_id FROM knowledge_entities WHERE entity_id = %s",
-                (sean_entity_id,),
-            )
-            sean_atom_ids: set[int] = {r[0] for r in wcur.fetchall()}
+            # -- Graph distance from the narrator entity -----------------------
+            # One recursive query, breadth-first: each row of `level` is a whole
+            # hop's frontier, and `seen` every entity reached so far, so each
+            # entity is expanded once, at its shortest depth (a per-entity
+            # recursion would re-expand it at every deeper level it is reached
+            # again). Each atom's hops = the smallest depth of any entity it
+            # mentions (0 = mentions Sean).
 
             wcur.execute(
                 """
-                SELECT DISTINCT ke2.entity_id
-                FROM knowledge_entities ke1
-                JOIN knowledge_entities ke2 ON ke1.knowledge_id = ke2.knowledge_id
-                WHERE ke1.entity_id = %s AND ke2.entity_id != %s
+                WITH RECURSIVE level (frontier, seen, depth) AS (
+                    SELECT ARRAY[%s::bigint], ARRAY[%s::bigint], 0
+                  UNION ALL
+                    SELECT nxt.ids, l.seen || nxt.ids, l.depth + 1
+                    FROM level l
+                    CROSS JOIN LATERAL (
+                        SELECT array_agg(DISTINCT ke2.entity_id::bigint) AS ids
+                        FROM knowledge_entities ke1
+                        JOIN knowledge_entities ke2 ON ke2.knowledge_id = ke1.knowledge_id
+                        WHERE ke1.entity_id = ANY (l.frontier)
+                          AND ke2.entity_id <> ALL (l.seen)
+                    ) nxt
+                    WHERE l.depth < %s AND nxt.ids IS NOT NULL
+                )
+                SELECT ke.knowledge_id, MIN(l.depth) AS hops
+                FROM level l
+                CROSS JOIN LATERAL unnest(l.frontier) AS f (entity_id)
+                JOIN knowledge_entities ke ON ke.entity_id = f.entity_id
+                GROUP BY ke.knowledge_id
                 """,
-                (sean_entity_id, sean_entity_id),
+                (sean_entity_id, sean_entity_id, max_hops),
             )
-            sean_adjacent: set[int] = {r[0] for r in wcur.fetchall()}
-
-            hop1_ids: set[int] = set()
-            if sean_adjacent:
-                placeholders = ", ".join(["%s"] * len(sean_adjacent))
-                wcur.execute(
-                    f"SELECT DISTINCT knowledge_id FROM knowledge_entities "
-                    f"WHERE entity_id IN ({placeholders})",
-                    list(sean_adjacent),
-                )
-                hop1_ids = {r[0] for r in wcur.fetchall()} - sean_atom_ids
+            atom_hops: dict[int, int] = {r["knowledge_id"]: r["hops"] for r in wcur.fetchall()}
+            sean_atom_ids = {k for k, h in atom_hops.items() if h == 0}
 
             # -- Query scootering atoms ---------------------------------------
 
-            SCOOTER_TERMS = ["pharaoh", "scoot", "rally", "vespa", "lambretta", "camp scoot", "patch"]
-            SCOOTER_CATS  = ("narrative", "personal", "personal_document", "archive", "media")
-            cat_ph    = ", ".join(["%s"] * len(SCOOTER_CATS))
-            kw_conds  = " OR ".join(
-                "(LOWER(title) LIKE %s OR LOWER(summary) LIKE %s OR LOWER(content_snippet) LIKE %s)"
-                for _ in SCOOTER_TERMS
-            )
-            params: list = list(SCOOTER_CATS)
-            for t in SCOOTER_TERMS:
-                params += [f"%{t}%", f"%{t}%", f"%{t}%"]
-
-            wcur.execute(
-                f"SELECT id, title, summary, content_snippet, category, created_at "
-                f"FROM knowledge "
-                f"WHERE category IN ({cat_ph}) AND ({kw_conds}) "
-                f"ORDER BY id",
-                params,
-            )
+            # One trigram-indexed LIKE ANY over title/summary/snippet instead of
+            # 21 OR'd LIKEs (see archive_db/knowledge_search.py)
+            if not has_search_index(wconn):
+                log.warning("Knowledge search index missing; scanning. Build it once with: "
+                            "python archive_db/knowledge_search.py --create-index")
+            sql, params = search_sql(SCOOTER_TERMS, SCOOTER_CATS)
+            wcur.execute(sql, params)
             scoot_rows = wcur.fetchall()
 
         finally:
@@ -390,12 +550,15 @@ class PreTrainingPipeline:
                 seen.add(rid)
                 atoms.append(row)
 
-        sean_in_batch = sum(1 for a in atoms if a["id"] in sean_atom_ids)
+        by_hops: dict = {}
+        for a in atoms:
+            hops = atom_hops.get(a["id"])
+            by_hops[hops] = by_hops.get(hops, 0) + 1
         log.info(
-            "Willow import: %d scootering atoms (%d Sean-direct, %d 1-hop, %d other)",
-            len(atoms), sean_in_batch,
-            sum(1 for a in atoms if a["id"] in hop1_ids),
-            sum(1 for a in atoms if a["id"] not in sean_atom_ids and a["id"] not in hop1_ids),
+            "Willow import: %d scootering atoms (%d Sean-direct, %s, %d unconnected)",
+            len(atoms), by_hops.get(0, 0),
+            ", ".join(f"{by_hops.get(h, 0)} {h}-hop" for h in range(1, max_hops + 1)),
+            by_hops.get(None, 0),
         )
 
         # -- Upsert Sean's oral_persons record (narrator anchor) --------------
@@ -422,64 +585,81 @@ class PreTrainingPipeline:
                 })
 
         # -- Import atoms -----------------------------------------------------
+        # Atoms already imported (capture_session willow-k{id}) are fetched in one
+        # query and skipped entirely (if that query fails the import stops,
+        # rather than re-extracting every atom); new stories go in as one batch,
+        # then only the new atoms are sent for entity extraction.
 
         counts = {"oral_stories": 0, "oral_persons": 0, "oral_clubs": 0, "oral_events": 0}
 
+        imported: set = set()
+        failed_before = 0
+        if not self.dry_run:
+            imported = self._select_column("oral_stories", "capture_session", "willow-k%")
+            self.flush()   # so the writer's failure count below covers only these stories
+            failed_before = self._writer.rows_failed
+            log.info("Willow import: %d atoms already imported, skipping",
+                     sum(1 for a in atoms if f"willow-k{a['id']}" in imported))
+
+        new_atoms = []
         for atom in atoms:
             atom_id  = atom["id"]
+            capture_session = f"willow-k{atom_id}"
+            if capture_session in imported:
+                continue
             title    = atom["title"] or ""
             summary  = atom["summary"] or ""
             snippet  = atom["content_snippet"] or ""
 
-            if atom_id in sean_atom_ids:
+            hops = atom_hops.get(atom_id)
+            if hops == 0:
                 source_type = "oral_history_consented"
                 confidence  = "high"
-            elif atom_id in hop1_ids:
-                source_type = "public_record"
-                confidence  = "medium"
             else:
                 source_type = "public_record"
-                confidence  = "low"
+                confidence  = HOP_CONFIDENCE.get(hops, "low")
 
             text            = "\n\n".join(p for p in [title, summary, snippet] if p).strip()
-            capture_session = f"willow-k{atom_id}"
             source_entry    = {
                 "type":       "willow_knowledge",
                 "url":        f"willow://knowledge/{atom_id}",
                 "timestamp":  atom["created_at"],
                 "confidence": confidence,
+                "graph_hops": hops,
             }
 
             if self.dry_run:
                 if counts["oral_stories"] < 5 or counts["oral_stories"] % 10 == 0:
                     log.info("[DRY RUN] oral_stories: '%s' (%s, %s)", title[:60], confidence, source_type)
                 counts["oral_stories"] += 1
-            else:
-                existing = self._select_one("oral_stories", "capture_session", capture_session)
-                if not existing:
-                    record: dict = {
-                        "title":           title[:255] or None,
-                        "content":         text[:10000],
-                        "source":          "written",
-                        "capture_session": capture_session,
-                        "source_type":     source_type,
-                        "confidence":      confidence,
-                        "sources":         json.dumps([source_entry]),
-                        "summary":         summary[:1000] or None,
-                    }
-                    if sean_narrator_id and atom_id in sean_atom_ids:
-                        record["narrator_id"] = sean_narrator_id
-
-                    new_id = self._insert_one("oral_stories", record)
-                    if new_id:
-                        counts["oral_stories"] += 1
-
-            if not self.dry_run:
-                entities = self.extract_entities_from_text(text, source_entry)
-                self._write_entities(entities)
-                counts["oral_persons"] += sum(1 for e in entities if e.get("entity_type") == "person")
-                counts["oral_clubs"]   += sum(1 for e in entities if e.get("entity_type") == "club")
-                counts["oral_events"]  += sum(1 for e in entities if e.get("entity_type") == "rally")
+                continue
+
+            record: dict = {
+                "title":           title[:255] or None,
+                "content":         text[:10000],
+                "source":          "written",
+                "capture_session": capture_session,
+                "source_type":     source_type,
+                "confidence":      confidence,
+                "sources":         json.dumps([source_entry]),
+                "summary":         summary[:1000] or None,
+            }
+            if sean_narrator_id and atom_id in sean_atom_ids:
+                record["narrator_id"] = sean_narrator_id
+            self._upsert("oral_stories", record, conflict_col="capture_session")
+            new_atoms.append((text, source_entry))
+
+        if not self.dry_run:
+            # Counted once written: rows the batch writer gave up on don't count
+            self.flush()
+            counts["oral_stories"] = len(new_atoms) - (self._writer.rows_failed - failed_before)
+
+        for text, source_entry in new_atoms:
+            entities = self.extract_entities_from_text(text, source_entry)
+            self._write_entities(entities)
+            counts["oral_persons"] += sum(1 for e in entities if e.get("entity_type") == "person")
+            counts["oral_clubs"]   += sum(1 for e in entities if e.get("entity_type") == "club")
+            counts["oral_events"]  += sum(1 for e in entities if e.get("entity_type") == "rally")
 
         action = "would process" if self.dry_run else "processed"
         log.info("Willow import complete: %d atoms %s: %s", len(atoms), action, counts)
@@ -495,54 +675,73 @@ class PreTrainingPipeline:
         For each matching chunk, call the free fleet to extract structured entities.
         Returns list of entity dicts ready for Postgres.
         """
+        prompts = [p for p in map(self._chunk_prompt, _iter_chunks([text], chunk_size)) if p]
+
+        # Chunks are independent: ask the fleet for all of them at once, bounded
+        # by extract_workers, and finish in about the time of the slowest chunk.
+        # pool.map keeps chunk order, so dedupe below still keeps the first hit.
         entities: list[dict] = []
-        words = text.split()
-        step  = chunk_size - 100  # 100-word overlap
-        for i in range(0, len(words), step):
-            chunk       = " ".join(words[i : i + chunk_size])
-            chunk_lower = chunk.lower()
-
-            triggered_hooks = [
-                hook for hook, triggers in HOOKS.items()
-                if any(t in chunk_lower for t in triggers)
-            ]
-            if not triggered_hooks:
-                continue
+        workers = max(1, min(self.extract_workers, len(prompts)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for parsed in pool.map(self._extract_chunk, prompts):
+                entities.extend(self._tag_entities(parsed, source))
 
-            hook_label = ", ".join(triggered_hooks)
-            safe_chunk = chunk.replace("{", "{{").replace("}", "}}")
-            prompt     = EXTRACT_PROMPT.format(text=safe_chunk, hook=hook_label)
+        return self._dedupe_entities(entities, set())
 
-            raw = self._call_fleet(prompt)
-            if not raw:
-                continue
+    @staticmethod
+    def _chunk_prompt(chunk: str) -> str | None:
+        """Extraction prompt for a chunk, or None when no hook fires on it."""
+        triggered_hooks = list(HOOK_MATCHER.hooks(chunk))
+        if not triggered_hooks:
+            return None
+        hook_label = ", ".join(triggered_hooks)
+        safe_chunk = chunk.replace("{", "{{").replace("}", "}}")
+        return EXTRACT_PROMPT.format(text=safe_chunk, hook=hook_label)
 
-            parsed = self._parse_json_array(raw)
-            for item in parsed:
-                item["sources"]     = [source]
-                item["source_type"] = "public_record"
-            entities.extend(parsed)
+    @staticmethod
+    def _tag_entities(parsed: list[dict], source: dict) -> list[dict]:
+        for item in parsed:
+            item["sources"]     = [source]
+            item["source_type"] = "public_record"
+        return parsed
 
-        # Deduplicate by (entity_type, name)
-        seen: set[tuple] = set()
+    @staticmethod
+    def _dedupe_entities(entities: list[dict], seen: set[tuple]) -> list[dict]:
+        """Entities whose (entity_type, name) isn't in seen yet; seen is updated."""
         unique: list[dict] = []
         for e in entities:
             key = (e.get("entity_type", ""), e.get("name", "").lower())
             if key not in seen:
                 seen.add(key)
                 unique.append(e)
-
         return unique
 
+    def _extract_chunk(self, prompt: str) -> list[dict]:
+        """One chunk's fleet call + parse (runs on an extraction worker thread)."""
+        raw = self._call_fleet(prompt, cache_version=EXTRACT_PROMPT_VERSION)
+        if not raw:
+            return []
+        parsed = self._parse_json_array(raw)
+        if not parsed:
+            # Don't pin an unusable answer; the next run asks again
+            self.llm_cache.discard(LLMCache.key(prompt, "free", EXTRACT_PROMPT_VERSION))
+        return parsed
+
     # ---- Write to Postgres --------------------------------------------------
 
     def _write_entities(self, entities: list[dict]) -> None:
-        """Route each extracted entity to the correct oral_* table."""
+        """
+        Route each extracted entity to the correct oral_* table. Names are first
+        mapped onto an existing row's name when they are a variant spelling of
+        it (pipeline/entity_index.py), so ON CONFLICT hits that row.
+        """
         for entity in entities:
             etype = entity.get("entity_type", "")
+            table = _ENTITY_TABLES.get(etype)
+            name  = self._canonical_name(table, entity.get("name")) if table else entity.get("name")
             if etype == "rally":
                 self._upsert("oral_events", {
-                    "name":        entity.get("name"),
+                    "name":        name,
                     "event_year":  entity.get("year"),
                     "description": entity.get("description"),
                     "source_type": "public_record",
@@ -551,7 +750,7 @@ class PreTrainingPipeline:
                 }, conflict_col="name")
             elif etype == "club":
                 self._upsert("oral_clubs", {
-                    "name":        entity.get("name"),
+                    "name":        name,
                     "city":        entity.get("city"),
                     "state":       entity.get("state"),
                     "notes":       entity.get("description"),
@@ -561,7 +760,7 @@ class PreTrainingPipeline:
                 }, conflict_col="name")
             elif etype == "person":
                 self._upsert("oral_persons", {
-                    "club_name":   entity.get("name"),
+                    "club_name":   name,
                     "home_city":   entity.get("city"),
                     "home_state":  entity.get("state"),
                     "bio":         entity.get("description"),
@@ -571,7 +770,7 @@ class PreTrainingPipeline:
                 }, conflict_col="club_name")
             elif etype in ("shop", "venue"):
                 self._upsert("oral_locations", {
-                    "name":          entity.get("name"),
+                    "name":          name,
                     "city":          entity.get("city"),
                     "state":         entity.get("state"),
                     "location_type": etype,
@@ -582,15 +781,58 @@ class PreTrainingPipeline:
                 }, conflict_col="name")
             else:
                 log.debug("Skipping entity_type=%s name=%s", etype, entity.get("name"))
+        self.flush()
+
+    def _canonical_name(self, table: str, name: str | None) -> str | None:
+        """name, or the existing name in table it is a variant of."""
+        if not name:
+            return name
+        if self._entity_index is None:
+            self._entity_index = self._load_entity_index()
+        canonical = self._entity_index.resolve(table, name)
+        if canonical != name:
+            log.info("Canonical %s: %r -> %r", table, name, canonical)
+        return canonical
+
+    def _load_entity_index(self) -> EntityIndex:
+        """Every existing oral_* name, one query per table (empty in dry_run)."""
+        index = EntityIndex()
+        if self.dry_run:
+            return index
+        started = time.perf_counter()
+        for table, col in NAME_COLUMNS.items():
+            try:
+                with self._conn() as conn:
+                    cur = conn.cursor()
+                    cur.execute(f"SELECT {col} FROM {table} WHERE {col} IS NOT NULL")
+                    for (value,) in cur.fetchall():
+                        index.add(table, value)
+            except Exception as e:
+                log.warning("Entity index: could not load %s.%s: %s", table, col, e)
+        log.info("Entity index: %d names in %.2fs", len(index), time.perf_counter() - started)
+        return index
 
     # ---- Fleet helpers ------------------------------------------------------
 
-    def _call_fleet(self, prompt: str, retries: int = 3) -> str | None:
-        """Call the Willow free fleet with exponential backoff."""
+    def _call_fleet(
+        self, prompt: str, retries: int = 3, cache_version: str | None = None
+    ) -> str | None:
+        """
+        Call the Willow free fleet with exponential backoff. With cache_version
+        (the prompt template's version), answers come from / go to llm_cache.
+        """
+        key = None
+        if cache_version:
+            key = LLMCache.key(prompt, "free", cache_version)
+            cached = self.llm_cache.get(key)
+            if cached:
+                return cached.content
         for attempt in range(retries):
             try:
                 resp = _fleet_ask(prompt, tier="free")
                 if resp:
+                    if key:
+                        self.llm_cache.put(key, resp.content, resp.provider, version=cache_version)
                     return resp.content
             except Exception as e:
                 log.warning("Fleet attempt %d failed: %s", attempt + 1, e)
@@ -619,12 +861,31 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="NASA Archive pre-training pipeline")
     parser.add_argument("--source",   choices=["scootnet", "podcast", "web", "willow"], required=True)
-    parser.add_argument("--path",     help="Path to MP3 file (podcast mode)")
-    parser.add_argument("--url",      help="URL to scrape (web mode)")
+    parser.add_argument("--path",     help="MP3 file, or a directory / RSS feed / manifest of episodes (podcast mode)")
+    parser.add_argument("--url",      help="URL to scrape, or crawl seed with --crawl (web mode)")
+    parser.add_argument("--urls",     help="Sitemap (URL or file) or file of URLs to fetch concurrently (web mode)")
+    parser.add_argument("--crawl",    type=int, default=0, metavar="N",
+                        help="Web: follow same-host links from --url/--urls up to N pages")
+    parser.add_argument("--fetch-workers", type=int, default=web_ingest.FETCH_WORKERS,
+                        help="Web: concurrent page fetches")
+    parser.add_argument("--host-delay", type=float, default=web_ingest.HOST_DELAY,
+                        help="Web: minimum seconds between requests to one host")
     parser.add_argument("--username", default="Sweet-Pea-Rudi19",
                         help="Willow username for knowledge schema (willow mode)")
+    parser.add_argument("--max-hops", type=int, default=1,
+                        help="Willow: graph distance from the narrator to compute (willow mode)")
+    parser.add_argument("--bulk",     action="store_true",
+                        help="Scootnet: load all rallies with COPY + one merge")
     parser.add_argument("--dry-run",  action="store_true",
                         help="Preview without writing to Postgres")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore cached fleet responses (fresh ones are still stored)")
+    parser.add_argument("--workers",  type=int, default=EXTRACT_WORKERS,
+                        help="Parallel fleet calls when extracting a transcript or page")
+    parser.add_argument("--stream",   action="store_true",
+                        help="Podcast: extract while Whisper is still transcribing (single MP3)")
+    parser.add_argument("--transcribe-workers", type=int, default=None,
+                        help="Whisper processes for a podcast batch (default: CPU count)")
     args = parser.parse_args()
 
     # Load .env from repo root
@@ -635,26 +896,41 @@ if __name__ == "__main__":
                 k, _, v = line.partition("=")
                 os.environ.setdefault(k.strip(), v.strip())
 
-    p = PreTrainingPipeline(dry_run=args.dry_run)
+    p = PreTrainingPipeline(
+        dry_run=args.dry_run, use_cache=not args.no_cache, extract_workers=args.workers
+    )
 
     if args.source == "scootnet":
-        n = p.process_rally_data()
+        n = p.process_rally_data(bulk=args.bulk)
         action = "would upsert" if args.dry_run else "upserted"
         print(f"Done: {n} rally records {action}")
 
     elif args.source == "podcast":
         if not args.path:
             parser.error("--path required for podcast mode")
-        entities = p.process_podcast(args.path)
+        if args.stream:
+            entities = p.process_podcast_stream(args.path)
+        elif Path(args.path).suffix.lower() in transcripts.AUDIO_EXTENSIONS:
+            entities = p.process_podcast(args.path)
+        else:
+            entities = p.process_podcast_batch(args.path, workers=args.transcribe_workers)
         print(f"Done: {len(entities)} entities extracted")
 
     elif args.source == "web":
-        if not args.url:
-            parser.error("--url required for web mode")
-        entities = p.process_web_page(args.url)
+        if not (args.url or args.urls):
+            parser.error("--url or --urls required for web mode")
+        if args.url and not (args.urls or args.crawl):
+            entities = p.process_web_page(args.url)
+        else:
+            urls = web_ingest.read_urls(args.urls) if args.urls else []
+            if args.url:
+                urls.insert(0, args.url)
+            entities = p.process_web_pages(
+                urls, crawl=args.crawl, workers=args.fetch_workers, host_delay=args.host_delay
+            )
         print(f"Done: {len(entities)} entities extracted")
 
     elif args.source == "willow":
-        counts = p.process_willow_knowledge(username=args.username)
+        counts = p.process_willow_knowledge(username=args.username, max_hops=args.max_hops)
         action = "would import" if args.dry_run else "imported"
         print(f"Done: {action}: {counts}")
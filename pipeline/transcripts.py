@@ -0,0 +1,306 @@
+"""
+NASA Archive -- Podcast transcription with a cached Whisper model
+=================================================================
+Whisper transcripts for pretraining.py's podcast source:
+
+  - the Whisper model is loaded once per process (load_model), not per episode
+  - transcripts are cached on disk keyed by sha256 of the audio bytes plus the
+    model name, so re-running extraction never re-transcribes unchanged audio
+  - transcribe_many() spreads uncached episodes over a process pool sized to
+    the CPU count, each worker loading the model once at start-up
+  - stream_segments() yields segments while later audio is still being
+    transcribed, so extraction can start before Whisper finishes
+
+    for episode, transcript in transcribe_many(read_manifest("podcasts/")):
+        transcript["text"], transcript["segments"]
+
+A manifest is a directory of audio files, a podcast RSS feed (URL or .xml/
+.rss file; each enclosure is downloaded once, to data/podcasts/ named by a
+hash of its URL), a .json list of paths or {"path", "url"} objects, or a
+text file of "path [episode-url]" lines.
+
+Requires: pip install openai-whisper
+
+Output:
+    data/transcripts/{sha256}.{model}.json   -- {"model", "text", "segments", "audio"}
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+log = logging.getLogger("transcripts")
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+TRANSCRIPT_DIR = DATA_DIR / "transcripts"
+DOWNLOAD_DIR = DATA_DIR / "podcasts"
+WHISPER_MODEL = "base"
+STREAM_WINDOW = 120.0   # seconds of audio per Whisper call in stream_segments
+AUDIO_EXTENSIONS = {".mp3", ".m4a", ".wav", ".ogg", ".flac", ".aac"}
+
+Episode = namedtuple("Episode", "path url")
+
+
+@functools.lru_cache(maxsize=None)
+def load_model(name: str = WHISPER_MODEL):
+    """The Whisper model, loaded once per process."""
+    import whisper  # type: ignore
+
+    log.info("Loading Whisper model %r ...", name)
+    return whisper.load_model(name)
+
+
+def audio_hash(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class TranscriptCache:
+    """One JSON file per (audio hash, model) under data/transcripts/."""
+
+    def __init__(self, directory: str | Path = TRANSCRIPT_DIR) -> None:
+        self.dir = Path(directory)
+
+    def path(self, digest: str, model: str) -> Path:
+        return self.dir / f"{digest}.{model}.json"
+
+    def get(self, digest: str, model: str) -> dict | None:
+        try:
+            return json.loads(self.path(digest, model).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, digest: str, model: str, transcript: dict) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(digest, model)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(transcript, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+def _run_whisper(path: str, model_name: str) -> dict:
+    result = load_model(model_name).transcribe(path)
+    return {
+        "model":    model_name,
+        "audio":    Path(path).name,
+        "text":     result["text"],
+        "segments": [
+            {"start": s["start"], "end": s["end"], "text": s["text"]}
+            for s in result.get("segments", [])
+        ],
+    }
+
+
+def transcribe(path: str | Path, model_name: str = WHISPER_MODEL,
+               cache: TranscriptCache | None = None) -> dict:
+    """Transcript for one audio file, from the cache when the audio is unchanged."""
+    cache = cache or TranscriptCache()
+    digest = audio_hash(path)
+    transcript = cache.get(digest, model_name)
+    if transcript is None:
+        log.info("Transcribing %s ...", path)
+        transcript = _run_whisper(str(path), model_name)
+        cache.put(digest, model_name, transcript)
+    else:
+        log.info("Transcript cached for %s", path)
+    return transcript
+
+
+def stream_segments(path: str | Path, model_name: str = WHISPER_MODEL,
+                    cache: TranscriptCache | None = None, window: float = STREAM_WINDOW):
+    """
+    Yield transcript segments ({"start", "end", "text"}) while the audio is
+    still being transcribed, and cache the full transcript once done.
+
+    openai-whisper only returns a transcript when a whole file is finished,
+    so the audio is fed to it `window` seconds at a time. The last segment of
+    each window may be cut mid-word, so it is dropped and the next window
+    starts where it began; the previous window's text is passed as the
+    initial prompt to keep context across the seam.
+    """
+    cache = cache or TranscriptCache()
+    digest = audio_hash(path)
+    transcript = cache.get(digest, model_name)
+    if transcript is not None:
+        log.info("Transcript cached for %s", path)
+        yield from transcript["segments"]
+        return
+
+    import whisper  # type: ignore
+
+    model = load_model(model_name)
+    audio = whisper.load_audio(str(path))
+    rate = whisper.audio.SAMPLE_RATE
+    total = len(audio) / rate
+    log.info("Streaming transcription of %s (%.0f min)", path, total / 60)
+
+    segments: list[dict] = []
+    offset = 0.0
+    while offset < total:
+        last = offset + window >= total
+        piece = audio[int(offset * rate): int((offset + window) * rate)]
+        prompt = " ".join(s["text"].strip() for s in segments[-8:]) or None
+        found = model.transcribe(piece, initial_prompt=prompt).get("segments", [])
+        if not last and len(found) > 1 and found[-1]["start"] > 0:
+            resume = offset + found[-1]["start"]
+            found = found[:-1]
+        else:
+            resume = offset + window
+        for s in found:
+            seg = {"start": offset + s["start"], "end": offset + s["end"], "text": s["text"]}
+            segments.append(seg)
+            yield seg
+        offset = resume
+
+    cache.put(digest, model_name, {
+        "model":    model_name,
+        "audio":    Path(path).name,
+        "text":     "".join(s["text"] for s in segments),
+        "segments": segments,
+    })
+
+
+def _init_worker(model_name: str, threads: int) -> None:
+    # Each process gets its share of the cores instead of every torch pool
+    # claiming all of them
+    try:
+        import torch  # type: ignore
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    load_model(model_name)
+
+
+def transcribe_many(episodes, model_name: str = WHISPER_MODEL, workers: int | None = None,
+                    cache: TranscriptCache | None = None):
+    """
+    Yield (episode, transcript) for every episode: cached ones first, then the
+    rest as pool workers finish them (each is cached as soon as it arrives).
+    """
+    cache = cache or TranscriptCache()
+    episodes = list(episodes)
+    todo = []
+    for ep in episodes:
+        digest = audio_hash(ep.path)
+        transcript = cache.get(digest, model_name)
+        if transcript is not None:
+            yield ep, transcript
+        else:
+            todo.append((ep, digest))
+    if not todo:
+        return
+
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(workers or cpus, len(todo)))
+    log.info("Transcribing %d episodes on %d worker(s) (%d cached)",
+             len(todo), workers, len(episodes) - len(todo))
+    if workers == 1:
+        for ep, digest in todo:
+            transcript = _run_whisper(str(ep.path), model_name)
+            cache.put(digest, model_name, transcript)
+            yield ep, transcript
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(model_name, max(1, cpus // workers)),
+    ) as pool:
+        futures = {pool.submit(_run_whisper, str(ep.path), model_name): (ep, digest) for ep, digest in todo}
+        for future in as_completed(futures):
+            ep, digest = futures[future]
+            try:
+                transcript = future.result()
+            except Exception as e:
+                log.error("Transcription failed %s: %s", ep.path, e)
+                continue
+            cache.put(digest, model_name, transcript)
+            yield ep, transcript
+
+
+# ---- Manifests ---------------------------------------------------------------
+
+def _download(url: str, dest_dir: Path = DOWNLOAD_DIR) -> Path | None:
+    # Keyed on the whole URL: feeds reuse basenames like episode.mp3 or
+    # audio.mp3?id=123, which must not collide
+    suffix = Path(urlparse(url).path).suffix.lower()
+    name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16] + (suffix if suffix in AUDIO_EXTENSIONS else "")
+    dest = dest_dir / name
+    if dest.exists():
+        return dest
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".part")
+    try:
+        with requests.get(url, stream=True, timeout=(5, 120),
+                          headers={"User-Agent": "NASAArchive/1.0"}) as r:
+            r.raise_for_status()
+            with open(tmp, "wb") as f:
+                for block in r.iter_content(1 << 20):
+                    f.write(block)
+    except (requests.RequestException, OSError) as e:
+        log.error("Download failed %s: %s", url, e)
+        tmp.unlink(missing_ok=True)
+        return None
+    os.replace(tmp, dest)
+    return dest
+
+
+def _feed_episodes(xml_text: str) -> list[Episode]:
+    episodes = []
+    for item in ET.fromstring(xml_text).iter("item"):
+        enclosure = item.find("enclosure")
+        if enclosure is None or not enclosure.get("url"):
+            continue
+        path = _download(enclosure.get("url"))
+        if path:
+            episodes.append(Episode(path, item.findtext("link") or enclosure.get("url")))
+    return episodes
+
+
+def read_manifest(source: str | Path) -> list[Episode]:
+    """Episodes named by a directory, RSS feed, .json list or text manifest (see module docstring)."""
+    text = str(source)
+    if text.startswith(("http://", "https://")):
+        resp = requests.get(text, timeout=15, headers={"User-Agent": "NASAArchive/1.0"})
+        resp.raise_for_status()
+        return _feed_episodes(resp.text)
+
+    path = Path(source)
+    if path.is_dir():
+        return [Episode(p, "") for p in sorted(path.iterdir()) if p.suffix.lower() in AUDIO_EXTENSIONS]
+    if path.suffix.lower() in AUDIO_EXTENSIONS:
+        return [Episode(path, "")]
+    if path.suffix.lower() in (".xml", ".rss"):
+        return _feed_episodes(path.read_text(encoding="utf-8"))
+
+    base = path.parent
+    if path.suffix.lower() == ".json":
+        episodes = []
+        for entry in json.loads(path.read_text(encoding="utf-8")):
+            if isinstance(entry, str):
+                entry = {"path": entry}
+            episodes.append(Episode(base / entry["path"], entry.get("url", "")))
+        return episodes
+
+    episodes = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        audio, _, url = line.partition(" ")
+        episodes.append(Episode(base / audio, url.strip()))
+    return episodes
@@ -0,0 +1,228 @@
+"""
+NASA Archive -- Concurrent web archive ingestion
+================================================
+Fetches many public pages (club sites, Modern Vespa threads, obituaries)
+for pretraining.py's web source:
+
+  - URL sources: a text file of URLs, a sitemap (URL or file; sitemap
+    indexes and .gz sitemaps are followed), or a crawl seed that follows
+    same-host links up to a page budget
+  - concurrent fetches over one pooled requests.Session, with a minimum
+    delay between requests to the same host
+  - text extracted with lxml (BeautifulSoup html.parser fallback), with
+    nav/footer/script/style dropped as before
+  - pages whose extracted text is identical to one already seen (mirrors,
+    print views, ?sort= variants) are dropped by sha256 before they reach
+    LLM extraction
+
+    for page in iter_pages(read_urls("sitemap.xml")):
+        page.url, page.text
+    for page in iter_pages(["https://club.example/"], crawl=50):
+        ...
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from urllib.parse import urldefrag, urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import lxml.html
+    from lxml import etree
+
+    _UTF8_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+except ImportError:   # slower, but the pipeline already depends on bs4
+    lxml = None
+    from bs4 import BeautifulSoup
+
+log = logging.getLogger("web_ingest")
+
+HEADERS = {"User-Agent": "NASAArchive/1.0"}
+TIMEOUT = (5, 15)
+FETCH_WORKERS = 8
+HOST_DELAY = 1.0   # seconds between requests to the same host
+DROP_TAGS = ("nav", "footer", "script", "style")
+
+Page = namedtuple("Page", "url text")
+
+
+class HostLimiter:
+    """Spaces requests to each host at least `delay` seconds apart, across threads."""
+
+    def __init__(self, delay: float = HOST_DELAY) -> None:
+        self.delay = delay
+        self._next: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _session(workers: int) -> requests.Session:
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_DROP_XPATH = "|".join(f"//{tag}" for tag in DROP_TAGS) + "|//comment()"
+
+
+def _parse(html: str):
+    try:
+        return lxml.html.fromstring(html)
+    except ValueError:
+        # lxml refuses str input that starts with <?xml ... encoding=...?>;
+        # the text is already decoded, so parse its UTF-8 bytes as UTF-8
+        return lxml.html.fromstring(html.encode("utf-8"), parser=_UTF8_PARSER)
+
+
+def parse_html(html: str, url: str = "") -> tuple[str, list[str]]:
+    """(visible text, absolute link URLs) for a page."""
+    if lxml is not None:
+        try:
+            tree = _parse(html)
+        except etree.ParserError:
+            return "", []
+        # Emptied rather than stripped: stripping joins the tail onto the
+        # previous text node ("tail<script/>after" -> "tailafter")
+        for el in tree.xpath(_DROP_XPATH):
+            el.clear(keep_tail=True)
+        text = " ".join(" ".join(tree.itertext()).split())
+        links = [urljoin(url, href) for href in tree.xpath("//a/@href")]
+        return text, links
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(list(DROP_TAGS)):
+        tag.decompose()
+    links = [urljoin(url, a["href"]) for a in soup.find_all("a", href=True)]
+    return soup.get_text(separator=" ", strip=True), links
+
+
+def _fetch(session: requests.Session, limiter: HostLimiter, url: str) -> str | None:
+    limiter.wait(urlparse(url).netloc)
+    try:
+        r = session.get(url, timeout=TIMEOUT)
+        r.raise_for_status()
+    except requests.RequestException as e:
+        log.error("Fetch failed %s: %s", url, e)
+        return None
+    if "html" not in r.headers.get("Content-Type", "text/html"):
+        log.info("Skipping non-HTML %s", url)
+        return None
+    return r.text
+
+
+# ---- URL sources -------------------------------------------------------------
+
+def _sitemap_urls(data: bytes, session: requests.Session, depth: int = 0) -> list[str]:
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    root = ET.fromstring(data)
+    locs = [el.text.strip() for el in root.iter() if el.tag.endswith("loc") and el.text]
+    if not root.tag.endswith("sitemapindex"):
+        return locs
+    urls: list[str] = []
+    for loc in locs:
+        if depth >= 3:
+            break
+        try:
+            r = session.get(loc, timeout=TIMEOUT)
+            r.raise_for_status()
+            urls.extend(_sitemap_urls(r.content, session, depth + 1))
+        except (requests.RequestException, ET.ParseError) as e:
+            log.error("Sitemap failed %s: %s", loc, e)
+    return urls
+
+
+def read_urls(source: str | Path) -> list[str]:
+    """URLs from a sitemap (URL or file) or a text file of one URL per line."""
+    text = str(source)
+    session = _session(1)
+    if text.startswith(("http://", "https://")):
+        r = session.get(text, timeout=TIMEOUT)
+        r.raise_for_status()
+        return _sitemap_urls(r.content, session)
+    path = Path(source)
+    data = path.read_bytes()
+    if path.suffix.lower() in (".xml", ".gz") or data.lstrip()[:5] == b"<?xml":
+        return _sitemap_urls(data, session)
+    return [
+        line.strip() for line in data.decode("utf-8").splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+
+
+# ---- Concurrent fetch ----------------------------------------------------------
+
+def _canonical(url: str) -> str:
+    return urldefrag(url)[0]
+
+
+def iter_pages(urls, crawl: int = 0, workers: int = FETCH_WORKERS, host_delay: float = HOST_DELAY):
+    """
+    Yield Page(url, text) as pages arrive, skipping failures, empty pages and
+    bodies already seen. With crawl > 0, links on fetched pages that stay on
+    a seed's host are followed until `crawl` pages have been fetched.
+    """
+    session = _session(workers)
+    limiter = HostLimiter(host_delay)
+    queue = deque(_canonical(u) for u in urls)
+    seen_urls = set(queue)
+    seed_hosts = {urlparse(u).netloc for u in queue}
+    budget = max(crawl, len(queue))
+    seen_bodies: set[str] = set()
+    fetched = dupes = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running: dict = {}
+        while queue or running:
+            while queue and len(running) < workers * 2 and fetched + len(running) < budget:
+                url = queue.popleft()
+                running[pool.submit(_fetch, session, limiter, url)] = url
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = running.pop(future)
+                fetched += 1
+                html = future.result()
+                if not html:
+                    continue
+                text, links = parse_html(html, url)
+                if crawl:
+                    for link in links:
+                        link = _canonical(link)
+                        if (link not in seen_urls and urlparse(link).scheme in ("http", "https")
+                                and urlparse(link).netloc in seed_hosts):
+                            seen_urls.add(link)
+                            queue.append(link)
+                if not text:
+                    continue
+                digest = hashlib.sha256(text.encode("utf-8")).hexdigest()   # whitespace already collapsed
+                if digest in seen_bodies:
+                    dupes += 1
+                    continue
+                seen_bodies.add(digest)
+                yield Page(url, text)
+
+    session.close()
+    log.info("Fetched %d pages, %d duplicate bodies skipped", fetched, dupes)
@@ -23,6 +23,8 @@ from datetime import datetime
 import requests
 from bs4 import BeautifulSoup
 
+from location_matcher import default_matcher
+
 # --- Config ---
 BBS_DOMAIN = "scooterbbs.com"
 WAYBACK_CDX = "https://web.archive.org/cdx/search/cdx"
@@ -178,6 +180,12 @@ def scrape_wayback_thread(timestamp, original_url):
         if h1:
             title = h1.get_text(strip=True)[:200]
 
+        # Tag known places so threads can be linked to rallies by location
+        places = {}
+        for text in [title] + [p["text"] for p in posts]:
+            for place, _, _ in default_matcher().find_all(text):
+                places.setdefault(place["city"], place)
+
         return {
             "url": original_url,
             "wayback_url": wayback_url,
@@ -186,6 +194,10 @@ def scrape_wayback_thread(timestamp, original_url):
             "title": title,
             "post_count": len(posts),
             "posts": posts,
+            "places": [
+                {"city": p["city"], "region": p["region"], "country": p["country"]}
+                for p in places.values()
+            ],
         }, wayback_url
 
     except Exception as e:
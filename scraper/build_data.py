@@ -12,11 +12,19 @@ Output:
     data/index.json              -- master rally list + stats for homepage
     data/rallies/{slug}/meta.json
     data/rallies/{slug}/photos.json
+    web/data/*.json              -- via build_web_data.py
+    web/data/h/*.{hash}.json[.gz|.br] -- via hash_assets.py, plus web/data/manifest.json
+    data/archive.sqlite          -- via build_sqlite.py
 """
 
 import json
 from pathlib import Path
 
+from build_web_data import build_all as build_web_data
+from hash_assets import main as hash_assets
+from build_sqlite import build as build_sqlite
+from meta_store import MetaStore
+
 SCRAPER_OUT = Path(__file__).parent / "output"
 DATA_DIR = Path(__file__).parent.parent / "data"
 
@@ -54,24 +62,29 @@ def load_calendar():
 
 
 def build_rally_files(rallies):
-    """Write per-rally meta.json and photos.json into data/rallies/{slug}/"""
+    """
+    Write per-rally meta.json and photos.json into data/rallies/{slug}/
+
+    Scraped fields are patched into meta.json through MetaStore, so lat/lng
+    from geocode_rallies.py and enrichment from enrich_rallies.py survive a
+    rebuild, even one running alongside them.
+    """
     rallies_dir = DATA_DIR / "rallies"
     rallies_dir.mkdir(parents=True, exist_ok=True)
 
+    store = MetaStore(rallies_dir)
     for rally in rallies:
         slug = rally["slug"].replace("/", "-")
         out_dir = rallies_dir / slug
         out_dir.mkdir(exist_ok=True)
 
-        meta = {k: v for k, v in rally.items() if k != "photos"}
-        (out_dir / "meta.json").write_text(
-            json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8"
-        )
+        store.patch(slug, {k: v for k, v in rally.items() if k != "photos"}, keep_none=True)
 
         photos = rally.get("photos", [])
         (out_dir / "photos.json").write_text(
             json.dumps(photos, indent=2, ensure_ascii=False), encoding="utf-8"
         )
+    store.flush()
 
     print(f"  Wrote {len(rallies)} rally directories")
 
@@ -139,6 +152,17 @@ def main():
     print(f"\nBuilding index...")
     build_index(rallies, patches, calendar)
 
+    print(f"\nBuilding web/data...")
+    build_web_data()
+
+    print(f"\nHashing + compressing data artifacts...")
+    hash_assets()
+
+    print(f"\nBuilding data/archive.sqlite...")
+    counts = build_sqlite()
+    print(f"  {counts['rallies']} rallies, {counts['photos']:,} photos, "
+          f"{counts['photographers']} photographers")
+
     print(f"\nDone. Run 'npm run dev' in site/ to preview.")
 
 
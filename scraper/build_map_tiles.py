@@ -0,0 +1,198 @@
+"""
+NASA Archive - Precomputed map cluster tiles
+scraper/build_map_tiles.py
+
+Clusters the geocoded rallies from web/data/geo.json once per zoom level
+(supercluster-style: greedy radius clustering in Web Mercator pixel space,
+each zoom built from the clusters of the zoom above) and writes one JSON
+file per non-empty slippy-map tile:
+
+    web/data/tiles/index.json        -- zoom range, radius, point hash, tile list
+    web/data/tiles/{z}/{x}/{y}.json  -- [{id, lat, lng, k: count, p: photos, ...}]
+
+A cluster entry carries its rally count ("k"), photo total, a stable id
+("c:{z}/{slug}" -- the zoom plus the slug of the rally anchoring it, so it
+can never be mistaken for a rally slug), the zoom at which it splits ("ez")
+and its top rally by photos. A single rally is
+emitted as its geo.json record. At MAX_ZOOM every rally is its own point.
+
+Incremental: the point set is fingerprinted into index.json, so a rebuild
+with unchanged coordinates touches nothing; otherwise only tiles whose
+bytes changed are rewritten and emptied tiles are removed.
+
+Not part of the regular build yet: web/map.html still fetches geo.json and
+groups markers itself (its decade/state filters and rally list need every
+point), so nothing reads these tiles until the map fetches them. Run by hand
+from repo root after build_web_data.py:
+    python scraper/build_map_tiles.py
+"""
+
+import hashlib
+import json
+import math
+
+from web_files import WEB_DATA_DIR, write_if_changed
+
+MIN_ZOOM = 0
+MAX_ZOOM = 12        # rallies are never clustered at this zoom
+RADIUS_PX = 60       # cluster radius in screen pixels
+TILE_PX = 256
+
+
+def _project(lat, lng):
+    """lat/lng -> Web Mercator world coords in [0, 1)."""
+    x = lng / 360.0 + 0.5
+    s = math.sin(math.radians(max(min(lat, 85.05112878), -85.05112878)))
+    y = 0.5 - 0.25 * math.log((1 + s) / (1 - s)) / math.pi
+    return x, y
+
+
+def _unproject(x, y):
+    lng = (x - 0.5) * 360.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+    return lat, lng
+
+
+def _cluster(items, zoom):
+    """
+    One zoom level of greedy radius clustering. items are dicts with
+    x, y (world coords), n (count), p (photos), members (point indexes).
+    Uses a uniform grid of cell size = radius so each neighbour lookup
+    only checks 9 cells.
+    """
+    r = RADIUS_PX / (TILE_PX * 2 ** zoom)
+    grid = {}
+    for i, it in enumerate(items):
+        grid.setdefault((int(it["x"] / r), int(it["y"] / r)), []).append(i)
+
+    done = [False] * len(items)
+    out = []
+    # Heaviest first, so big rallies anchor their clusters deterministically
+    order = sorted(range(len(items)), key=lambda i: (-items[i]["n"], -items[i]["p"], items[i]["id"]))
+    for i in order:
+        if done[i]:
+            continue
+        done[i] = True
+        seed = items[i]
+        group = [seed]
+        cx, cy = int(seed["x"] / r), int(seed["y"] / r)
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for j in grid.get((gx, gy), ()):
+                    if done[j]:
+                        continue
+                    other = items[j]
+                    if (other["x"] - seed["x"]) ** 2 + (other["y"] - seed["y"]) ** 2 <= r * r:
+                        done[j] = True
+                        group.append(other)
+        if len(group) == 1:
+            out.append(seed)
+            continue
+        n = sum(g["n"] for g in group)
+        out.append({
+            "x": sum(g["x"] * g["n"] for g in group) / n,
+            "y": sum(g["y"] * g["n"] for g in group) / n,
+            "n": n,
+            "p": sum(g["p"] for g in group),
+            "members": sorted(m for g in group for m in g["members"]),
+            "id": seed["id"],
+            "ez": zoom + 1,
+        })
+    return out
+
+
+def build_levels(points):
+    """Return {zoom: [items]} for MIN_ZOOM..MAX_ZOOM, built bottom-up."""
+    items = []
+    for i, pt in enumerate(points):
+        x, y = _project(pt["lat"], pt["lng"])
+        items.append({"x": x, "y": y, "n": 1, "p": pt.get("p") or 0, "members": [i], "id": pt["s"]})
+    levels = {MAX_ZOOM: items}
+    for z in range(MAX_ZOOM - 1, MIN_ZOOM - 1, -1):
+        # Clusters keep the split zoom from the level where they first formed
+        levels[z] = _cluster(levels[z + 1], z)
+    return levels
+
+
+def _entry(item, points, zoom):
+    if item["n"] == 1:
+        return points[item["members"][0]]
+    lat, lng = _unproject(item["x"], item["y"])
+    top = max((points[m] for m in item["members"]), key=lambda pt: (pt.get("p") or 0, pt["s"]))
+    return {
+        "id": f"c:{zoom}/{item['id']}",
+        "lat": round(lat, 4),
+        "lng": round(lng, 4),
+        "k": item["n"],
+        "p": item["p"],
+        "ez": item["ez"],
+        "top": {"s": top["s"], "n": top["n"]},
+    }
+
+
+def build_tiles(points):
+    """Return {"z/x/y": [entries]} for every non-empty tile."""
+    points = sorted(points, key=lambda pt: pt["s"])
+    tiles = {}
+    for z, items in build_levels(points).items():
+        scale = 2 ** z
+        for item in items:
+            tx = min(int(item["x"] * scale), scale - 1)
+            ty = min(int(item["y"] * scale), scale - 1)
+            tiles.setdefault(f"{z}/{tx}/{ty}", []).append(_entry(item, points, z))
+    for entries in tiles.values():
+        # Clusters first (largest first), then single rallies by photo count
+        entries.sort(key=lambda e: (-e.get("k", 1), -(e.get("p") or 0), e.get("id") or e["s"]))
+    return dict(sorted(tiles.items()))
+
+
+def _fingerprint(points):
+    key = sorted((pt["s"], pt["lat"], pt["lng"], pt.get("p"), pt.get("n"), pt.get("y")) for pt in points)
+    return hashlib.sha256(json.dumps(key, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def write_tiles(points, out_dir=WEB_DATA_DIR):
+    """Write tiles/ for the given geo.json points. Returns number of files changed."""
+    tiles_dir = out_dir / "tiles"
+    index_path = tiles_dir / "index.json"
+    fingerprint = _fingerprint(points)
+    if index_path.exists():
+        try:
+            if json.loads(index_path.read_text(encoding="utf-8")).get("hash") == fingerprint:
+                return 0
+        except ValueError:
+            pass
+
+    tiles = build_tiles(points)
+    changed = 0
+    for key, entries in tiles.items():
+        changed += write_if_changed(tiles_dir / f"{key}.json", entries, compact=True)
+    for stale in tiles_dir.glob("*/*/*.json"):
+        if stale.relative_to(tiles_dir).with_suffix("").as_posix() not in tiles:
+            stale.unlink()
+            changed += 1
+    index = {
+        "v": 1,
+        "min_zoom": MIN_ZOOM,
+        "max_zoom": MAX_ZOOM,
+        "radius": RADIUS_PX,
+        "points": len(points),
+        "hash": fingerprint,
+        "tiles": list(tiles),
+    }
+    changed += write_if_changed(index_path, index, compact=True)
+    return changed
+
+
+def main():
+    geo_path = WEB_DATA_DIR / "geo.json"
+    if not geo_path.exists():
+        print(f"{geo_path} not found. Run scraper/build_web_data.py first.")
+        return
+    points = json.loads(geo_path.read_text(encoding="utf-8"))
+    changed = write_tiles(points)
+    print(f"  {len(points)} geocoded rallies -> {changed} tile files changed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+NASA Archive - Local SQLite archive builder
+scraper/build_sqlite.py
+
+Compiles data/rallies/{slug}/meta.json + photos.json into a single
+read-only SQLite file so tools can answer lookups without walking
+thousands of JSON files:
+
+    rallies        one row per rally directory (meta.json fields + raw meta)
+    photographers  one row per distinct photographer name
+    photos         one row per photo, FK to rallies and photographers
+    rallies_fts    FTS5 index over rally title + description
+
+This is a derived cache -- data/ stays the source of truth and the
+oral_* tables stay in Postgres (archive_db/db.py). Query it through
+archive_db/local.py.
+
+Run from repo root (rebuilds from scratch, swaps in atomically):
+    python scraper/build_sqlite.py
+
+Output:
+    data/archive.sqlite
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from build_web_data import clean, clean_list, rally_year
+
+RALLIES_DIR = Path(__file__).parent.parent / "data" / "rallies"
+DB_PATH = Path(__file__).parent.parent / "data" / "archive.sqlite"
+
+SCHEMA = """
+CREATE TABLE rallies (
+    id            INTEGER PRIMARY KEY,
+    slug          TEXT NOT NULL UNIQUE,
+    dir_slug      TEXT NOT NULL UNIQUE,
+    title         TEXT NOT NULL,
+    year          INTEGER,
+    month         INTEGER,
+    date_rally    TEXT,
+    photo_count   INTEGER NOT NULL DEFAULT 0,
+    url           TEXT,
+    description   TEXT,
+    city          TEXT,
+    state         TEXT,
+    country       TEXT,
+    hosting_club  TEXT,
+    related_clubs TEXT,            -- JSON array
+    lat           REAL,
+    lng           REAL,
+    enriched      INTEGER NOT NULL DEFAULT 0,
+    meta          TEXT NOT NULL    -- full meta.json
+);
+CREATE INDEX idx_rallies_year ON rallies (year, month);
+CREATE INDEX idx_rallies_hosting_club ON rallies (hosting_club);
+
+CREATE TABLE photographers (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE,
+    photo_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE photos (
+    id              INTEGER PRIMARY KEY,
+    pic_id          TEXT,
+    rally_id        INTEGER NOT NULL REFERENCES rallies (id),
+    photographer_id INTEGER REFERENCES photographers (id),
+    pic_url         TEXT,
+    date_rally      TEXT,
+    date_exif       TEXT,
+    date_canonical  TEXT,
+    date_source     TEXT,
+    r2_thumb        TEXT,
+    r2_full         TEXT,
+    exif_meta       TEXT             -- JSON
+);
+CREATE INDEX idx_photos_pic_id ON photos (pic_id);
+CREATE INDEX idx_photos_rally ON photos (rally_id);
+CREATE INDEX idx_photos_photographer ON photos (photographer_id);
+
+CREATE VIRTUAL TABLE rallies_fts USING fts5 (
+    title, description, content='rallies', content_rowid='id'
+);
+"""
+
+
+def _load_json(path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"  Skipping {path.parent.name}/{path.name}: {e}")
+        return default
+
+
+def _rally_row(dir_slug, meta):
+    return (
+        meta.get("slug") or dir_slug,
+        dir_slug,
+        meta.get("title") or dir_slug,
+        rally_year(meta),
+        meta.get("month"),
+        meta.get("date_rally"),
+        meta.get("photo_count", 0) or 0,
+        meta.get("url"),
+        clean(meta.get("description")) or None,
+        clean(meta.get("city")) or None,
+        clean(meta.get("state_province")) or None,
+        clean(meta.get("country")) or None,
+        clean(meta.get("hosting_club")) or None,
+        json.dumps(clean_list(meta.get("related_clubs")), ensure_ascii=False),
+        meta.get("lat"),
+        meta.get("lng"),
+        1 if meta.get("enriched") else 0,
+        json.dumps(meta, ensure_ascii=False),
+    )
+
+
+def build(rallies_dir=RALLIES_DIR, db_path=DB_PATH):
+    """Build the SQLite archive into a temp file, then replace db_path. Returns row counts."""
+    tmp_path = db_path.with_suffix(".sqlite.tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        photographers = {}   # name -> [id, count]
+        n_rallies = n_photos = 0
+
+        with conn:
+            for meta_path in sorted(rallies_dir.glob("*/meta.json")):
+                dir_slug = meta_path.parent.name
+                meta = _load_json(meta_path, None)
+                if not isinstance(meta, dict):
+                    continue
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO rallies (slug, dir_slug, title, year, month, date_rally, "
+                    "photo_count, url, description, city, state, country, hosting_club, "
+                    "related_clubs, lat, lng, enriched, meta) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    _rally_row(dir_slug, meta),
+                )
+                if not cur.rowcount:
+                    print(f"  Duplicate slug {meta.get('slug')!r} in {dir_slug}, skipped")
+                    continue
+                rally_id = cur.lastrowid
+                n_rallies += 1
+
+                photos_path = meta_path.parent / "photos.json"
+                photos = _load_json(photos_path, []) if photos_path.exists() else []
+                rows = []
+                for p in photos:
+                    name = (p.get("photographer") or "").strip()
+                    photographer_id = None
+                    if name:
+                        entry = photographers.get(name)
+                        if entry is None:
+                            entry = photographers[name] = [len(photographers) + 1, 0]
+                        entry[1] += 1
+                        photographer_id = entry[0]
+                    rows.append((
+                        p.get("pic_id"), rally_id, photographer_id, p.get("pic_url"),
+                        p.get("date_rally"), p.get("date_exif"), p.get("date_canonical"),
+                        p.get("date_source"), p.get("r2_thumb"), p.get("r2_full"),
+                        json.dumps(p["exif_meta"]) if p.get("exif_meta") is not None else None,
+                    ))
+                conn.executemany(
+                    "INSERT INTO photos (pic_id, rally_id, photographer_id, pic_url, date_rally, "
+                    "date_exif, date_canonical, date_source, r2_thumb, r2_full, exif_meta) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                n_photos += len(rows)
+
+            conn.executemany(
+                "INSERT INTO photographers (id, name, photo_count) VALUES (?, ?, ?)",
+                [(pid, name, count) for name, (pid, count) in photographers.items()],
+            )
+            conn.execute("INSERT INTO rallies_fts (rallies_fts) VALUES ('rebuild')")
+
+        conn.execute("ANALYZE")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    tmp_path.replace(db_path)
+    return {"rallies": n_rallies, "photos": n_photos, "photographers": len(photographers)}
+
+
+def main():
+    print("=" * 50)
+    print("  NASA Archive — Building data/archive.sqlite")
+    print("=" * 50)
+    if not RALLIES_DIR.exists():
+        print(f"Rally data not found at {RALLIES_DIR}")
+        print("Run scraper/build_data.py first.")
+        return
+    started = time.time()
+    counts = build()
+    print(f"  {counts['rallies']} rallies, {counts['photos']:,} photos, "
+          f"{counts['photographers']} photographers in {time.time() - started:.1f}s")
+    print(f"  Wrote {DB_PATH}")
+
+
+if __name__ == "__main__":
+    main()
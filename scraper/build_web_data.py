@@ -0,0 +1,599 @@
+"""
+NASA Archive - Static site data builder
+scraper/build_web_data.py
+
+Reads every data/rallies/{slug}/meta.json once and derives all of the
+compact short-key JSON files the static site in web/ fetches:
+
+    web/data/rallies.json        -- browse list       (s, n, y, d)
+    web/data/search_index.json   -- client search     (s, n, y, p, c, st, h, rc, d)
+    web/data/geo.json            -- map markers       (s, n, lat, lng, p, cl, y, c, st)
+                                    lat/lng from meta.json, else the current
+                                    geo.json; never silently loses markers
+    web/data/calendar.json       -- timeline          (s, n, y, m, d, p, cl)
+    web/data/clubs.json          -- club -> rallies, cities, states, count;
+                                    never silently loses a curated club
+    web/data/search/{xx}.json    -- prefix/trigram inverted index, sharded by
+                                    key prefix, longer prefixes for big shards
+    web/data/search/doc/{n}.json -- search result rows, by doc id
+
+Club names come from the curated data/clubs.json, not straight from
+enrichment:
+
+    {"clubs":   {name: [other spellings enrichment has used for it]},
+     "rallies": {slug: {"hosting_club": name, "related_clubs": [names]}}}
+
+Rallies listed there take their clubs from it as they are; every other
+rally's hosting_club/related_clubs are mapped to the curated name when they
+are a known spelling, kept when they look like a new club, and dropped when
+they are free text ("null - confirmed due to lack of info"). Edit the file
+to add a club or a spelling.
+
+Records are ordered by (year, month, slug) so output is deterministic, and
+a file is only rewritten when its bytes actually change.
+
+Run from repo root (build_data.py also runs this as its last stage):
+    python scraper/build_web_data.py
+"""
+
+import bisect
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from web_files import WEB_DATA_DIR, write_if_changed
+
+RALLIES_DIR = Path(__file__).parent.parent / "data" / "rallies"
+CLUBS_PATH = Path(__file__).parent.parent / "data" / "clubs.json"
+
+# Enrichment writes these when the LLM had nothing to say
+EMPTY_VALUES = {"", "null", "none", "unknown", "n/a"}
+# ...and, in club fields, sentences like these instead of a name
+CLUB_PLACEHOLDER = re.compile(
+    r"\b(?:null|unknown|unspecified|unverified|unconfirmed|unclear|unable|could ?n[o']t|possibly|"
+    r"not (?:available|specified|clear|known)|information|info)\b",
+    re.IGNORECASE,
+)
+CLUB_MAX_LENGTH = 80
+
+
+def clean(value):
+    """Return a stripped string, or '' for null-ish enrichment placeholders."""
+    if value is None:
+        return ""
+    value = str(value).strip()
+    return "" if value.lower() in EMPTY_VALUES else value
+
+
+def clean_list(values):
+    if not isinstance(values, list):
+        return []
+    return [v for v in (clean(v) for v in values) if v]
+
+
+def rally_year(meta):
+    """meta.json year, else a 4-digit year from the title or slug, else a 2-digit slug suffix."""
+    if meta.get("year"):
+        return meta["year"]
+    for text in (meta.get("title", ""), meta.get("slug", "")):
+        m = re.search(r"\b(199\d|20[0-2]\d)\b", text or "")
+        if m:
+            return int(m.group(1))
+    m = re.search(r"\D(\d{2})$", meta.get("slug", ""))
+    if m:
+        yy = int(m.group(1))
+        return 1900 + yy if yy >= 90 else 2000 + yy
+    return None
+
+
+def rally_record(meta, dir_slug):
+    """One meta.json dict -> the normalised record every builder reads."""
+    return {
+        "slug": meta.get("slug") or dir_slug,
+        "title": meta.get("title", ""),
+        "year": rally_year(meta),
+        "month": meta.get("month") or 0,
+        "date_rally": meta.get("date_rally"),
+        "photo_count": meta.get("photo_count", 0) or 0,
+        "description": clean(meta.get("description")),
+        "city": clean(meta.get("city")),
+        "state": clean(meta.get("state_province")),
+        "hosting_club": clean(meta.get("hosting_club")),
+        "related_clubs": clean_list(meta.get("related_clubs")),
+        "lat": meta.get("lat"),
+        "lng": meta.get("lng"),
+    }
+
+
+def load_rallies(rallies_dir=RALLIES_DIR):
+    """Read every meta.json once and return normalised rally records, sorted."""
+    rallies = []
+    for meta_path in sorted(rallies_dir.glob("*/meta.json")):
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"  Skipping {meta_path.parent.name}: {e}")
+            continue
+        rallies.append(rally_record(meta, meta_path.parent.name))
+    rallies.sort(key=rally_sort_key)
+    return rallies
+
+
+def rally_sort_key(r):
+    """(year, month, slug) -- the order of every artifact."""
+    return (r["year"] or 0, r["month"], r["slug"])
+
+
+def photo_note(count):
+    return f"{count} photo." if count == 1 else f"{count} photos."
+
+
+def build_rallies(rallies):
+    out = []
+    for r in rallies:
+        if r["description"]:
+            desc = f"{r['description']} {photo_note(r['photo_count'])}"
+        else:
+            desc = f"Scraped from scoot.net. {photo_note(r['photo_count'])}"
+        out.append({"n": r["title"], "y": r["year"], "s": r["slug"], "d": desc})
+    return out
+
+
+def load_clubs(path=CLUBS_PATH):
+    """The curated club list (see module docstring); empty if there is none."""
+    if not path.exists():
+        return {"clubs": {}, "rallies": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _club_key(name):
+    return " ".join(name.lower().split())
+
+
+def club_lookup(curated):
+    """Folded spelling -> curated club name, for every name and known spelling."""
+    lookup = {}
+    for name, spellings in curated["clubs"].items():
+        for spelling in [name, *spellings]:
+            lookup[_club_key(spelling)] = name
+    return lookup
+
+
+def clean_club(value, lookup):
+    """An enrichment club value -> its curated name, itself if new, or '' if it is not a name."""
+    value = clean(value)
+    if not value:
+        return ""
+    known = lookup.get(_club_key(value))
+    if known:
+        return known
+    if len(value) > CLUB_MAX_LENGTH or CLUB_PLACEHOLDER.search(value):
+        return ""
+    return value
+
+
+def apply_clubs(rallies, curated):
+    """Replace every record's hosting_club/related_clubs with curated names (see module docstring)."""
+    lookup = club_lookup(curated)
+    for r in rallies:
+        entry = curated["rallies"].get(r["slug"])
+        if entry is not None:
+            r["hosting_club"] = entry.get("hosting_club") or ""
+            r["related_clubs"] = list(entry.get("related_clubs") or [])
+            continue
+        host = clean_club(r["hosting_club"], lookup)
+        related = (clean_club(v, lookup) for v in r["related_clubs"])
+        r["hosting_club"] = host
+        r["related_clubs"] = list(dict.fromkeys(c for c in related if c and c != host))
+
+
+def curated_club_names(curated):
+    """Every club the curated list assigns to a rally."""
+    return {
+        name
+        for entry in curated["rallies"].values()
+        for name in [entry.get("hosting_club"), *(entry.get("related_clubs") or [])]
+        if name
+    }
+
+
+def build_search_index(rallies):
+    return [
+        {
+            "s": r["slug"],
+            "n": r["title"],
+            "y": r["year"],
+            "p": r["photo_count"],
+            "c": r["city"],
+            "st": r["state"],
+            "h": r["hosting_club"],
+            "rc": r["related_clubs"],
+            "d": r["description"] or f"Scraped from scoot.net. {photo_note(r['photo_count'])}",
+        }
+        for r in rallies
+    ]
+
+
+def build_geo(rallies):
+    out = []
+    for r in rallies:
+        if r["lat"] is None or r["lng"] is None:
+            continue
+        entry = {
+            "s": r["slug"],
+            "n": r["title"],
+            "lat": round(r["lat"], 4),
+            "lng": round(r["lng"], 4),
+            "p": r["photo_count"],
+            "cl": r["hosting_club"],
+            "y": r["year"],
+        }
+        if r["city"]:
+            entry["c"] = r["city"]
+        if r["state"]:
+            entry["st"] = r["state"]
+        out.append(entry)
+    return out
+
+
+def read_geo_coords(path):
+    """slug -> (lat, lng) from an existing geo.json, or {} if there is none."""
+    try:
+        entries = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {e["s"]: (e["lat"], e["lng"]) for e in entries if e.get("lat") is not None and e.get("lng") is not None}
+
+
+def fill_coords(rallies, coords):
+    """
+    Give rallies without lat/lng in meta.json the coordinates the published
+    geo.json already has for them (most markers predate geocode_rallies.py
+    writing into meta.json). Returns how many were filled.
+    """
+    filled = 0
+    for r in rallies:
+        if (r["lat"] is None or r["lng"] is None) and r["slug"] in coords:
+            r["lat"], r["lng"] = coords[r["slug"]]
+            filled += 1
+    return filled
+
+
+def build_calendar(rallies):
+    return [
+        {
+            "s": r["slug"],
+            "n": r["title"],
+            "y": r["year"],
+            "m": r["month"],
+            "d": r["date_rally"],
+            "p": r["photo_count"],
+            "cl": r["hosting_club"] or None,
+        }
+        for r in rallies
+    ]
+
+
+def build_clubs(rallies):
+    """Group rallies by hosting and related clubs, keyed by club name."""
+    clubs = {}
+    for r in rallies:
+        names = [r["hosting_club"]] + r["related_clubs"]
+        for name in dict.fromkeys(n for n in names if n):
+            club = clubs.setdefault(name, {"rallies": [], "cities": set(), "states": set()})
+            club["rallies"].append({
+                "s": r["slug"], "n": r["title"], "y": r["year"], "p": r["photo_count"],
+            })
+            if r["city"]:
+                club["cities"].add(r["city"])
+            if r["state"]:
+                club["states"].add(r["state"])
+    return {
+        name: {
+            "rallies": club["rallies"],
+            "cities": sorted(club["cities"]),
+            "states": sorted(club["states"]),
+            "count": len(club["rallies"]),
+        }
+        for name, club in sorted(clubs.items())
+    }
+
+
+# Field bits carried on every posting so the client can score without the doc text.
+# Weights mirror contextSearch() in web/clubs.html.
+SEARCH_FIELDS = {
+    "n":  (1, 10),   # title
+    "h":  (2, 8),    # hosting club
+    "rc": (4, 6),    # related clubs
+    "c":  (8, 5),    # city
+    "st": (16, 4),   # state / province
+    "y":  (32, 4),   # year
+    "d":  (64, 3),   # description
+}
+SEARCH_MIN_PREFIX = 2
+SEARCH_MAX_PREFIX = 12
+SEARCH_SHARD_BYTES = 8 * 1024   # a shard above this is split by one more prefix character
+SEARCH_TOP_DOCS = 60            # doc rows carried per prefix key -- the results clubs.html shows
+SEARCH_DOC_BUCKET = 10          # docs per search/doc/{n}.json file
+
+
+def tokenize(text):
+    """Lowercase ASCII-folded alphanumeric tokens."""
+    folded = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return re.findall(r"[a-z0-9]+", folded.lower())
+
+
+def _trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def search_ranked(rallies):
+    """Rallies in search doc id order: most photos first, then newest (ties keep build order)."""
+    return sorted(rallies, key=lambda r: (-r["photo_count"], -(r["year"] or 0)))
+
+
+def _search_row(r):
+    return [
+        r["slug"], r["title"], r["year"], r["photo_count"],
+        r["city"], r["state"], r["hosting_club"], r["description"],
+    ]
+
+
+def _json_size(data):
+    return len(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def _search_postings(ranked):
+    """{"pre": {key: [(id, bits), ...]}, "tri": {...}} over the SEARCH_FIELDS of every doc."""
+    postings = {"pre": {}, "tri": {}}
+    for doc_id, r in enumerate(ranked):
+        fields = {
+            "n": r["title"],
+            "h": r["hosting_club"],
+            "rc": " ".join(r["related_clubs"]),
+            "c": r["city"],
+            "st": r["state"],
+            "y": str(r["year"] or ""),
+            "d": r["description"],
+        }
+        bits = {"pre": {}, "tri": {}}
+        for field, text in fields.items():
+            bit = SEARCH_FIELDS[field][0]
+            for token in tokenize(text):
+                if token.isdigit():
+                    # Years and numbers match whole-token only
+                    bits["pre"][token] = bits["pre"].get(token, 0) | bit
+                    continue
+                for n in range(SEARCH_MIN_PREFIX, min(len(token), SEARCH_MAX_PREFIX) + 1):
+                    key = token[:n]
+                    bits["pre"][key] = bits["pre"].get(key, 0) | bit
+                for key in _trigrams(token):
+                    bits["tri"][key] = bits["tri"].get(key, 0) | bit
+        for kind, keys in bits.items():
+            for key, mask in keys.items():
+                postings[kind].setdefault(key, []).append((doc_id, mask))
+    return postings
+
+
+def build_search_shards(rallies):
+    """
+    Build the inverted search index as {shard_name: shard}.
+
+    Each shard is {"docs": {id: row}, "pre": {...}, "tri": {...}}: "pre" maps
+    token prefixes (2..12 chars, whole token for numbers) and "tri" token
+    trigrams to flat [id, field_bits, id, field_bits, ...] postings. Doc ids
+    follow search_ranked(), so postings are already best-first and the
+    client breaks score ties by id without needing the docs.
+
+    "docs" holds [s, n, y, p, c, st, h, d] rows (d is '' without a real
+    description) only for each prefix key's SEARCH_TOP_DOCS best postings --
+    what a one-word query shows. Anything else shown (a doc that ranks high
+    only on several words, or a trigram match) comes from search/doc/.
+
+    Keys are sharded by their first two characters; a shard over
+    SEARCH_SHARD_BYTES is split into one shard per next character,
+    recursively, keeping the keys no longer than the prefix itself. The
+    client reads a key from the longest shard name that is a prefix of it
+    (the names are listed in search/index.json).
+    """
+    ranked = search_ranked(rallies)
+    postings = _search_postings(ranked)
+    weights = {bit: weight for bit, weight in SEARCH_FIELDS.values()}
+
+    def score(mask):
+        return sum(weight for bit, weight in weights.items() if mask & bit)
+
+    top = {
+        key: [doc_id for doc_id, mask in sorted(hits, key=lambda h: (-score(h[1]), h[0]))[:SEARCH_TOP_DOCS]]
+        for key, hits in postings["pre"].items()
+    }
+
+    def shard(keys):
+        out = {"docs": {}, "pre": {}, "tri": {}}
+        for key in keys:
+            for kind in ("pre", "tri"):
+                if key in postings[kind]:
+                    out[kind][key] = [n for posting in postings[kind][key] for n in posting]
+            for doc_id in top.get(key, ()):
+                out["docs"][doc_id] = _search_row(ranked[doc_id])
+        out["docs"] = {str(doc_id): row for doc_id, row in sorted(out["docs"].items())}
+        return out
+
+    shards = {}
+
+    def split(prefix, keys):
+        whole = shard(keys)
+        longer = [k for k in keys if len(k) > len(prefix)]
+        if not longer or _json_size(whole) <= SEARCH_SHARD_BYTES:
+            shards[prefix] = whole
+            return
+        own = [k for k in keys if len(k) <= len(prefix)]
+        if own:
+            shards[prefix] = shard(own)
+        groups = {}
+        for key in longer:
+            groups.setdefault(key[:len(prefix) + 1], []).append(key)
+        for name, group in groups.items():
+            split(name, group)
+
+    groups = {}
+    for key in sorted(set(postings["pre"]) | set(postings["tri"])):
+        groups.setdefault(key[:2], []).append(key)
+    for name, keys in groups.items():
+        split(name, keys)
+    return dict(sorted(shards.items()))
+
+
+def build_search_docs(rallies):
+    """{bucket: {id: row}} -- every doc's search row, SEARCH_DOC_BUCKET ids per bucket."""
+    buckets = {}
+    for doc_id, r in enumerate(search_ranked(rallies)):
+        buckets.setdefault(str(doc_id // SEARCH_DOC_BUCKET), {})[str(doc_id)] = _search_row(r)
+    return buckets
+
+
+def write_search_shards(rallies, out_dir):
+    """Write search/{shard}.json, search/doc/{n}.json and search/index.json; drop stale files."""
+    search_dir = out_dir / "search"
+    shards = build_search_shards(rallies)
+    docs = build_search_docs(rallies)
+    changed = 0
+    for name, shard in shards.items():
+        changed += write_if_changed(search_dir / f"{name}.json", shard, compact=True)
+    for name, bucket in docs.items():
+        changed += write_if_changed(search_dir / "doc" / f"{name}.json", bucket, compact=True)
+    manifest = {
+        "v": 2,
+        "docs": len(rallies),
+        "min_prefix": SEARCH_MIN_PREFIX,
+        "max_prefix": SEARCH_MAX_PREFIX,
+        "doc_bucket": SEARCH_DOC_BUCKET,
+        "fields": {f: {"bit": b, "weight": w} for f, (b, w) in SEARCH_FIELDS.items()},
+        "shards": list(shards),
+    }
+    changed += write_if_changed(search_dir / "index.json", manifest, compact=True)
+    for stale in search_dir.glob("*.json"):
+        if stale.stem != "index" and stale.stem not in shards:
+            stale.unlink()
+            changed += 1
+    for stale in (search_dir / "doc").glob("*.json"):
+        if stale.stem not in docs:
+            stale.unlink()
+            changed += 1
+    for stale in (search_dir / "desc").glob("*.json"):   # replaced by search/doc/
+        stale.unlink()
+        changed += 1
+    return changed
+
+
+# (filename, builder, compact) -- compact files are the large ones fetched on every page
+ARTIFACTS = [
+    ("rallies.json", build_rallies, True),
+    ("search_index.json", build_search_index, True),
+    ("calendar.json", build_calendar, False),
+]
+
+
+def build_all(rallies_dir=RALLIES_DIR, out_dir=WEB_DATA_DIR, allow_fewer_markers=False,
+              clubs_path=CLUBS_PATH, allow_fewer_clubs=False):
+    """Derive every web/data artifact from one pass over meta.json. Returns changed filenames."""
+    rallies = load_rallies(rallies_dir)
+    curated = load_clubs(clubs_path)
+    apply_clubs(rallies, curated)
+    changed = []
+    for filename, builder, compact in ARTIFACTS:
+        if write_if_changed(out_dir / filename, builder(rallies), compact=compact):
+            changed.append(filename)
+    shards_changed = write_search_shards(rallies, out_dir)
+    if shards_changed:
+        changed.append(f"search/ ({shards_changed} shards)")
+
+    clubs = build_clubs(rallies)
+    lost = sorted(curated_club_names(curated) - set(clubs))
+    if lost and not allow_fewer_clubs:
+        print("!" * 60)
+        print(f"  WARNING: clubs.json would lose {len(lost)} curated clubs: {', '.join(lost[:5])}"
+              f"{' ...' if len(lost) > 5 else ''}")
+        print("  Left clubs.json as it is. Rerun with --allow-fewer-clubs if their")
+        print("  rallies are really gone, or fix data/clubs.json.")
+        print("!" * 60)
+    elif write_if_changed(out_dir / "clubs.json", clubs):
+        changed.append("clubs.json")
+
+    geo_path = out_dir / "geo.json"
+    previous = read_geo_coords(geo_path)
+    filled = fill_coords(rallies, previous)
+    geo = build_geo(rallies)
+    if len(geo) < len(previous) and not allow_fewer_markers:
+        print("!" * 60)
+        print(f"  WARNING: geo.json would drop from {len(previous)} to {len(geo)} map markers.")
+        print("  Left geo.json as it is. Rerun with --allow-fewer-markers")
+        print("  if rallies really lost their coordinates.")
+        print("!" * 60)
+    elif write_if_changed(geo_path, geo):
+        changed.append("geo.json")
+    print(f"  {len(rallies)} rallies, {len(clubs)} clubs, {len(geo)} map markers ({filled} coordinates from the "
+          f"previous geo.json) -> web/data changed: {', '.join(changed) or 'nothing'}")
+    return changed
+
+
+def update_rallies(dir_slugs, rallies_dir=RALLIES_DIR, out_dir=WEB_DATA_DIR):
+    """
+    Patch rallies.json in place for just these rallies (re-reading only their
+    meta.json), for callers that change a few rallies at a time. Each one is
+    (re)inserted at its load_rallies() position, so the file matches a full
+    build; rallies.json has no month, so only rallies of the same year have
+    their meta.json read to place it. The other artifacts catch up on the
+    next build_all. Returns True if it was rewritten.
+    """
+    path = out_dir / "rallies.json"
+    entries = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+    records = []
+    for dir_slug in dir_slugs:
+        meta_path = rallies_dir / dir_slug / "meta.json"
+        try:
+            records.append(rally_record(json.loads(meta_path.read_text(encoding="utf-8")), dir_slug))
+        except (OSError, ValueError) as e:
+            print(f"  Skipping {dir_slug}: {e}")
+
+    months = {}
+
+    def entry_key(e):
+        if e["s"] not in months:
+            try:
+                meta = json.loads((rallies_dir / e["s"].replace("/", "-") / "meta.json").read_text(encoding="utf-8"))
+                months[e["s"]] = meta.get("month") or 0
+            except (OSError, ValueError):
+                months[e["s"]] = 0
+        return (e["y"] or 0, months[e["s"]], e["s"])
+
+    for record, entry in zip(records, build_rallies(records)):
+        entries = [e for e in entries if e["s"] != entry["s"]]
+        key = rally_sort_key(record)
+        months[entry["s"]] = record["month"]
+        # Years are sorted, so only entries of this year need their month
+        at = bisect.bisect_left([e["y"] or 0 for e in entries], key[0])
+        while at < len(entries) and (entries[at]["y"] or 0) == key[0] and entry_key(entries[at]) < key:
+            at += 1
+        entries.insert(at, entry)
+    return write_if_changed(path, entries, compact=True)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build web/data JSON from data/rallies")
+    parser.add_argument("--allow-fewer-markers", action="store_true",
+                        help="Write geo.json even if it has fewer markers than the current one")
+    parser.add_argument("--allow-fewer-clubs", action="store_true",
+                        help="Write clubs.json even if clubs listed in data/clubs.json would disappear")
+    args = parser.parse_args()
+    print("=" * 50)
+    print("  NASA Archive — Building web/data")
+    print("=" * 50)
+    build_all(allow_fewer_markers=args.allow_fewer_markers, allow_fewer_clubs=args.allow_fewer_clubs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+NASA Archive - Enrichment status ledger
+scraper/enrich_ledger.py
+
+One row per rally recording where enrich_rallies.py got to, so "what still
+needs enrichment" is a single query instead of opening every meta.json:
+
+    data/enrichment.sqlite -- ledger(slug PRIMARY KEY, status, updated_at,
+                                     provider, confidence, attempts)
+
+status is "pending", "failed" (asked, no usable answer yet) or "enriched".
+Slugs the ledger has never seen are seeded once from their meta.json by the
+caller's check (see EnrichLedger.seed); after that meta.json is only read
+when a rally is written.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+
+LEDGER_PATH = Path(__file__).parent.parent / "data" / "enrichment.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger (
+    slug       TEXT PRIMARY KEY,
+    status     TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    provider   TEXT,
+    confidence TEXT,
+    attempts   INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ledger_status ON ledger (status);
+"""
+
+
+def _now():
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+class EnrichLedger:
+    """SQLite-backed enrichment status per rally slug (see module docstring)."""
+
+    def __init__(self, path=LEDGER_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def seed(self, slugs, needs_enrichment):
+        """
+        Add slugs the ledger hasn't seen; needs_enrichment(slug) -> bool decides
+        their starting status. Returns number of slugs added.
+        """
+        known = {row[0] for row in self._conn.execute("SELECT slug FROM ledger")}
+        now = _now()
+        rows = [
+            (slug, "pending" if needs_enrichment(slug) else "enriched", now)
+            for slug in slugs if slug not in known
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO ledger (slug, status, updated_at) VALUES (?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def pending(self):
+        """Every slug not yet enriched."""
+        return {row[0] for row in self._conn.execute("SELECT slug FROM ledger WHERE status != 'enriched'")}
+
+    def mark_enriched(self, results):
+        """results: [(slug, provider, confidence)] -- call after their meta.json is written."""
+        now = _now()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO ledger (slug, status, updated_at, provider, confidence, attempts) "
+                "VALUES (?, 'enriched', ?, ?, ?, 1) "
+                "ON CONFLICT (slug) DO UPDATE SET status = 'enriched', updated_at = excluded.updated_at, "
+                "provider = excluded.provider, confidence = excluded.confidence, attempts = attempts + 1",
+                [(slug, now, provider, confidence) for slug, provider, confidence in results],
+            )
+
+    def mark_failed(self, slug):
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO ledger (slug, status, updated_at, attempts) VALUES (?, 'failed', ?, 1) "
+                "ON CONFLICT (slug) DO UPDATE SET status = 'failed', updated_at = excluded.updated_at, "
+                "attempts = attempts + 1",
+                (slug, _now()),
+            )
+
+    def counts(self):
+        return dict(self._conn.execute("SELECT status, COUNT(*) FROM ledger GROUP BY status"))
+
+    def close(self):
+        self._conn.close()
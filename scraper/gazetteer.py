@@ -0,0 +1,160 @@
+"""
+NASA Archive - Offline gazetteer geocoder
+scraper/gazetteer.py
+
+Local geocoding backend for geocode_rallies.py. Resolves (city, region,
+country) against a compact SQLite file of populated places in the US,
+Canada and the UK, built once from the GeoNames dumps (CC BY 4.0):
+
+    https://download.geonames.org/export/dump/cities500.zip
+    https://download.geonames.org/export/dump/admin1CodesASCII.txt
+
+Build (from repo root, after unzipping):
+    python scraper/gazetteer.py --build cities500.txt admin1CodesASCII.txt
+
+Output:
+    scraper/output/gazetteer.sqlite   -- places(key PRIMARY KEY, lat, lng, population)
+
+Each place is stored under every (name, region) spelling rallies use --
+name and ASCII name, state/province abbreviation, admin1 code and admin1
+name -- so a lookup is a single primary-key probe. When several places
+share a key the most populous wins.
+"""
+
+import argparse
+import re
+import sqlite3
+from pathlib import Path
+
+GAZETTEER_PATH = Path(__file__).parent / "output" / "gazetteer.sqlite"
+
+# GeoNames ISO code <- the country spellings geocode_rallies uses
+COUNTRY_CODES = {
+    "usa": "US", "us": "US", "united states": "US",
+    "canada": "CA", "ca": "CA",
+    "uk": "GB", "gb": "GB", "united kingdom": "GB", "england": "GB",
+}
+
+# GeoNames admin1 code -> postal abbreviation (US admin1 codes already are abbreviations)
+CA_PROVINCES = {
+    "01": "AB", "02": "BC", "03": "MB", "04": "NB", "05": "NL", "07": "NS",
+    "08": "ON", "09": "PE", "10": "QC", "11": "SK", "12": "YT", "13": "NT", "14": "NU",
+}
+GB_NATIONS = {"ENG": "England", "NIR": "Northern Ireland", "SCT": "Scotland", "WLS": "Wales"}
+
+
+def normalize(part):
+    """'St. Louis' -> 'st louis' -- same rules as geocode_rallies.place_key."""
+    return " ".join(re.sub(r"[.,]", " ", part or "").lower().split())
+
+
+def _key(name, region, country_code):
+    return f"{normalize(name)}|{normalize(region)}|{country_code}"
+
+
+def _country_code(country):
+    return COUNTRY_CODES.get(normalize(country))
+
+
+class Gazetteer:
+    """Read-only lookup over gazetteer.sqlite. lookup() returns (lat, lng) or None."""
+
+    name = "gazetteer"
+
+    def __init__(self, path=GAZETTEER_PATH):
+        if not Path(path).exists():
+            raise FileNotFoundError(
+                f"{path} not found. Build it with: python scraper/gazetteer.py --build ..."
+            )
+        self._conn = sqlite3.connect(f"file:{Path(path).as_posix()}?mode=ro", uri=True)
+
+    def lookup(self, city, region, country):
+        code = _country_code(country)
+        if code is None:
+            return None
+        row = self._conn.execute(
+            "SELECT lat, lng FROM places WHERE key = ?", (_key(city, region, code),)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def close(self):
+        self._conn.close()
+
+
+def _load_admin1(path):
+    """admin1CodesASCII.txt -> {"US.IL": "Illinois", "CA.08": "Ontario", ...}"""
+    names = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) >= 2:
+                names[cols[0]] = cols[1]
+    return names
+
+
+def _region_aliases(country, admin1, admin1_names):
+    aliases = {admin1, admin1_names.get(f"{country}.{admin1}", "")}
+    if country == "CA":
+        aliases.add(CA_PROVINCES.get(admin1, ""))
+    elif country == "GB":
+        aliases.add(GB_NATIONS.get(admin1, ""))
+    aliases.discard("")
+    return aliases
+
+
+def build(cities_path, admin1_path, out_path=GAZETTEER_PATH):
+    """Build gazetteer.sqlite from a GeoNames cities dump. Returns number of keys written."""
+    admin1_names = _load_admin1(admin1_path)
+    best = {}   # key -> (population, lat, lng)
+    with open(cities_path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 15:
+                continue
+            name, ascii_name = cols[1], cols[2]
+            lat, lng = float(cols[4]), float(cols[5])
+            feature_class, country, admin1 = cols[6], cols[8], cols[10]
+            if feature_class != "P" or country not in ("US", "CA", "GB"):
+                continue
+            population = int(cols[14] or 0)
+            for region in _region_aliases(country, admin1, admin1_names):
+                for n in {name, ascii_name}:
+                    key = _key(n, region, country)
+                    if key not in best or population > best[key][0]:
+                        best[key] = (population, lat, lng)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_suffix(".sqlite.tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute(
+            "CREATE TABLE places (key TEXT PRIMARY KEY, lat REAL NOT NULL, "
+            "lng REAL NOT NULL, population INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        with conn:
+            conn.executemany(
+                "INSERT INTO places (key, lat, lng, population) VALUES (?, ?, ?, ?)",
+                ((k, round(lat, 5), round(lng, 5), pop) for k, (pop, lat, lng) in sorted(best.items())),
+            )
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    tmp_path.replace(out_path)
+    return len(best)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline gazetteer from GeoNames")
+    parser.add_argument("--build", nargs=2, metavar=("CITIES_TXT", "ADMIN1_TXT"), required=True,
+                        help="GeoNames cities500.txt (or cities1000.txt) and admin1CodesASCII.txt")
+    parser.add_argument("--out", type=Path, default=GAZETTEER_PATH)
+    args = parser.parse_args()
+
+    n = build(Path(args.build[0]), Path(args.build[1]), args.out)
+    size_kb = args.out.stat().st_size // 1024
+    print(f"Wrote {args.out} ({n:,} keys, {size_kb:,} KB)")
+
+
+if __name__ == "__main__":
+    main()
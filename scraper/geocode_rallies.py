@@ -7,22 +7,37 @@ geocodes via Nominatim (free, OpenStreetMap), writes lat/lng to meta.json.
 
 Run from repo root:
     python scraper/geocode_rallies.py
+    python scraper/geocode_rallies.py --offline    # gazetteer + cache only, no network
 
 Respects Nominatim rate limit (1 req/sec). Skips already-geocoded rallies.
+Locations are deduplicated first, then resolved against the offline
+gazetteer (scraper/gazetteer.py) if it has been built, then a persistent
+cache (scraper/output/geocode_cache.json) keyed by normalised (city, region,
+country). Nominatim is only hit once per distinct place that both miss.
+Places Nominatim has no result for are cached too and retried after
+NEGATIVE_TTL_DAYS; failed requests (network errors, 429s) are not cached.
 """
 
+import argparse
 import json
 import os
 import re
 import time
 import urllib.request
 import urllib.parse
+from functools import lru_cache
 from pathlib import Path
 
+from gazetteer import GAZETTEER_PATH, Gazetteer, normalize
+from location_matcher import default_matcher
+from meta_store import MetaStore
+
 RALLIES_DIR = Path(__file__).parent.parent / "data" / "rallies"
 NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
 USER_AGENT = "nasa-archive-geocoder/1.0 (sean@die-namic.system)"
 RATE_LIMIT_SEC = 1.1
+CACHE_PATH = Path(__file__).parent / "output" / "geocode_cache.json"
+NEGATIVE_TTL_DAYS = 30
 
 # Manually resolved slugs where slug/title parsing isn't reliable
 MANUAL_LOCATIONS = {
@@ -80,69 +95,14 @@ US_STATES = {
     "tx","ut","vt","va","wa","wv","wi","wy","dc",
 }
 
-TITLE_PATTERNS = [
-    (r"\bChicago\b", "Chicago", "IL", "USA"),
-    (r"\bBoston\b", "Boston", "MA", "USA"),
-    (r"\bPittsburgh\b", "Pittsburgh", "PA", "USA"),
-    (r"\bDenver\b", "Denver", "CO", "USA"),
-    (r"\bSalt Lake\b", "Salt Lake City", "UT", "USA"),
-    (r"\bLas Vegas\b", "Las Vegas", "NV", "USA"),
-    (r"\bAtlanta\b", "Atlanta", "GA", "USA"),
-    (r"\bPortland\b", "Portland", "OR", "USA"),
-    (r"\bSt\.? Louis\b", "St. Louis", "MO", "USA"),
-    (r"\bMoab\b", "Moab", "UT", "USA"),
-    (r"\bGuelph\b", "Guelph", "ON", "Canada"),
-    (r"\bCape Cod\b", "Barnstable", "MA", "USA"),
-    (r"\bIsle of Wight\b", "Isle of Wight", "England", "UK"),
-    (r"\bBridlington\b", "Bridlington", "England", "UK"),
-    (r"\bLondon\b", "London", "England", "UK"),
-    (r"\bBristol\b", "Bristol", "England", "UK"),
-    (r"\bRichmond\b", "Richmond", "VA", "USA"),
-    (r"\bAmerican Fork\b", "American Fork", "UT", "USA"),
-    (r"\bSan Antonio\b", "San Antonio", "TX", "USA"),
-    (r"\bFredericksburg\b", "Fredericksburg", "VA", "USA"),
-    (r"\bTucson\b", "Tucson", "AZ", "USA"),
-    (r"\bColumbus Day\b", "Chicago", "IL", "USA"),
-    (r"\bMinneapolis\b", "Minneapolis", "MN", "USA"),
-    (r"\bSeattle\b", "Seattle", "WA", "USA"),
-    (r"\bAustin\b", "Austin", "TX", "USA"),
-    (r"\bPhiladelphia\b", "Philadelphia", "PA", "USA"),
-    (r"\bNashville\b", "Nashville", "TN", "USA"),
-    (r"\bNew York\b", "New York", "NY", "USA"),
-    (r"\bSan Francisco\b", "San Francisco", "CA", "USA"),
-    (r"\bMilwaukee\b", "Milwaukee", "WI", "USA"),
-    (r"\bDetroit\b", "Detroit", "MI", "USA"),
-    (r"\bNew Orleans\b", "New Orleans", "LA", "USA"),
-    (r"\bIndianapolis\b", "Indianapolis", "IN", "USA"),
-    (r"\bBaltimore\b", "Baltimore", "MD", "USA"),
-    (r"\bRaleigh\b", "Raleigh", "NC", "USA"),
-    (r"\bSan Diego\b", "San Diego", "CA", "USA"),
-    (r"\bSacramento\b", "Sacramento", "CA", "USA"),
-    (r"\bTampa\b", "Tampa", "FL", "USA"),
-    (r"\bKansas City\b", "Kansas City", "MO", "USA"),
-    (r"\bHouston\b", "Houston", "TX", "USA"),
-    (r"\bDallas\b", "Dallas", "TX", "USA"),
-    (r"\bReno\b", "Reno", "NV", "USA"),
-    (r"\bToronto\b", "Toronto", "ON", "Canada"),
-    (r"\bMontreal\b", "Montreal", "QC", "Canada"),
-    (r"\bVancouver\b", "Vancouver", "BC", "Canada"),
-    (r"\bSavannah\b", "Savannah", "GA", "USA"),
-    (r"\bAsheville\b", "Asheville", "NC", "USA"),
-    (r"\bMadison\b", "Madison", "WI", "USA"),
-    (r"\bBoise\b", "Boise", "ID", "USA"),
-    (r"\bTulsa\b", "Tulsa", "OK", "USA"),
-    (r"\bMemphis\b", "Memphis", "TN", "USA"),
-    (r"\bOmaha\b", "Omaha", "NE", "USA"),
-    (r"\bFresno\b", "Fresno", "CA", "USA"),
-    (r"\bLos Angeles\b", "Los Angeles", "CA", "USA"),
-    (r"\bOrlando\b", "Orlando", "FL", "USA"),
-    (r"\bMiami\b", "Miami", "FL", "USA"),
-]
+_SLUG_SPLIT = re.compile(r"[-_]")
+_YEAR = re.compile(r"\d{4}")
 
 
+@lru_cache(maxsize=None)
 def parse_location_from_slug(slug):
-    parts = re.split(r"[-_]", slug.lower())
-    parts = [p for p in parts if p and not re.fullmatch(r"\d{4}", p)]
+    parts = _SLUG_SPLIT.split(slug.lower())
+    parts = [p for p in parts if p and not _YEAR.fullmatch(p)]
     for i, part in enumerate(parts):
         if part in US_STATES and i > 0:
             city = " ".join(parts[max(0, i-2):i]).title()
@@ -152,13 +112,20 @@ def parse_location_from_slug(slug):
 
 
 def parse_location_from_title(title):
-    for pattern, city, state, country in TITLE_PATTERNS:
-        if re.search(pattern, title, re.IGNORECASE):
-            return (city, state, country)
-    return None
+    # Known place names live in scraper/places.json
+    return default_matcher().match(title)
+
+
+class GeocodeError(Exception):
+    """Nominatim could not be asked (network error, HTTP error such as 429, bad response)."""
 
 
 def geocode(city, region, country):
+    """
+    (lat, lng) for a place, or None if Nominatim has no result for it.
+    Raises GeocodeError if the request itself failed, so callers never
+    mistake an outage or rate limit for a place that doesn't exist.
+    """
     if country in ("USA", "Canada"):
         q = f"{city}, {region}, {country}"
     else:
@@ -169,14 +136,124 @@ def geocode(city, region, country):
     try:
         with urllib.request.urlopen(req, timeout=10) as resp:
             data = json.loads(resp.read())
-            if data:
-                return (float(data[0]["lat"]), float(data[0]["lon"]))
+        if not data:
+            return None
+        return (float(data[0]["lat"]), float(data[0]["lon"]))
     except Exception as e:
-        print(f"    Nominatim error for {q!r}: {e}")
-    return None
+        raise GeocodeError(f"Nominatim error for {q!r}: {e}") from e
+
+
+def place_key(city, region, country):
+    """Normalised cache key: 'St. Louis', 'MO', 'USA' -> 'st louis|mo|usa'."""
+    return "|".join(normalize(p) for p in (city, region, country))
+
+
+def load_cache(path=CACHE_PATH):
+    if path.exists():
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except ValueError:
+            print(f"  Ignoring unreadable geocode cache {path}")
+    return {}
+
+
+def save_cache(cache, path=CACHE_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(cache, indent=1, sort_keys=True, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+def cached_coord(cache, key, now=None):
+    """
+    Look key up in the cache. Returns (hit, coord): coord is (lat, lng) for a
+    cached success, None for a cached failure that hasn't expired yet.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        return False, None
+    if entry.get("miss"):
+        age_days = ((now or time.time()) - entry.get("ts", 0)) / 86400
+        if age_days > NEGATIVE_TTL_DAYS:
+            return False, None
+        return True, None
+    return True, (entry["lat"], entry["lng"])
+
+
+def resolve_places(locations, cache, local_backends=(), online=True):
+    """
+    Geocode each distinct location once. locations is an iterable of
+    (city, region, country); returns {place_key: (lat, lng) | None}.
+
+    Each place is tried against local_backends in order (objects with a
+    lookup(city, region, country) method, e.g. Gazetteer), then the cache.
+    Only what's left hits Nominatim, and only if online; the cache is saved
+    after each lookup so an interrupted run loses nothing.
+    """
+    unique = {}
+    for loc in locations:
+        unique.setdefault(place_key(*loc), loc)
+
+    resolved = {}
+    misses = []
+    n_local = n_cached = 0
+    for key, loc in unique.items():
+        coord = None
+        for backend in local_backends:
+            coord = backend.lookup(*loc)
+            if coord is not None:
+                break
+        if coord is not None:
+            resolved[key] = coord
+            n_local += 1
+            continue
+        hit, coord = cached_coord(cache, key)
+        if hit:
+            resolved[key] = coord
+            n_cached += 1
+        else:
+            misses.append((key, loc))
+
+    print(f"{len(unique)} distinct places: {n_local} local, {n_cached} cached, "
+          f"{len(misses)} to look up\n")
+
+    if not online:
+        for key, (city, region, country) in misses:
+            print(f"  offline, skipping {city}, {region}, {country}")
+            resolved[key] = None
+        return resolved
+
+    for i, (key, (city, region, country)) in enumerate(misses, 1):
+        print(f"  [{i}/{len(misses)}] {city}, {region}, {country}")
+        try:
+            coord = geocode(city, region, country)
+        except GeocodeError as e:
+            # Not cached: the place may well exist, retry on the next run
+            print(f"    -> {e}")
+            coord = None
+        else:
+            if coord is None:
+                print(f"    -> no result")
+                cache[key] = {"miss": True, "ts": int(time.time())}
+            else:
+                print(f"    -> ({coord[0]:.4f}, {coord[1]:.4f})")
+                cache[key] = {"lat": coord[0], "lng": coord[1], "ts": int(time.time())}
+        resolved[key] = coord
+        save_cache(cache)
+        if i < len(misses):
+            time.sleep(RATE_LIMIT_SEC)
+
+    return resolved
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Geocode rally meta.json files")
+    parser.add_argument("--offline", action="store_true",
+                        help="Use only the gazetteer and cache, never Nominatim")
+    parser.add_argument("--gazetteer", type=Path, default=GAZETTEER_PATH,
+                        help="Path to gazetteer.sqlite (see scraper/gazetteer.py)")
+    args = parser.parse_args()
+
     if not RALLIES_DIR.exists():
         print(f"Rally data not found at {RALLIES_DIR}")
         print("Run scraper/build_data.py first.")
@@ -186,6 +263,7 @@ def main():
     print(f"Found {len(slugs)} rally directories\n")
 
     skipped = succeeded = failed = 0
+    pending = []   # (slug, location)
 
     for slug in slugs:
         meta_path = RALLIES_DIR / slug / "meta.json"
@@ -200,8 +278,6 @@ def main():
             continue
 
         title = meta.get("title", "")
-        print(f"  {slug}")
-
         location = (
             MANUAL_LOCATIONS.get(slug)
             or parse_location_from_slug(slug)
@@ -209,30 +285,36 @@ def main():
         )
 
         if location is None:
-            print(f"    -> no location found")
+            print(f"  {slug} -> no location found")
             failed += 1
             continue
 
-        city, region, country = location
-        print(f"    -> {city}, {region}")
+        pending.append((slug, location))
 
-        coord = geocode(city, region, country)
-        time.sleep(RATE_LIMIT_SEC)
-
-        if coord is None:
-            print(f"    -> geocode failed")
-            failed += 1
-            continue
-
-        lat, lng = coord
-        meta["lat"] = round(lat, 6)
-        meta["lng"] = round(lng, 6)
-
-        with open(meta_path, "w", encoding="utf-8") as f:
-            json.dump(meta, f, indent=2, ensure_ascii=False)
-
-        print(f"    -> ({lat:.4f}, {lng:.4f})")
-        succeeded += 1
+    local_backends = []
+    if args.gazetteer.exists():
+        local_backends.append(Gazetteer(args.gazetteer))
+    else:
+        print(f"No gazetteer at {args.gazetteer} -- every uncached place goes to Nominatim")
+
+    cache = load_cache()
+    resolved = resolve_places(
+        (loc for _, loc in pending), cache,
+        local_backends=local_backends, online=not args.offline,
+    )
+
+    # Only lat/lng are patched, under the store lock, so a concurrent
+    # enrich_rallies.py or build_data.py run keeps its own fields
+    with MetaStore(RALLIES_DIR) as store:
+        for slug, location in pending:
+            coord = resolved.get(place_key(*location))
+            if coord is None:
+                failed += 1
+                continue
+
+            lat, lng = coord
+            store.patch(slug, {"lat": round(lat, 6), "lng": round(lng, 6)})
+            succeeded += 1
 
     print(f"\nDone: {succeeded} geocoded, {skipped} already done, {failed} failed")
     print("Run 'python scraper/build_data.py' to rebuild index.json with coordinates.")
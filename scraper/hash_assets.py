@@ -0,0 +1,120 @@
+"""
+NASA Archive - Content-hashed, precompressed data artifacts
+scraper/hash_assets.py
+
+For every published JSON file, writes an immutable content-hashed copy
+under h/ plus .gz and .br siblings, and a manifest.json mapping logical
+names to hashed names:
+
+    web/data/rallies.json  ->  web/data/h/rallies.3f2a9c1b7e.json
+                               web/data/h/rallies.3f2a9c1b7e.json.gz
+                               web/data/h/rallies.3f2a9c1b7e.json.br
+    web/data/manifest.json     {"rallies.json": "h/rallies.3f2a9c1b7e.json", ...}
+
+Unversioned originals are left in place so existing pages keep working.
+web/_headers marks /data/h/* as immutable. Only web/data is hashed: data/
+(index.json, rallies/{slug}/photos.json) is served from R2, which neither
+receives hashed copies nor applies _headers, so the pages fetch it unversioned.
+
+Hashed files are content-addressed, so an existing one is never rewritten,
+but a missing .gz or .br sibling is still written (e.g. the .br once brotli
+is installed); stale hashes are removed once the manifest no longer points
+at them. The pages fetch through the manifest with fetchData() from
+web/js/data.js.
+
+Run from repo root (build_data.py also runs this after build_web_data):
+    python scraper/hash_assets.py
+
+Brotli output requires: pip install brotli  (skipped with a note otherwise)
+"""
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
+REPO = Path(__file__).parent.parent
+HASH_DIR = "h"
+HASH_LEN = 10
+
+# (root, glob patterns relative to root)
+TARGETS = [
+    (REPO / "web" / "data", ["*.json", "search/*.json", "search/doc/*.json"]),
+]
+
+
+def hashed_name(rel, payload):
+    """rallies/x/photos.json + bytes -> h/rallies/x/photos.<hash>.json"""
+    digest = hashlib.sha256(payload).hexdigest()[:HASH_LEN]
+    rel = Path(rel)
+    return (Path(HASH_DIR) / rel.parent / f"{rel.stem}.{digest}{rel.suffix}").as_posix()
+
+
+def write_compressed(path, payload):
+    """
+    Write whichever of path, path.gz and path.br are missing (all three are
+    derived from the same content hash, so existing ones are already right).
+    gzip mtime is pinned so output is reproducible. Returns True if any was written.
+    """
+    gz, br = Path(f"{path}.gz"), Path(f"{path}.br")
+    todo = [p for p in (path, gz) if not p.exists()]
+    if brotli is not None and not br.exists():
+        todo.append(br)
+    if not todo:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path in todo:
+        path.write_bytes(payload)
+    if gz in todo:
+        gz.write_bytes(gzip.compress(payload, compresslevel=9, mtime=0))
+    if br in todo:
+        br.write_bytes(brotli.compress(payload, quality=11))
+    return True
+
+
+def publish(root, patterns):
+    """Hash + compress every file under root matching patterns. Returns (manifest, files written)."""
+    manifest = {}
+    written = 0
+    for pattern in patterns:
+        for src in sorted(root.glob(pattern)):
+            rel = src.relative_to(root).as_posix()
+            if rel == "manifest.json" or rel.startswith(f"{HASH_DIR}/"):
+                continue
+            payload = src.read_bytes()
+            name = hashed_name(rel, payload)
+            written += write_compressed(root / name, payload)
+            manifest[rel] = name
+    manifest = dict(sorted(manifest.items()))
+
+    # Drop hashed files the manifest no longer references
+    live = set(manifest.values())
+    for old in (root / HASH_DIR).rglob("*.json"):
+        if old.relative_to(root).as_posix() not in live:
+            for p in (old, Path(f"{old}.gz"), Path(f"{old}.br")):
+                p.unlink(missing_ok=True)
+
+    text = json.dumps(manifest, indent=1, ensure_ascii=False).encode("utf-8")
+    manifest_path = root / "manifest.json"
+    if not manifest_path.exists() or manifest_path.read_bytes() != text:
+        manifest_path.write_bytes(text)
+    return manifest, written
+
+
+def main():
+    if brotli is None:
+        print("  brotli not installed -- writing .gz only (pip install brotli)")
+    for root, patterns in TARGETS:
+        if not root.exists():
+            continue
+        manifest, written = publish(root, patterns)
+        print(f"  {root.relative_to(REPO)}: {len(manifest)} files, {written} hashed/compressed written")
+
+
+if __name__ == "__main__":
+    main()
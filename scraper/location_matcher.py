@@ -0,0 +1,165 @@
+"""
+NASA Archive - Place-name matcher
+scraper/location_matcher.py
+
+Finds every known place name in a piece of text in a single regex pass.
+Places come from scraper/places.json (edit that file to add one), in
+priority order:
+
+    {"names": ["St. Louis", "St Louis"], "city": "St. Louis", "region": "MO", "country": "USA"}
+
+All names compile into one trie-shaped regex (shared prefixes factored out),
+so matching a title costs one scan instead of one re.search per place; the
+matched text maps back to its place through a dict. Used by
+geocode_rallies.py (title fallback), enrich_rallies.py (location backfill)
+and bbs_scraper.py (tagging threads with places).
+
+Micro-benchmark against the old one-search-per-pattern loop:
+    python scraper/location_matcher.py --bench
+"""
+
+import argparse
+import json
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+
+PLACES_PATH = Path(__file__).parent / "places.json"
+
+
+def _name_pattern(name):
+    """Literal place name -> regex, with any run of whitespace allowed between words."""
+    return r"\s+".join(re.escape(word) for word in name.split())
+
+
+def _normalize(name):
+    return " ".join(name.lower().split())
+
+
+def trie_pattern(names):
+    """
+    Compile names into one regex shaped like a trie (shared prefixes are
+    factored out), so the engine walks each position once instead of
+    retrying every alternative. "boston", "boise" -> bo(?:ston|ise)
+    Spaces match any run of whitespace. Also used by pipeline/hook_matcher.py.
+    """
+    trie = {}
+    for name in names:
+        node = trie
+        for ch in name:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node):
+        if list(node) == [""]:
+            return ""
+        optional = "" in node
+        branches = []
+        for ch in sorted(k for k in node if k):
+            atom = r"\s+" if ch == " " else re.escape(ch)
+            branches.append(atom + emit(node[ch]))
+        body = branches[0] if len(branches) == 1 and not optional else "(?:" + "|".join(branches) + ")"
+        return body + "?" if optional else body
+
+    return emit(trie)
+
+
+class LocationMatcher:
+    """Compiled matcher over a list of place dicts (see module docstring)."""
+
+    def __init__(self, places):
+        self.places = list(places)
+        self._index = {}   # normalised name -> place index (first place wins)
+        for i, place in enumerate(self.places):
+            for name in place["names"]:
+                self._index.setdefault(_normalize(name), i)
+        self._regex = re.compile(r"\b" + trie_pattern(self._index) + r"\b", re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path=PLACES_PATH):
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def find_all(self, text):
+        """Every place mentioned in text, in text order: [(place, start, end), ...]"""
+        return [
+            (self.places[self._index[_normalize(m.group())]], m.start(), m.end())
+            for m in self._regex.finditer(text or "")
+        ]
+
+    def match(self, text):
+        """
+        The highest-priority place in text as (city, region, country), or None.
+        Priority is places.json order, not position in the text.
+        """
+        best = None
+        for m in self._regex.finditer(text or ""):
+            i = self._index[_normalize(m.group())]
+            if best is None or i < best:
+                best = i
+                if i == 0:
+                    break
+        if best is None:
+            return None
+        place = self.places[best]
+        return (place["city"], place["region"], place["country"])
+
+
+@lru_cache(maxsize=1)
+def default_matcher():
+    """The shared matcher built from scraper/places.json (compiled once per process)."""
+    return LocationMatcher.from_file()
+
+
+def _legacy_match(compiled, title):
+    """The pre-matcher algorithm: one re.search per pattern, first hit wins."""
+    for pattern, place in compiled:
+        if pattern.search(title):
+            return (place["city"], place["region"], place["country"])
+    return None
+
+
+def bench(rounds=20):
+    rallies_dir = Path(__file__).parent.parent / "data" / "rallies"
+    titles = []
+    for meta_path in sorted(rallies_dir.glob("*/meta.json")):
+        titles.append(json.loads(meta_path.read_text(encoding="utf-8")).get("title", ""))
+
+    places = json.loads(PLACES_PATH.read_text(encoding="utf-8"))
+    legacy = [
+        (re.compile(r"\b(?:" + "|".join(map(_name_pattern, p["names"])) + r")\b", re.IGNORECASE), p)
+        for p in places
+    ]
+    matcher = LocationMatcher(places)
+
+    mismatches = sum(1 for t in titles if _legacy_match(legacy, t) != matcher.match(t))
+
+    def rate(fn):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for t in titles:
+                fn(t)
+        return rounds * len(titles) / (time.perf_counter() - started)
+
+    before = rate(lambda t: _legacy_match(legacy, t))
+    after = rate(matcher.match)
+    print(f"{len(titles)} titles x {rounds} rounds, {len(places)} places")
+    print(f"  per-pattern re.search : {before:>12,.0f} titles/sec")
+    print(f"  trie regex            : {after:>12,.0f} titles/sec  ({after / before:.1f}x)")
+    print(f"  result mismatches     : {mismatches}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Place-name matcher")
+    parser.add_argument("--bench", action="store_true", help="Benchmark against the per-pattern loop")
+    parser.add_argument("text", nargs="*", help="Text to match")
+    args = parser.parse_args()
+    if args.bench:
+        bench()
+        return
+    for place, start, end in default_matcher().find_all(" ".join(args.text)):
+        print(f"  {start}-{end}: {place['city']}, {place['region']}, {place['country']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+NASA Archive - Batched meta.json store
+scraper/meta_store.py
+
+Field-level patches to data/rallies/{slug}/meta.json, buffered in memory
+and applied in one pass under an exclusive lock on data/rallies/.meta.lock.
+Every flush re-reads each file under the lock before merging, so stages
+that touch different fields (build_data: scraped fields, geocode_rallies:
+lat/lng, enrich_rallies: enrichment) can run at the same time without
+losing each other's writes, and each file is rewritten at most once per
+batch.
+
+    with MetaStore() as store:
+        store.patch("2003-05-texas", {"lat": 29.42, "lng": -98.49})
+        ...                               # flushed on exit
+
+None values are skipped unless keep_none=True, so a patch never erases
+real data with nulls. Files whose bytes don't change are not rewritten.
+A file that can't be read or written (corrupt meta.json, disk error) is
+reported and its patch stays queued for the next flush; the rest of the
+batch still goes through.
+"""
+
+import json
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+RALLIES_DIR = Path(__file__).parent.parent / "data" / "rallies"
+LOCK_NAME = ".meta.lock"
+
+
+class _FileLock:
+    """Exclusive advisory lock on a file, held for the duration of a with-block."""
+
+    def __init__(self, path):
+        self.path = path
+        self._f = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "a+")
+        if fcntl is not None:
+            fcntl.flock(self._f.fileno(), fcntl.LOCK_EX)
+        else:
+            self._f.seek(0)
+            msvcrt.locking(self._f.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *_):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._f.fileno(), fcntl.LOCK_UN)
+            else:
+                self._f.seek(0)
+                msvcrt.locking(self._f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._f.close()
+            self._f = None
+
+
+class MetaStore:
+    """Buffers per-rally field patches and flushes them under a lock (see module docstring)."""
+
+    def __init__(self, rallies_dir=RALLIES_DIR, batch_size=200):
+        self.rallies_dir = Path(rallies_dir)
+        self.batch_size = batch_size
+        self._pending = {}    # dir_slug -> {"set": {...}, "defaults": {...}}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.flush()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def patch(self, dir_slug, fields, defaults=None, keep_none=False):
+        """
+        Queue fields to set on dir_slug's meta.json. defaults are only applied
+        to keys the file doesn't already have (used to seed a missing file).
+        Flushes automatically once batch_size rallies are pending.
+        """
+        entry = self._pending.setdefault(dir_slug, {"set": {}, "defaults": {}})
+        for key, val in fields.items():
+            if val is not None or keep_none:
+                entry["set"][key] = val
+        for key, val in (defaults or {}).items():
+            entry["defaults"].setdefault(key, val)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def meta_path(self, dir_slug):
+        return self.rallies_dir / dir_slug / "meta.json"
+
+    def flush(self):
+        """Apply every pending patch in one locked pass. Returns number of files rewritten."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        written = 0
+        failed = {}
+        with _FileLock(self.rallies_dir / LOCK_NAME):
+            for dir_slug, entry in sorted(pending.items()):
+                try:
+                    written += self._apply(dir_slug, entry)
+                except (OSError, ValueError) as e:
+                    print(f"  meta.json patch failed for {dir_slug} (kept for next flush): {e}")
+                    failed[dir_slug] = entry
+        for dir_slug, entry in failed.items():
+            # Anything patched since the swap is newer and wins
+            newer = self._pending.get(dir_slug)
+            if newer is not None:
+                entry["set"].update(newer["set"])
+                entry["defaults"].update(newer["defaults"])
+            self._pending[dir_slug] = entry
+        return written
+
+    def _apply(self, dir_slug, entry):
+        """Merge one entry into its meta.json. Returns 1 if the file was rewritten."""
+        path = self.meta_path(dir_slug)
+        old = path.read_bytes() if path.exists() else None
+        meta = json.loads(old) if old else {}
+        for key, val in entry["defaults"].items():
+            meta.setdefault(key, val)
+        meta.update(entry["set"])
+        payload = json.dumps(meta, indent=2, ensure_ascii=False).encode("utf-8")
+        if payload == old:
+            return 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".json.{os.getpid()}.tmp")
+        tmp.write_bytes(payload)
+        tmp.replace(path)
+        return 1
@@ -0,0 +1,28 @@
+"""
+NASA Archive - Shared helpers for writing web/data
+scraper/web_files.py
+
+Used by build_web_data.py and build_map_tiles.py, which both write
+under web/data/ and only rewrite a file when its bytes change.
+"""
+
+import json
+from pathlib import Path
+
+WEB_DATA_DIR = Path(__file__).parent.parent / "web" / "data"
+
+
+def write_if_changed(path, data, compact=False):
+    """Serialise data and write it only if the bytes differ. Returns True if written."""
+    if compact:
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    else:
+        text = json.dumps(data, indent=1, ensure_ascii=False)
+    payload = text.encode("utf-8")
+    if path.exists() and path.read_bytes() == payload:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(payload)
+    tmp.replace(path)
+    return True
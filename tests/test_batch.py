@@ -0,0 +1,98 @@
+"""
+BatchUpserter against a real Postgres. Needs psycopg2 and a scratch database:
+
+    WILLOW_TEST_DB_URL=postgresql://... python -m pytest tests/test_batch.py
+
+Each test works in its own throwaway schema, reached the way
+archive_db.db.get_connection() reaches nasa_archive: an uncommitted
+SET search_path at the start of the transaction.
+"""
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+psycopg2 = pytest.importorskip("psycopg2")
+DSN = os.getenv("WILLOW_TEST_DB_URL", "")
+if not DSN:
+    pytest.skip("WILLOW_TEST_DB_URL not set", allow_module_level=True)
+
+from archive_db.batch import BatchUpserter  # noqa: E402
+
+
+class _Conn:
+    """The parts of db._PgConn BatchUpserter uses, over one psycopg2 connection."""
+
+    def __init__(self, schema):
+        self._conn = psycopg2.connect(DSN)
+        self._conn.cursor().execute(f"SET search_path = {schema}, public")   # not committed
+
+    def raw_cursor(self):
+        return self._conn.cursor()
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self._conn.rollback()
+        self._conn.close()
+
+
+@pytest.fixture
+def schema():
+    name = f"batch_test_{uuid.uuid4().hex[:8]}"
+    conn = psycopg2.connect(DSN)
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute(f"CREATE SCHEMA {name}")
+    cur.execute(f"""
+        CREATE TABLE {name}.oral_clubs (
+            id SERIAL PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL,
+            state TEXT CHECK (length(state) = 2)
+        )
+    """)
+    yield name
+    cur.execute(f"DROP SCHEMA {name} CASCADE")
+    conn.close()
+
+
+def _names(schema):
+    conn = psycopg2.connect(DSN)
+    cur = conn.cursor()
+    cur.execute(f"SELECT name FROM {schema}.oral_clubs ORDER BY name")
+    names = [r[0] for r in cur.fetchall()]
+    conn.close()
+    return names
+
+
+def test_bad_row_costs_only_itself(schema):
+    writer = BatchUpserter(lambda: _Conn(schema), batch_size=100)
+    writer.add("oral_clubs", {"name": "Pharaohs Scooter Club", "state": "NM"})
+    writer.add("oral_clubs", {"name": "Vespa Club Ohio", "state": "Ohio"})   # fails the CHECK
+    writer.add("oral_clubs", {"name": "Mods SC", "state": "CA"})
+    writer.close()
+
+    assert _names(schema) == ["Mods SC", "Pharaohs Scooter Club"]
+    assert (writer.rows_written, writer.rows_failed) == (2, 1)
+
+
+def test_clean_batch_written_in_one_go(schema):
+    writer = BatchUpserter(lambda: _Conn(schema), batch_size=100)
+    for i in range(10):
+        writer.add("oral_clubs", {"name": f"Club {i}", "state": "NM"})
+    writer.add("oral_clubs", {"name": "Club 3", "state": "TX"})   # conflict: DO NOTHING
+    writer.close()
+
+    assert len(_names(schema)) == 10
+    assert writer.rows_failed == 0
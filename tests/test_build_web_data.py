@@ -0,0 +1,97 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scraper"))
+
+import build_web_data  # noqa: E402
+
+CURATED = {
+    "clubs": {
+        "VoW": ["VoW (Virginia Vintage Scooter Club)"],
+        "Tucson Scoot Mob": [],
+    },
+    "rallies": {
+        "2010/05/maydaytucson": {"hosting_club": "Tucson Scoot Mob", "related_clubs": []},
+    },
+}
+
+
+def _write_rally(rallies_dir, slug, **meta):
+    path = rallies_dir / slug.replace("/", "-") / "meta.json"
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({"slug": slug, "title": slug, "year": 2010, **meta}), encoding="utf-8")
+
+
+@pytest.mark.parametrize("value", [
+    "null - confirmed due to lack of info",
+    "No information available",
+    "information not available from given source",
+    "Scoot.net or possibly user-organized, exact details unknown",
+    "ASRA (Associated Scooter Riders of America) or another unspecified club",
+])
+def test_clean_club_drops_placeholders(value):
+    assert build_web_data.clean_club(value, build_web_data.club_lookup(CURATED)) == ""
+
+
+def test_clean_club_maps_known_spellings_and_keeps_new_clubs():
+    lookup = build_web_data.club_lookup(CURATED)
+    assert build_web_data.clean_club("vow (virginia vintage  scooter club)", lookup) == "VoW"
+    assert build_web_data.clean_club("Pike Street Scooters", lookup) == "Pike Street Scooters"
+
+
+def test_curated_rallies_keep_their_clubs(tmp_path):
+    rallies_dir, out_dir, clubs_path = tmp_path / "rallies", tmp_path / "web", tmp_path / "clubs.json"
+    clubs_path.write_text(json.dumps(CURATED), encoding="utf-8")
+    _write_rally(rallies_dir, "2010/05/maydaytucson", hosting_club="null - confirmed due to lack of info")
+    _write_rally(rallies_dir, "2010/06/vow", hosting_club="VoW (Virginia Vintage Scooter Club)",
+                 related_clubs=["No information available"])
+
+    build_web_data.build_all(rallies_dir, out_dir, clubs_path=clubs_path)
+
+    clubs = json.loads((out_dir / "clubs.json").read_text(encoding="utf-8"))
+    calendar = {e["s"]: e["cl"] for e in json.loads((out_dir / "calendar.json").read_text(encoding="utf-8"))}
+    assert sorted(clubs) == ["Tucson Scoot Mob", "VoW"]
+    assert calendar == {"2010/05/maydaytucson": "Tucson Scoot Mob", "2010/06/vow": "VoW"}
+
+
+def test_clubs_json_kept_when_curated_clubs_would_be_lost(tmp_path):
+    rallies_dir, out_dir, clubs_path = tmp_path / "rallies", tmp_path / "web", tmp_path / "clubs.json"
+    clubs_path.write_text(json.dumps(CURATED), encoding="utf-8")
+    _write_rally(rallies_dir, "2010/06/vow", hosting_club="VoW")
+    out_dir.mkdir()
+    (out_dir / "clubs.json").write_text('{"Tucson Scoot Mob": {}}', encoding="utf-8")
+
+    changed = build_web_data.build_all(rallies_dir, out_dir, clubs_path=clubs_path)
+    assert "clubs.json" not in changed
+    assert (out_dir / "clubs.json").read_text(encoding="utf-8") == '{"Tucson Scoot Mob": {}}'
+
+    build_web_data.build_all(rallies_dir, out_dir, clubs_path=clubs_path, allow_fewer_clubs=True)
+    assert list(json.loads((out_dir / "clubs.json").read_text(encoding="utf-8"))) == ["VoW"]
+
+
+def _rally(slug, title, photos, **fields):
+    return {
+        "slug": slug, "title": title, "year": 2005, "month": 0, "date_rally": None,
+        "photo_count": photos, "description": "", "city": "", "state": "",
+        "hosting_club": "", "related_clubs": [], "lat": None, "lng": None, **fields,
+    }
+
+
+def test_search_shards_split_and_resolve_by_longest_prefix(monkeypatch):
+    monkeypatch.setattr(build_web_data, "SEARCH_SHARD_BYTES", 600)
+    rallies = [_rally(f"r{i}", f"Scooter Rally {i} Scootarama", i % 7, city="Scottsdale") for i in range(30)]
+    rallies.append(_rally("pharaohs", "Pharaohs Anniversary", 500))
+    shards = build_web_data.build_search_shards(rallies)
+
+    assert any(len(name) > 2 for name in shards)   # "sc" was split
+    for name, shard in shards.items():
+        for kind in ("pre", "tri"):
+            for key in shard[kind]:
+                owner = max((n for n in shards if key.startswith(n)), key=len)
+                assert owner == name
+    # Doc ids are best-first, and a key carries rows for its own best matches
+    assert shards["ph"]["pre"]["pharaohs"] == [0, 1]
+    assert shards["ph"]["docs"]["0"][0] == "pharaohs"
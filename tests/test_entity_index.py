@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.entity_index import EntityIndex  # noqa: E402
+
+
+def _index(table, *names):
+    index = EntityIndex()
+    for name in names:
+        index.add(table, name)
+    return index
+
+
+@pytest.mark.parametrize("name", [
+    "Pharaohs SC",
+    "The Pharaohs Scooter Club",
+    "Pharoahs Scooter Club",
+    "Pharaohs Scooter Club.",
+])
+def test_spellings_of_one_club_merge(name):
+    index = _index("oral_clubs", "Pharaohs Scooter Club")
+    assert index.canonical("oral_clubs", name) == "Pharaohs Scooter Club"
+
+
+@pytest.mark.parametrize("existing, new", [
+    ("Ace Scooter Club", "Ice Scooter Club"),
+    ("Mods SC", "Rods SC"),
+    ("Lambretta Club Utah", "Lambretta Club USA"),
+    ("Congress Bar", "Congress Car"),
+    ("Amerivespa 2005", "Amerivespa 2006"),
+    ("Slaughterhouse XV", "Slaughterhouse XVI"),
+])
+def test_different_names_padded_by_generic_words_stay_apart(existing, new):
+    for table in ("oral_clubs", "oral_events", "oral_locations"):
+        index = _index(table, existing)
+        assert index.canonical(table, new) is None
+
+
+def test_resolve_indexes_new_names():
+    index = EntityIndex()
+    assert index.resolve("oral_clubs", "Vespa Club Ohio") == "Vespa Club Ohio"
+    assert index.canonical("oral_clubs", "Vespa Club of Ohio") == "Vespa Club Ohio"
+    assert len(index) == 1
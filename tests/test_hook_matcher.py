@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline import hook_matcher  # noqa: E402
+from pipeline.hook_matcher import HookMatcher  # noqa: E402
+
+HOOKS = {
+    "rally": ["rally", "run"],
+    "club": ["ace", "pub scouts"],
+    "manufacturer": ["vespa"],
+    "media": ["vespa motorsport podcast"],
+    "shop": ["motorsport", "shop"],
+    "venue": ["pub scouts"],
+}
+TEXT = ("Vespa Motorsport Podcast on the rally's route; brunch at Pub Scouts, "
+        "two vespas, RALLIES, a workshop, the place, Ace.")
+
+
+def _regex_matcher():
+    matcher = HookMatcher(HOOKS)
+    matcher._automaton = None
+    return matcher
+
+
+def test_word_boundaries_plurals_and_overlaps():
+    found = _regex_matcher().find_all(TEXT)
+    assert [TEXT[s:e] for _, s, e in found] == [
+        "Vespa Motorsport Podcast", "Vespa", "Motorsport", "rally's", "Pub Scouts",
+        "vespas", "RALLIES", "Ace",
+    ]
+    assert list(_regex_matcher().hooks(TEXT)) == ["rally", "club", "manufacturer", "media", "shop", "venue"]
+
+
+def test_automaton_matches_regex():
+    if hook_matcher.ahocorasick is None:
+        pytest.skip("pyahocorasick not installed")
+    assert HookMatcher(HOOKS).find_all(TEXT) == _regex_matcher().find_all(TEXT)
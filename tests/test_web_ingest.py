@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.web_ingest import parse_html  # noqa: E402
+
+
+def test_parse_html_keeps_pages_with_an_xml_declaration():
+    html = ('<?xml version="1.0" encoding="iso-8859-1"?>\n'
+            '<html><body><p>Vespa rally in Montréal</p><a href="/next">next</a></body></html>')
+    assert parse_html(html, "http://club.example/") == (
+        "Vespa rally in Montréal next", ["http://club.example/next"])
+
+
+def test_parse_html_keeps_words_around_dropped_tags_apart():
+    html = ("<html><body><nav>Home <a href='/'>x</a></nav><p>Pharaohs</p>rally"
+            "<script>var a = 1;</script>weekend<!-- note -->camp<style>p {}</style>out</body></html>")
+    text, links = parse_html(html)
+    assert text == "Pharaohs rally weekend camp out"
+    assert links == []
@@ -0,0 +1,21 @@
+/**
+ * data.js — Fetch site data through its content-hashed copy
+ * data/manifest.json (written by scraper/hash_assets.py) maps a file such as
+ * "rallies.json" to "h/rallies.3f2a9c1b7e.json", which is cached as
+ * immutable (see _headers). Files missing from the manifest, or a missing
+ * manifest, fall back to the unversioned data/ file.
+ */
+
+var nasaManifest = null;
+
+/** fetch() for a path under data/, e.g. fetchData('geo.json') */
+function fetchData(name) {
+  if (!nasaManifest) {
+    nasaManifest = fetch('data/manifest.json', { cache: 'no-cache' })
+      .then(function (r) { return r.ok ? r.json() : {}; })
+      .catch(function () { return {}; });
+  }
+  return nasaManifest.then(function (manifest) {
+    return fetch('data/' + (manifest[name] || name));
+  });
+}